@@ -0,0 +1,70 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare loading NoDL files from their XML and from their compiled counterparts.
+
+Compiled files are loaded both fully and lazily, as when a single node is looked up.
+
+Run from the package root: python3 benchmark/bench_compiled.py
+"""
+
+import argparse
+import os
+from pathlib import Path
+import tempfile
+import timeit
+
+import nodl
+from nodl._parsing._compiled import load_compiled
+from synthetic import generate_interface
+
+
+def measure(path: Path, number: int, *, lazy: bool = False) -> float:
+    return min(
+        timeit.repeat(lambda: nodl.parse(path, lazy=lazy), number=number, repeat=5)
+    ) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--nodes', type=int, nargs='+', default=[1, 20, 200])
+    parser.add_argument('--interfaces', type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f'{"nodes":>6} {"xml us":>10} {"compiled us":>12} {"speedup":>8}'
+        f' {"lazy us":>10} {"speedup":>8} {"xml B":>8} {"bin B":>8}'
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for nodes in args.nodes:
+            path = Path(directory) / f'bench_{nodes}.nodl.xml'
+            path.write_bytes(generate_interface(nodes, interfaces_per_node=args.interfaces))
+            # Age the file past the racy window, as installed files are.
+            os.utime(path, ns=(0, 0))
+            number = max(1, 2000 // nodes)
+
+            xml = measure(path, number)
+            compiled = nodl.compile_file(path)
+            assert load_compiled(path) is not None
+            loaded = measure(path, number)
+            lazy = measure(path, number, lazy=True)
+            print(
+                f'{nodes:>6} {xml * 1e6:>10.1f} {loaded * 1e6:>12.1f} {xml / loaded:>7.1f}x'
+                f' {lazy * 1e6:>10.1f} {xml / lazy:>7.1f}x'
+                f' {path.stat().st_size:>8} {compiled.stat().st_size:>8}'
+            )
+
+
+if __name__ == '__main__':
+    main()
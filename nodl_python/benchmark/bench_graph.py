@@ -0,0 +1,62 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare finding the subscribers of a topic with InterfaceGraph and by scanning every node.
+
+Also times the whole-graph queries on the same 10k interfaces.
+
+Run from the package root: python3 benchmark/bench_graph.py
+"""
+
+import io
+import timeit
+
+import nodl
+from nodl.graph import InterfaceGraph
+from nodl.types import PubSubRole
+from synthetic import generate_interface
+
+NODES = 2000
+
+
+def scan(nodes, topic):
+    return [
+        node.name
+        for node in nodes
+        if topic in node.topics and node.topics[topic].role != PubSubRole.PUBLISHER
+    ]
+
+
+def main() -> None:
+    nodes = nodl.parse(io.BytesIO(generate_interface(NODES)))
+    build = min(timeit.repeat(lambda: InterfaceGraph(nodes), number=1, repeat=5))
+    graph = InterfaceGraph(nodes)
+    topic = f'/topic_{NODES // 2}_0'
+    assert sorted(scan(nodes, topic)) == sorted(graph.subscriptions(topic))
+
+    lookups = 1000
+    scanned = min(timeit.repeat(lambda: scan(nodes, topic), number=lookups, repeat=5))
+    indexed = min(timeit.repeat(lambda: graph.subscriptions(topic), number=lookups, repeat=5))
+    components = min(timeit.repeat(graph._compute_components, number=1, repeat=5))
+    problems = min(timeit.repeat(graph.problems, number=1, repeat=5))
+    print(f'nodes:         {NODES}')
+    print(f'build graph:   {build * 1e3:.2f} ms')
+    print(f'scan lookup:   {scanned / lookups * 1e6:.2f} us')
+    print(f'graph lookup:  {indexed / lookups * 1e6:.2f} us')
+    print(f'components:    {components * 1e3:.2f} ms')
+    print(f'problems:      {problems * 1e3:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
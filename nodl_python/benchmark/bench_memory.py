@@ -0,0 +1,63 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure the memory retained by the parsed model of a synthetic 50k-interface workspace.
+
+Run from the package root: python3 benchmark/bench_memory.py
+"""
+
+import gc
+from pathlib import Path
+import tempfile
+import tracemalloc
+
+import nodl
+from synthetic import generate_interface
+
+PACKAGES = 100
+NODES_PER_PACKAGE = 100
+INTERFACES_PER_NODE = 5
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as workspace:
+        paths = []
+        for package in range(PACKAGES):
+            path = Path(workspace) / f'package_{package}.nodl.xml'
+            path.write_bytes(
+                generate_interface(
+                    NODES_PER_PACKAGE, INTERFACES_PER_NODE, prefix=f'package_{package}'
+                )
+            )
+            paths.append(path)
+
+        # Warm up lazily created state (schemas, enum lookups) outside of the measurement.
+        nodl.parse(paths[0])
+        gc.collect()
+
+        tracemalloc.start()
+        nodes = [node for path in paths for node in nodl.parse(path)]
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    interfaces = PACKAGES * NODES_PER_PACKAGE * INTERFACES_PER_NODE
+    print(f'nodes:        {len(nodes)}')
+    print(f'interfaces:   {interfaces}')
+    print(f'retained:     {retained / 2 ** 20:.1f} MiB ({retained / interfaces:.0f} B/interface)')
+    print(f'peak:         {peak / 2 ** 20:.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
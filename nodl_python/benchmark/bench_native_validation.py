@@ -0,0 +1,91 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the built-in validator (native=True) with XSD validation through lxml.
+
+The first parse in a process (or thread) also pays for compiling the XSD schemas, which the
+built-in validator never loads for valid documents; it is measured in fresh interpreters.
+
+Run from the package root: python3 benchmark/bench_native_validation.py
+"""
+
+import io
+from pathlib import Path
+import subprocess
+import sys
+import timeit
+from typing import Callable
+
+from nodl._parsing._parsing import iterparse, parse
+from nodl._parsing._schemas import interface_schema, v1_schema
+from synthetic import generate_interface
+
+_FIRST_PARSE = """
+import io, time
+from nodl._parsing._parsing import parse
+from synthetic import generate_interface
+document = generate_interface(10)
+start = time.perf_counter()
+parse(io.BytesIO(document), native={native})
+print(time.perf_counter() - start)
+"""
+
+
+def _best(function: Callable[[], object], number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=7)) / number
+
+
+def _first_parse(native: bool) -> float:
+    def run() -> float:
+        output = subprocess.run(
+            [sys.executable, '-c', _FIRST_PARSE.format(native=native)],
+            cwd=Path(__file__).parent,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        ).stdout
+        return float(output)
+
+    return min(run() for _ in range(5))
+
+
+def _row(nodes: object, name: str, xsd: float, native: float) -> None:
+    print(
+        f'{nodes:>7} {name:>10} {xsd * 1e3:>9.3f} {native * 1e3:>10.3f}'
+        f' {1 - native / xsd:>6.0%}'
+    )
+
+
+def main() -> None:
+    print(f'{"nodes":>7} {"operation":>10} {"xsd ms":>9} {"native ms":>10} {"saved":>6}')
+    _row(10, 'first', _first_parse(False), _first_parse(True))
+
+    # Load the schemas up front so their compilation is not measured from here on.
+    interface_schema()
+    v1_schema()
+    for nodes in (10, 100, 1000, 10000):
+        document = generate_interface(nodes)
+        number = max(1, 1000 // nodes)
+        operations = {
+            'parse': lambda native: parse(io.BytesIO(document), native=native),
+            'iterparse': lambda native: list(iterparse(io.BytesIO(document), native=native)),
+        }
+        for name, operation in operations.items():
+            xsd = _best(lambda: operation(False), number)
+            native = _best(lambda: operation(True), number)
+            _row(nodes, name, xsd, native)
+
+
+if __name__ == '__main__':
+    main()
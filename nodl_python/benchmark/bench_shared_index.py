@@ -0,0 +1,100 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Time many fresh processes each looking one node up, as when a launch file starts them.
+
+Each process either searches the package's files with get_node_by_executable, or queries a
+SharedIndex built beforehand, and reports the time its lookup took. Processes are started
+together, so they compete for the CPU as they would at launch.
+
+Run from the package root: python3 benchmark/bench_shared_index.py [--processes N]
+"""
+
+import argparse
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from nodl._shared_index import SharedIndex
+from synthetic import generate_package
+
+PACKAGE = 'bench_nodl'
+
+_CHILD = """
+import sys, time
+start = time.perf_counter()
+import nodl
+if sys.argv[1] == 'shared':
+    node = nodl.SharedIndex(sys.argv[2]).get_node(sys.argv[3], sys.argv[4])
+else:
+    node = nodl.get_node_by_executable(package_name=sys.argv[3], executable_name=sys.argv[4])
+assert node is not None
+print(time.perf_counter() - start)
+"""
+
+
+def run(mode: str, index_path: Path, executable: str, processes: int) -> None:
+    start = time.perf_counter()
+    children = [
+        subprocess.Popen(
+            [sys.executable, '-c', _CHILD, mode, str(index_path), PACKAGE, executable],
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        for _ in range(processes)
+    ]
+    times = [float(child.communicate()[0]) for child in children]
+    wall = time.perf_counter() - start
+    print(
+        f'{mode:<8} {statistics.median(times) * 1e3:>12.2f} {max(times) * 1e3:>10.2f}'
+        f' {wall * 1e3:>10.1f}'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=60)
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--nodes', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workspace:
+        prefix = Path(workspace) / 'install'
+        marker = prefix / 'share/ament_index/resource_index/packages' / PACKAGE
+        marker.parent.mkdir(parents=True)
+        marker.touch()
+        paths = generate_package(prefix / 'share' / PACKAGE, files=args.files, nodes=args.nodes)
+        os.environ['AMENT_PREFIX_PATH'] = str(prefix)
+        # The last node of the last file is the worst case for a scan of the package.
+        executable = f'{paths[-1].name[:-len(".nodl.xml")]}_exe_{args.nodes - 1}'
+
+        index_path = Path(workspace) / 'nodes.index'
+        start = time.perf_counter()
+        nodes = SharedIndex(index_path).build()
+        build = time.perf_counter() - start
+        print(
+            f'{args.processes} processes, {nodes} nodes, index of'
+            f' {index_path.stat().st_size} bytes built in {build * 1e3:.1f} ms'
+        )
+        print(f'{"lookup":<8} {"median ms":>12} {"max ms":>10} {"wall ms":>10}')
+        run('scan', index_path, executable, args.processes)
+        run('shared', index_path, executable, args.processes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Time each stage of parsing and package lookup on a synthetic workspace.
+
+The workspace is a real ament prefix in a temporary directory, with one package of --files
+NoDL files of --nodes nodes each. Every stage is timed separately, reporting the best and
+median time of one call. Results can be saved as a JSON baseline with --save, and compared
+with one from another revision with --compare; the script exits with 1 if any stage got
+slower than --threshold allows.
+
+Run from the package root: python3 benchmark/bench_suite.py [--save FILE] [--compare FILE]
+"""
+
+import argparse
+import datetime
+import io
+import json
+import os
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from typing import Any, Callable, Dict, List, Optional
+
+from lxml import etree
+import nodl
+from nodl import _index
+from nodl._executable_index import ExecutableIndex
+from nodl._parsing import _schemas
+from nodl._parsing._parsing import _parse_multiple
+from nodl._parsing._v1 import _parsing as _v1
+from nodl._shared_index import SharedIndex
+from synthetic import generate_package
+
+# Bump whenever the layout of saved results changes.
+FORMAT_VERSION = 1
+
+PACKAGE = 'bench_package'
+
+
+def measure(function: Callable[[], object], *, repeat: int) -> Dict[str, float]:
+    """Return the best and median time of one call of function, in seconds."""
+    timer = timeit.Timer(function)
+    # Batch fast calls so a measurement lasts at least 50ms.
+    number, _ = timer.autorange()
+    number = max(1, number // 4)
+    times = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    return {'best': min(times), 'median': statistics.median(times), 'number': number}
+
+
+def make_workspace(prefix: Path, *, files: int, nodes: int, interfaces: int) -> List[Path]:
+    """Install a package exporting synthetic NoDL files in the ament prefix at prefix."""
+    marker = prefix / 'share/ament_index/resource_index/packages' / PACKAGE
+    marker.parent.mkdir(parents=True)
+    marker.touch()
+    return generate_package(
+        prefix / 'share' / PACKAGE, files=files, nodes=nodes, interfaces_per_node=interfaces,
+    )
+
+
+def stages(
+    paths: List[Path], cache_directory: Path, *, nodes: int
+) -> Dict[str, Callable[[], object]]:
+    """Return the operations to time, by name."""
+    first_file = paths[0]
+    document = first_file.read_bytes()
+    elements = list(etree.parse(str(first_file)).getroot())
+    # The last node of the last file is the worst case for a scan of the package.
+    last_executable = f'{paths[-1].name[:-len(".nodl.xml")]}_exe_{nodes - 1}'
+    executables = [f'{path.name[:-len(".nodl.xml")]}_exe_0' for path in paths]
+    index = ExecutableIndex(cache_directory / 'executables.json')
+    index.refresh()
+    shared_index = SharedIndex(cache_directory / 'nodes.index')
+    shared_index.build()
+
+    return {
+        'schema_load': lambda: (
+            _schemas._get_schema('interface.xsd'),
+            _schemas._get_schema('v1.xsd'),
+        ),
+        'parse_bytes': lambda: nodl.parse(io.BytesIO(document)),
+        'parse_buffer': lambda: nodl.parse_bytes(document),
+        'parse_file': lambda: nodl.parse(first_file),
+        'parse_file_native': lambda: nodl.parse(first_file, native=True),
+        'parse_file_lazy': lambda: nodl.parse(first_file, lazy=True),
+        'v1_parse_node': lambda: [_v1._parse_node(e, validate=True) for e in elements],
+        'parse_multiple': lambda: _parse_multiple(paths),
+        'parse_many': lambda: list(nodl.parse_many(paths)),
+        'index_get_node': lambda: _index.get_node_by_executable(
+            package_name=PACKAGE, executable_name=last_executable
+        ),
+        'index_get_nodes': lambda: _index._get_nodes_by_executables(
+            package_name=PACKAGE, executable_names=executables
+        ),
+        'resolve_many': lambda: _index.resolve_many(
+            [(PACKAGE, executable) for executable in executables]
+        ),
+        'executable_index_get_node': lambda: index.get_node(PACKAGE, last_executable),
+        'executable_index_refresh': index.refresh,
+        'shared_index_get_node': lambda: shared_index.get_node(PACKAGE, last_executable),
+    }
+
+
+def _revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=Path(__file__).parent,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    baseline: Dict[str, Any], results: Dict[str, Any], *, threshold: float
+) -> List[str]:
+    """Print the change of every stage against baseline, returning the stages that regressed."""
+    if baseline['parameters'] != results['parameters']:
+        print(f'warning: baseline parameters differ: {baseline["parameters"]}', file=sys.stderr)
+    regressions = []
+    print(f'\ncompared with {baseline["revision"] or "baseline"} (threshold {threshold:.0%})')
+    print(f'{"stage":<28} {"before ms":>10} {"after ms":>10} {"change":>8}')
+    for name, stage in results['stages'].items():
+        before = baseline['stages'].get(name)
+        if before is None:
+            print(f'{name:<28} {"-":>10} {stage["best"] * 1e3:>10.3f}')
+            continue
+        change = stage['best'] / before['best'] - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  SLOWER'
+        print(
+            f'{name:<28} {before["best"] * 1e3:>10.3f} {stage["best"] * 1e3:>10.3f}'
+            f' {change:>+8.1%}{flag}'
+        )
+    return regressions
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=10, help='NoDL files in the package.')
+    parser.add_argument('--nodes', type=int, default=20, help='Nodes per file.')
+    parser.add_argument('--interfaces', type=int, default=5, help='Interfaces per node.')
+    parser.add_argument('--repeat', type=int, default=7, help='Measurements per stage.')
+    parser.add_argument('--stage', action='append', help='Only time the given stage(s).')
+    parser.add_argument('--save', type=Path, metavar='FILE', help='Save results as JSON.')
+    parser.add_argument('--compare', type=Path, metavar='FILE', help='Baseline to compare to.')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.1,
+        help='Relative slowdown of a stage reported as a regression (default: 0.1).',
+    )
+    args = parser.parse_args(argv)
+
+    parameters = {'files': args.files, 'nodes': args.nodes, 'interfaces': args.interfaces}
+    results: Dict[str, Any] = {
+        'version': FORMAT_VERSION,
+        'revision': _revision(),
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'lxml': '.'.join(map(str, etree.LXML_VERSION)),
+        'parameters': parameters,
+        'stages': {},
+    }
+
+    with tempfile.TemporaryDirectory() as workspace:
+        prefix = Path(workspace) / 'install'
+        paths = make_workspace(
+            prefix, files=args.files, nodes=args.nodes, interfaces=args.interfaces
+        )
+        os.environ['AMENT_PREFIX_PATH'] = str(prefix)
+        operations = stages(paths, Path(workspace) / 'cache', nodes=args.nodes)
+
+        print(f'{args.files} files x {args.nodes} nodes x {args.interfaces} interfaces')
+        print(f'{"stage":<28} {"best ms":>10} {"median ms":>10}')
+        for name, operation in operations.items():
+            if args.stage and name not in args.stage:
+                continue
+            stage = results['stages'][name] = measure(operation, repeat=args.repeat)
+            print(f'{name:<28} {stage["best"] * 1e3:>10.3f} {stage["median"] * 1e3:>10.3f}')
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + '\n')
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline.get('version') != FORMAT_VERSION:
+            print(f'{args.compare} was saved by an incompatible version', file=sys.stderr)
+            return 2
+        return 1 if compare(baseline, results, threshold=args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
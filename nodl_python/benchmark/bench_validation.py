@@ -0,0 +1,65 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare two-pass and single-pass schema validation across document sizes.
+
+Run from the package root: python3 benchmark/bench_validation.py
+"""
+
+import timeit
+
+from lxml import etree
+from nodl._parsing._parsing import _parse_element_tree
+from nodl._parsing._schemas import interface_schema, v1_schema
+from synthetic import generate_interface
+
+
+def _two_pass(tree: etree._ElementTree) -> None:
+    interface_schema().assertValid(tree)
+    v1_schema().assertValid(tree.getroot())
+
+
+def _single_pass(tree: etree._ElementTree) -> None:
+    v1_schema().assertValid(tree)
+
+
+def main() -> None:
+    # Load both schemas up front so their compilation is not measured.
+    interface_schema()
+    v1_schema()
+
+    print(
+        f'{"nodes":>7} {"KiB":>8} {"two-pass ms":>12} {"one-pass ms":>12} {"saved":>6}'
+        f' {"parse ms":>9}'
+    )
+    for nodes in (10, 100, 1000, 10000):
+        document = generate_interface(nodes)
+        tree = etree.ElementTree(etree.fromstring(document))
+        number = max(1, 2000 // nodes)
+
+        two_pass = min(timeit.repeat(lambda: _two_pass(tree), number=number, repeat=5)) / number
+        one_pass = min(timeit.repeat(lambda: _single_pass(tree), number=number, repeat=5))
+        one_pass /= number
+        parse = min(
+            timeit.repeat(lambda: _parse_element_tree(tree), number=number, repeat=5)
+        ) / number
+
+        print(
+            f'{nodes:>7} {len(document) / 1024:>8.1f} {two_pass * 1e3:>12.3f}'
+            f' {one_pass * 1e3:>12.3f} {1 - one_pass / two_pass:>6.0%} {parse * 1e3:>9.3f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Generators for synthetic NoDL documents used by the benchmarks."""
+
+from pathlib import Path
+from typing import List
+
+_INTERFACES = [
+    '<topic name="/topic_{i}" type="std_msgs/msg/String" role="publisher" />',
+    '<topic name="/topic_{j}" type="std_msgs/msg/String" role="subscription" />',
+    '<parameter name="parameter_{i}" type="int" />',
+    '<service name="/service_{i}" type="std_srvs/srv/Empty" role="server" />',
+    '<action name="/action_{i}" type="example_interfaces/action/Fibonacci" role="client" />',
+]
+
+
+def generate_interface(nodes: int, interfaces_per_node: int = 5, prefix: str = 'node') -> bytes:
+    """Return a valid NoDL v1 document with the requested number of nodes and interfaces."""
+    lines = ['<interface version="1">']
+    for n in range(nodes):
+        lines.append(f'  <node name="{prefix}_{n}" executable="{prefix}_exe_{n}">')
+        for i in range(interfaces_per_node):
+            template = _INTERFACES[i % len(_INTERFACES)]
+            lines.append('    ' + template.format(i=f'{n}_{i}', j=f'{n + 1}_{i}'))
+        lines.append('  </node>')
+    lines.append('</interface>')
+    return '\n'.join(lines).encode()
+
+
+def generate_package(
+    share_directory: Path,
+    *,
+    files: int,
+    nodes: int,
+    interfaces_per_node: int = 5,
+    prefix: str = 'node',
+) -> List[Path]:
+    """Write files NoDL documents of nodes nodes each, with executables unique to the package."""
+    share_directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for f in range(files):
+        path = share_directory / f'{prefix}_{f}.nodl.xml'
+        path.write_bytes(generate_interface(nodes, interfaces_per_node, prefix=f'{prefix}_{f}'))
+        paths.append(path)
+    return paths
@@ -13,5 +13,82 @@
 # limitations under the License.
 
 
-from ._index import get_node_by_executable  # noqa: F401
-from ._parsing import parse  # noqa: F401
+import importlib
+from typing import Any, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ._executable_index import ExecutableIndex, IndexEntry  # noqa: F401
+    from ._index import get_node_by_executable, Miss, Resolution, resolve_many  # noqa: F401
+    from ._parsing import (  # noqa: F401
+        compile_file,
+        iterparse,
+        parse,
+        parse_buffer,
+        parse_bytes,
+        parse_many,
+        parse_multiple,
+        ParseCache,
+        ParseResult,
+    )
+    from ._resource_index import get_packages_with_nodl, register_nodl_files  # noqa: F401
+    from ._shared_index import SharedIndex  # noqa: F401
+    from ._stats import (  # noqa: F401
+        disable_stats,
+        enable_stats,
+        reset_stats,
+        StageStats,
+        stats,
+        write_chrome_trace,
+    )
+    from .graph import InterfaceGraph  # noqa: F401
+
+# Public names are resolved on first access, so `import nodl` does not load lxml, the
+# schemas or the ament index until they are needed.
+_LAZY_ATTRIBUTES = {
+    'ExecutableIndex': '._executable_index',
+    'IndexEntry': '._executable_index',
+    'get_node_by_executable': '._index',
+    'Miss': '._index',
+    'Resolution': '._index',
+    'resolve_many': '._index',
+    'InterfaceGraph': '.graph',
+    'compile_file': '._parsing',
+    'iterparse': '._parsing',
+    'parse': '._parsing',
+    'parse_buffer': '._parsing',
+    'parse_bytes': '._parsing',
+    'parse_many': '._parsing',
+    'parse_multiple': '._parsing',
+    'ParseCache': '._parsing',
+    'ParseResult': '._parsing',
+    'get_packages_with_nodl': '._resource_index',
+    'register_nodl_files': '._resource_index',
+    'SharedIndex': '._shared_index',
+    'disable_stats': '._stats',
+    'enable_stats': '._stats',
+    'reset_stats': '._stats',
+    'StageStats': '._stats',
+    'stats': '._stats',
+    'write_chrome_trace': '._stats',
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    else:
+        # Submodules such as nodl.errors, nodl.types or nodl._index.
+        try:
+            value = importlib.import_module(f'.{name}', __name__)
+        except ModuleNotFoundError as e:
+            if e.name != f'{__name__}.{name}':
+                raise
+            raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | _LAZY_ATTRIBUTES.keys())
@@ -0,0 +1,264 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from lxml import etree
+
+from nodl._parsing._cache import default_cache_directory
+from nodl._parsing._parsing import _find_node, parse
+from nodl._resource_index import find_nodl_files, get_nodl_package_prefixes
+from nodl._util import write_atomic
+from nodl.types import Node
+
+
+# Bump whenever the layout of the persisted index changes.
+_INDEX_FORMAT_VERSION = 1
+
+
+class IndexEntry(NamedTuple):
+    """Location of the node describing an executable."""
+
+    package_name: str
+    path: Path
+    node_name: str
+
+
+def _scan_file(path: Path) -> List[Tuple[str, str]]:
+    """Return the executable and name of every node in a file, without validating it."""
+    nodes = []
+    try:
+        for _, element in etree.iterparse(str(path), events=('start',), tag='node'):
+            # Only direct children of the root are nodes, as for _iterparse.
+            parent = element.getparent()
+            if parent is None or parent.getparent() is not None:
+                continue
+            executable, name = element.get('executable'), element.get('name')
+            if executable is not None and name is not None:
+                nodes.append((executable, name))
+    except (OSError, etree.XMLSyntaxError):
+        # Broken files are reported when they are actually parsed.
+        pass
+    return nodes
+
+
+def _file_mtimes(package_name: str, share_directory: str) -> Dict[str, int]:
+    """Return the mtimes of a package's NoDL files, by path relative to its share directory."""
+    mtimes = {}
+    for path in find_nodl_files(package_name, share_directory):
+        try:
+            mtimes[os.path.relpath(path, share_directory)] = path.stat().st_mtime_ns
+        except OSError:
+            continue
+    return mtimes
+
+
+def _scan_share_directory(
+    package_name: str, share_directory: str, mtime_ns: int
+) -> Dict[str, Any]:
+    """Return the index record of a package share directory."""
+    files = {
+        file_name: {
+            'mtime_ns': file_mtime_ns,
+            'nodes': _scan_file(Path(share_directory) / file_name),
+        }
+        for file_name, file_mtime_ns in _file_mtimes(package_name, share_directory).items()
+    }
+    return {'share': share_directory, 'mtime_ns': mtime_ns, 'files': files}
+
+
+class ExecutableIndex:
+    """Persistent index of the executables described by every package on AMENT_PREFIX_PATH.
+
+    The index maps each package's executables to the NoDL file and node describing them. It is
+    built by walking every package share directory once and stored as JSON; later refreshes
+    only rescan packages whose share directory mtime changed, or that appeared, and drop
+    packages that are gone. Lookups are dictionary accesses followed by reading a single file.
+
+    A file edited in place does not change its directory's mtime, so lookups that come up
+    empty recheck the mtimes of the package's files before reporting a miss.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        """Create an index stored at path, defaulting to $XDG_CACHE_HOME/nodl/executables.json."""
+        self.path = Path(path) if path else default_cache_directory() / 'executables.json'
+        self._packages: Dict[str, Dict[str, Any]] = {}
+        self._entries: Dict[str, Dict[str, IndexEntry]] = {}
+        self._loaded = False
+        # Lookups may run on several threads, e.g. through nodl.aio.
+        self._lock = threading.RLock()
+
+    def _load(self) -> None:
+        try:
+            with self.path.open('rb') as index_file:
+                content = json.load(index_file)
+            if content['version'] == _INDEX_FORMAT_VERSION:
+                self._packages = content['packages']
+        except Exception:
+            # Missing, corrupt or incompatible indexes are rebuilt from scratch.
+            self._packages = {}
+
+    def _save(self) -> None:
+        content = {'version': _INDEX_FORMAT_VERSION, 'packages': self._packages}
+        write_atomic(self.path, json.dumps(content).encode())
+
+    def _package_entries(self, package_name: str) -> Dict[str, IndexEntry]:
+        entries: Dict[str, IndexEntry] = {}
+        record = self._packages[package_name]
+        for file_name, file_record in record['files'].items():
+            path = Path(record['share']) / file_name
+            for executable, node_name in file_record['nodes']:
+                # Files are scanned in sorted order and the first definition wins.
+                entries.setdefault(executable, IndexEntry(package_name, path, node_name))
+        return entries
+
+    def refresh(self) -> None:
+        """Bring the index up to date with AMENT_PREFIX_PATH, and persist it if it changed."""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self) -> None:
+        if not self._loaded:
+            self._load()
+        changed = False
+        packages = get_nodl_package_prefixes()
+
+        for package_name in self._packages.keys() - packages.keys():
+            del self._packages[package_name]
+            changed = True
+
+        for package_name, prefix in packages.items():
+            share_directory = os.path.join(prefix, 'share', package_name)
+            try:
+                mtime_ns = os.stat(share_directory).st_mtime_ns
+            except OSError:
+                changed |= self._packages.pop(package_name, None) is not None
+                continue
+            record = self._packages.get(package_name)
+            if (
+                record is None
+                or record['share'] != share_directory
+                or record['mtime_ns'] != mtime_ns
+            ):
+                self._packages[package_name] = _scan_share_directory(
+                    package_name, share_directory, mtime_ns
+                )
+                changed = True
+
+        self._entries = {name: self._package_entries(name) for name in self._packages}
+        if changed:
+            self._save()
+        self._loaded = True
+
+    def _refresh_package(self, package_name: str) -> bool:
+        """Rescan a package if any of its files changed since it was indexed.
+
+        :return: whether the package was rescanned
+        :rtype: bool
+        """
+        with self._lock:
+            return self._refresh_package_locked(package_name)
+
+    def _refresh_package_locked(self, package_name: str) -> bool:
+        record = self._packages[package_name]
+        share_directory = record['share']
+        try:
+            mtime_ns = os.stat(share_directory).st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        mtimes = _file_mtimes(package_name, share_directory)
+        indexed = {name: file_record['mtime_ns'] for name, file_record in record['files'].items()}
+        if mtimes == indexed and mtime_ns == record['mtime_ns']:
+            return False
+
+        self._packages[package_name] = _scan_share_directory(
+            package_name, share_directory, mtime_ns
+        )
+        self._entries[package_name] = self._package_entries(package_name)
+        self._save()
+        return True
+
+    def _ensure_built(self) -> None:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._refresh()
+
+    def __contains__(self, package_name: object) -> bool:
+        """Whether package_name is installed and exports at least one NoDL file."""
+        self._ensure_built()
+        return package_name in self._packages and bool(self._packages[package_name]['files'])
+
+    def lookup(self, package_name: str, executable_name: str) -> Optional[IndexEntry]:
+        """Return where executable_name of package_name is described, or None."""
+        self._ensure_built()
+        entries = self._entries.get(package_name, {})
+        if executable_name not in entries and package_name in self._packages:
+            if self._refresh_package(package_name):
+                entries = self._entries[package_name]
+        return entries.get(executable_name)
+
+    def find(self, executable_name: str) -> List[IndexEntry]:
+        """Return where executable_name is described, across every indexed package."""
+        self._ensure_built()
+        return [
+            entries[executable_name]
+            for _, entries in sorted(self._entries.items())
+            if executable_name in entries
+        ]
+
+    def get_node(self, package_name: str, executable_name: str) -> Optional[Node]:
+        """Return the node associated with executable_name in package_name, or None.
+
+        Only the node's file is read, and only the matching node is validated and built.
+        """
+        entry = self.lookup(package_name, executable_name)
+        if entry is None:
+            return None
+        node = _find_node(entry.path, executable_name)
+        if node is None and self._refresh_package(package_name):
+            # The file changed since it was indexed.
+            return self.get_node(package_name, executable_name)
+        return node
+
+    def get_nodes(
+        self, package_name: str, executable_names: Iterable[str]
+    ) -> Tuple[List[Node], List[str]]:
+        """Return the nodes associated with executable_names in package_name.
+
+        Each file describing one of the executables is parsed and validated once.
+
+        :return: Tuple containing nodes with matching executable field, unmatched executables
+        :rtype: Tuple[List[Node], List[str]]
+        """
+        executable_names = list(executable_names)
+        entries = {name: self.lookup(package_name, name) for name in executable_names}
+        nodes_by_path: Dict[Path, Dict[str, Node]] = {}
+        for entry in entries.values():
+            if entry is not None and entry.path not in nodes_by_path:
+                nodes_by_path[entry.path] = {node.executable: node for node in parse(entry.path)}
+
+        result: Dict[str, Node] = {}
+        for name, entry in entries.items():
+            if entry is not None and name in nodes_by_path[entry.path]:
+                result.setdefault(name, nodes_by_path[entry.path][name])
+        missing = [name for name in dict.fromkeys(executable_names) if name not in result]
+        if missing and any(entries[name] is not None for name in missing):
+            if self._refresh_package(package_name):
+                return self.get_nodes(package_name, executable_names)
+        return list(result.values()), missing
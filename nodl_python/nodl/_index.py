@@ -13,67 +13,118 @@
 # limitations under the License.
 
 
+from concurrent.futures import Executor, ThreadPoolExecutor
+import functools
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 
-from ament_index_python.packages import get_package_share_directory
+from ament_index_python.packages import PackageNotFoundError
 
-from nodl._parsing._parsing import _parse_multiple
-from nodl.errors import ExecutableNotFoundError, NoNoDLFilesError
+from nodl import _stats
+from nodl._executable_index import ExecutableIndex
+from nodl._parsing._cache import ParseCache
+from nodl._parsing._parsing import _find_node, _parse_multiple
+from nodl._resource_index import find_nodl_files
+from nodl._shared_index import SharedIndex
+from nodl.errors import ExecutableNotFoundError, NoDLError, NoNoDLFilesError
 
 from .types import Node
 
 
-_FILE_EXTENSION = '.nodl.xml'
-
-
+@_stats.timed('index.glob')
 def _get_nodl_files_from_package_share(*, package_name: str) -> List[Path]:
     """Return all .nodl.xml files from the share directory of a package.
 
+    Files registered in the ament resource index are read from the package's marker, without
+    listing its share directory; only packages that do not register are globbed.
+
     :raises PackageNotFoundError: if package is not found
     :raises NoNoDLFilesError: if no .nodl.xml files are in package share directory
     """
-    package_share_directory = Path(get_package_share_directory(package_name))
-    nodl_paths = [
-        path for path in package_share_directory.glob('*' + _FILE_EXTENSION) if path.is_file()
-    ]
+    nodl_paths = find_nodl_files(package_name)
     if not nodl_paths:
         raise NoNoDLFilesError(package_name)
     return nodl_paths
 
 
-def _get_nodes_from_package(*, package_name: str) -> List[Node]:
+def _get_nodes_from_package(
+    *, package_name: str, cache: Optional[ParseCache] = None
+) -> List[Node]:
     """Return results of parsing all nodl.xml files of a package.
 
     :param package_name: name of the package
     :type package_name: str
+    :param cache: persistent parse cache to use, defaults to no caching
+    :type cache: Optional[ParseCache]
     :return: combined list of all `nodl.Node`'s a package contains
     :rtype: List[Node]
     """
     nodl_files = _get_nodl_files_from_package_share(package_name=package_name)
-    return _parse_multiple(paths=nodl_files)
+    return _parse_multiple(paths=nodl_files, cache=cache)
 
 
-def get_node_by_executable(*, package_name: str, executable_name: str) -> Node:
+def get_node_by_executable(
+    *,
+    package_name: str,
+    executable_name: str,
+    cache: Optional[ParseCache] = None,
+    strict: bool = False,
+    index: Optional[Union[ExecutableIndex, SharedIndex]] = None,
+) -> Node:
     """Return node associated with given executable from a package's exported nodl.
 
+    By default the package's files are streamed in order and only the matching node is
+    validated and built; no further files are read once it is found. With strict, or when a
+    cache is given, every file is parsed and validated in full and executables defined more
+    than once raise DuplicateNodeError.
+
+    Given an index, the node's file is looked up instead of searched for, unless strict is set.
+    A SharedIndex holds the nodes themselves, so no file is read at all.
+
     :param package_name: name of the package to search in
     :type package_name: str
     :param executable_name: the name of the executable the node is associated with
     :type executable_name: str
+    :param cache: persistent parse cache to use, defaults to no caching
+    :type cache: Optional[ParseCache]
+    :param strict: validate every file and check for duplicate definitions
+    :type strict: bool
+    :param index: workspace executable index to locate the node with
+    :type index: Optional[Union[ExecutableIndex, SharedIndex]]
     :raises ExecutableNotFoundError: if no node in the package is associated with executable_name
     :return: Node with matching executable field
     :rtype: Node
     """
-    nodes = _get_nodes_from_package(package_name=package_name)
-    try:
-        return next(node for node in nodes if node.executable == executable_name)
-    except StopIteration:
-        raise ExecutableNotFoundError(package_name=package_name, executable_name=executable_name)
+    if index is not None and not strict and package_name in index:
+        node = index.get_node(package_name, executable_name)
+        if node is None:
+            raise ExecutableNotFoundError(
+                package_name=package_name, executable_name=executable_name
+            )
+        return node
+
+    if strict or cache is not None:
+        nodes = _get_nodes_from_package(package_name=package_name, cache=cache)
+        try:
+            return next(node for node in nodes if node.executable == executable_name)
+        except StopIteration:
+            raise ExecutableNotFoundError(
+                package_name=package_name, executable_name=executable_name
+            )
+
+    for path in _get_nodl_files_from_package_share(package_name=package_name):
+        node = _find_node(path, executable_name)
+        if node is not None:
+            return node
+    raise ExecutableNotFoundError(package_name=package_name, executable_name=executable_name)
 
 
 def _get_nodes_by_executables(
-    *, package_name: str, executable_names: Iterable[str]
+    *,
+    package_name: str,
+    executable_names: Iterable[str],
+    cache: Optional[ParseCache] = None,
+    index: Optional[Union[ExecutableIndex, SharedIndex]] = None,
 ) -> Tuple[List[Node], List[str]]:
     """Return nodes associated with given executables from a package's exported nodl.
 
@@ -81,10 +132,114 @@ def _get_nodes_by_executables(
     :type package_name: str
     :param executable_names: the names of the executables the nodes are associated with
     :type executable_names: Iterable[str]
+    :param cache: persistent parse cache to use, defaults to no caching
+    :type cache: Optional[ParseCache]
+    :param index: workspace executable index, to only parse the files describing the executables
+    :type index: Optional[Union[ExecutableIndex, SharedIndex]]
     :return: Tuple containing nodes with matching executable field, unmatched nodes
     :rtype: Tuple[List[Node], List[Node]]
     """
-    nodes = _get_nodes_from_package(package_name=package_name)
+    if index is not None and package_name in index:
+        return index.get_nodes(package_name, executable_names)
+
+    nodes = _get_nodes_from_package(package_name=package_name, cache=cache)
     result = {node.executable: node for node in nodes if node.executable in executable_names}
     missing = list(set(executable_names) - result.keys())
     return list(result.values()), missing
+
+
+class Miss(NamedTuple):
+    """Executable resolve_many found no node for.
+
+    error is the exception raised reading the package, or None if the package was read and
+    none of its nodes is associated with the executable.
+    """
+
+    package_name: str
+    executable_name: str
+    error: Optional[Exception] = None
+
+
+class Resolution(NamedTuple):
+    """Result of resolve_many."""
+
+    nodes: Dict[Tuple[str, str], Node]
+    missing: List[Miss]
+
+
+def _resolve_package(
+    package_name: str,
+    executable_names: List[str],
+    *,
+    cache: Optional[ParseCache],
+    index: Optional[Union[ExecutableIndex, SharedIndex]],
+) -> Tuple[List[Node], Optional[Exception]]:
+    """Return the nodes of a package associated with executable_names, or the error raised."""
+    try:
+        nodes, _ = _get_nodes_by_executables(
+            package_name=package_name,
+            executable_names=executable_names,
+            cache=cache,
+            index=index,
+        )
+    except (PackageNotFoundError, NoDLError, OSError) as e:
+        return [], e
+    return nodes, None
+
+
+def resolve_many(
+    pairs: Iterable[Tuple[str, str]],
+    *,
+    cache: Optional[ParseCache] = None,
+    index: Optional[Union[ExecutableIndex, SharedIndex]] = None,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> Resolution:
+    """Return the nodes associated with many (package, executable) pairs.
+
+    Pairs are grouped by package, and each package's share directory is located and its files
+    are parsed once, however many of its executables are asked for. Packages are resolved one
+    after the other, or in parallel on executor or, when max_workers is above 1, on a thread
+    pool of that size. A package that cannot be found, read or parsed does not stop the batch:
+    each of its executables is reported missing with the error.
+
+    :param pairs: package and executable names to look up, duplicates are resolved once
+    :type pairs: Iterable[Tuple[str, str]]
+    :param cache: persistent parse cache to use, defaults to no caching
+    :type cache: Optional[ParseCache]
+    :param index: workspace executable index, to only parse the files describing the executables
+    :type index: Optional[Union[ExecutableIndex, SharedIndex]]
+    :param max_workers: number of packages to resolve in parallel, defaults to one at a time
+    :type max_workers: Optional[int]
+    :param executor: executor to resolve the packages on, overrides max_workers
+    :type executor: Optional[Executor]
+    :return: nodes found, by package and executable name, and the misses
+    :rtype: Resolution
+    """
+    grouped: Dict[str, Dict[str, None]] = {}
+    for package_name, executable_name in pairs:
+        grouped.setdefault(package_name, {})[executable_name] = None
+    package_names = list(grouped)
+    executable_lists = [list(executable_names) for executable_names in grouped.values()]
+    resolve = functools.partial(_resolve_package, cache=cache, index=index)
+
+    if executor is not None:
+        results = list(executor.map(resolve, package_names, executable_lists))
+    elif max_workers is not None and max_workers > 1 and len(package_names) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(package_names))) as pool:
+            results = list(pool.map(resolve, package_names, executable_lists))
+    else:
+        results = list(map(resolve, package_names, executable_lists))
+
+    resolution = Resolution({}, [])
+    for package_name, executable_names, (nodes, error) in zip(
+        package_names, executable_lists, results
+    ):
+        by_executable = {node.executable: node for node in nodes}
+        for executable_name in executable_names:
+            node = by_executable.get(executable_name)
+            if node is None:
+                resolution.missing.append(Miss(package_name, executable_name, error))
+            else:
+                resolution.nodes[package_name, executable_name] = node
+    return resolution
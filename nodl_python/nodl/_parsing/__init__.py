@@ -12,5 +12,46 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import importlib
+from typing import Any, TYPE_CHECKING
 
-from ._parsing import parse  # noqa: F401
+if TYPE_CHECKING:
+    from ._cache import ParseCache  # noqa: F401
+    from ._parsing import (  # noqa: F401
+        compile_file,
+        iterparse,
+        parse,
+        parse_buffer,
+        parse_bytes,
+        parse_many,
+        parse_multiple,
+        ParseResult,
+    )
+
+# Resolved on first access, so loading compiled files or a shared index does not load lxml.
+_LAZY_ATTRIBUTES = {
+    'ParseCache': '._cache',
+    'compile_file': '._parsing',
+    'iterparse': '._parsing',
+    'parse': '._parsing',
+    'parse_buffer': '._parsing',
+    'parse_bytes': '._parsing',
+    'parse_many': '._parsing',
+    'parse_multiple': '._parsing',
+    'ParseResult': '._parsing',
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    else:
+        # Submodules such as nodl._parsing._parsing, not imported by the package any more.
+        try:
+            value = importlib.import_module(f'.{name}', __name__)
+        except ModuleNotFoundError as e:
+            if e.name != f'{__name__}.{name}':
+                raise
+            raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    globals()[name] = value
+    return value
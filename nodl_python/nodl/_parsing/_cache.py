@@ -0,0 +1,140 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import os
+from pathlib import Path
+import pickle
+import stat as stat_module
+import time
+from typing import List, Optional, Union
+
+from nodl import _stats
+from nodl._util import write_atomic
+from nodl.types import Node
+
+
+# Bump whenever the pickled layout of the NoDL types changes.
+_CACHE_FORMAT_VERSION = 2
+
+# Files modified this close to being cached may be rewritten within the same mtime tick,
+# so their content digest is rechecked instead of trusting mtime and size.
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def default_cache_directory() -> Path:
+    """Return the default cache directory, honouring $XDG_CACHE_HOME."""
+    cache_home = os.environ.get('XDG_CACHE_HOME')
+    return (Path(cache_home) if cache_home else Path.home() / '.cache') / 'nodl'
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _is_trusted(entry_stat: os.stat_result) -> bool:
+    """Return whether an entry is owned by the current user and writable by nobody else."""
+    if hasattr(os, 'getuid') and entry_stat.st_uid != os.getuid():
+        return False
+    return not entry_stat.st_mode & (stat_module.S_IWGRP | stat_module.S_IWOTH)
+
+
+class ParseCache:
+    """Persistent cache of parsed NoDL files.
+
+    Entries are keyed by file path and stamped with the file's mtime, size and content digest.
+    A lookup for an unchanged file costs one stat call and one unpickle; a file whose stat
+    changed but whose content did not is revalidated by digest and refreshed.
+    Entries are written atomically, so several processes can share one directory.
+
+    Entries are pickles, so the directory is created accessible to its owner only and entries
+    not owned by the current user, or writable by anyone else, are treated as misses instead
+    of being loaded.
+    """
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None) -> None:
+        """Create a cache stored in directory, defaulting to $XDG_CACHE_HOME/nodl."""
+        self.directory = Path(directory) if directory else default_cache_directory()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / (hashlib.sha1(key.encode()).hexdigest() + '.pickle')
+
+    @_stats.timed('cache.get')
+    def get(self, path: Path) -> Optional[List[Node]]:
+        """Return the cached nodes for path, or None if absent or stale."""
+        key = os.path.abspath(path)
+        try:
+            stat = os.stat(key)
+            with self._entry_path(key).open('rb') as entry_file:
+                if not _is_trusted(os.fstat(entry_file.fileno())):
+                    self.misses += 1
+                    return None
+                version, entry_key, mtime_ns, size, digest, racy, nodes = pickle.load(entry_file)
+        except Exception:
+            # Missing, corrupt or incompatible entries are all plain misses.
+            self.misses += 1
+            return None
+
+        if version != _CACHE_FORMAT_VERSION or entry_key != key:
+            self.misses += 1
+            return None
+        if racy or (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+            try:
+                data = Path(key).read_bytes()
+            except OSError:
+                self.misses += 1
+                return None
+            if _digest(data) != digest:
+                self.misses += 1
+                return None
+            self.put(path, stat, data, nodes)
+
+        self.hits += 1
+        return nodes
+
+    @_stats.timed('cache.put')
+    def put(self, path: Path, stat: os.stat_result, data: bytes, nodes: List[Node]) -> None:
+        """Store nodes parsed from data, the content of path when it had the given stat."""
+        key = os.path.abspath(path)
+        racy = time.time_ns() - stat.st_mtime_ns < _RACY_WINDOW_NS
+        entry = (
+            _CACHE_FORMAT_VERSION,
+            key,
+            stat.st_mtime_ns,
+            stat.st_size,
+            _digest(data),
+            racy,
+            nodes,
+        )
+        # The cache is an optimisation; an unwritable directory must not break parsing.
+        try:
+            payload = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        except pickle.PicklingError:
+            return
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        except OSError:
+            return
+        # Readers see either the old or the new entry, never a partial one.
+        write_atomic(self._entry_path(key), payload)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache directory."""
+        for entry_path in self.directory.glob('*.pickle'):
+            try:
+                entry_path.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,319 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compiled NoDL files, loaded without parsing or validating XML.
+
+A compiled file sits next to its source, foo.nodl.xml compiling to foo.nodl.bin, and holds:
+
+- a header: magic, format version, flags, the mtime, size and SHA-256 digest of the source,
+  and the size and CRC-32 of the payload, little-endian
+- the payload: every distinct string of the document, NUL separated and UTF-8 encoded, then
+  the nodes as a flat array of little-endian uint32, string indexes and counts
+
+A compiled file is only used while the stat of its source matches the header. Sources modified
+shortly before being compiled may change again within the same mtime tick, so their digest is
+rechecked instead, until a check passes once that tick is over and the header is rewritten to
+trust the stat again.
+"""
+
+from array import array
+import functools
+import os
+from pathlib import Path
+import struct
+import sys
+import time
+from typing import Any, Dict, List, Optional, Union
+import zlib
+
+from nodl import _stats
+from nodl._parsing._cache import _digest, _RACY_WINDOW_NS
+from nodl._util import FILE_EXTENSION, write_atomic
+from nodl.types import (
+    Action,
+    Node,
+    Parameter,
+    PubSubRole,
+    ServerClientRole,
+    Service,
+    Topic,
+)
+
+
+COMPILED_EXTENSION = '.nodl.bin'
+
+_MAGIC = b'NODLBIN\0'
+# Bump whenever the layout of compiled files changes.
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<8sHHqq32sII')
+_FLAG_RACY = 0x1
+
+_SERVER_CLIENT_ROLES = (ServerClientRole.SERVER, ServerClientRole.CLIENT, ServerClientRole.BOTH)
+_PUB_SUB_ROLES = (PubSubRole.PUBLISHER, PubSubRole.SUBSCRIPTION, PubSubRole.BOTH)
+_SERVER_CLIENT_CODES = {role: code for code, role in enumerate(_SERVER_CLIENT_ROLES)}
+_PUB_SUB_CODES = {role: code for code, role in enumerate(_PUB_SUB_ROLES)}
+_INTERFACE_FIELDS = frozenset(('actions', 'parameters', 'services', 'topics'))
+
+
+def _uint32_array() -> array:
+    records = array('I')
+    if records.itemsize != 4:
+        records = array('L')
+    return records
+
+
+def _compiled_name(path: str) -> str:
+    if path.endswith(FILE_EXTENSION):
+        path = path[: -len(FILE_EXTENSION)]
+    return path + COMPILED_EXTENSION
+
+
+def compiled_path(path: Union[str, Path]) -> Path:
+    """Return where the compiled counterpart of a NoDL file is stored."""
+    return Path(_compiled_name(os.fspath(path)))
+
+
+def _encode(nodes: List[Node]) -> bytes:
+    strings: Dict[str, int] = {}
+
+    def index(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    records = _uint32_array()
+    records.append(len(nodes))
+    for node in nodes:
+        records.extend((index(node.name), index(node.executable)))
+        records.extend(
+            (len(node.actions), len(node.parameters), len(node.services), len(node.topics))
+        )
+        for action in node.actions.values():
+            code = _SERVER_CLIENT_CODES[action.role]  # type: ignore
+            records.extend((index(action.name), index(action.type), code))
+        for parameter in node.parameters.values():
+            records.extend((index(parameter.name), index(parameter.type)))
+        for service in node.services.values():
+            code = _SERVER_CLIENT_CODES[service.role]  # type: ignore
+            records.extend((index(service.name), index(service.type), code))
+        for topic in node.topics.values():
+            code = _PUB_SUB_CODES[topic.role]  # type: ignore
+            records.extend((index(topic.name), index(topic.type), code))
+    if sys.byteorder == 'big':
+        records.byteswap()
+
+    string_table = '\0'.join(strings).encode()
+    return struct.pack('<I', len(string_table)) + string_table + records.tobytes()
+
+
+def _build_interfaces(node: Node, strings: List[str], records: List[int], position: int) -> int:
+    """Fill in the interfaces of node from the records at position, returning where they end."""
+    # Objects are filled in directly: this is the hot path, and the content was validated
+    # when it was compiled.
+    new = object.__new__
+    server_client_roles = _SERVER_CLIENT_ROLES
+    actions, parameters, services, topics = records[position:position + 4]
+    position += 4
+
+    interfaces: Dict[str, Any] = {}
+    for _ in range(actions):
+        action = new(Action)
+        action.name = name = strings[records[position]]
+        action.type = strings[records[position + 1]]
+        action.role = server_client_roles[records[position + 2]]
+        interfaces[name] = action
+        position += 3
+    node.actions = interfaces
+
+    interfaces = {}
+    for _ in range(parameters):
+        parameter = new(Parameter)
+        parameter.name = name = strings[records[position]]
+        parameter.type = strings[records[position + 1]]
+        interfaces[name] = parameter
+        position += 2
+    node.parameters = interfaces
+
+    interfaces = {}
+    for _ in range(services):
+        service = new(Service)
+        service.name = name = strings[records[position]]
+        service.type = strings[records[position + 1]]
+        service.role = server_client_roles[records[position + 2]]
+        interfaces[name] = service
+        position += 3
+    node.services = interfaces
+
+    pub_sub_roles = _PUB_SUB_ROLES
+    interfaces = {}
+    for _ in range(topics):
+        topic = new(Topic)
+        topic.name = name = strings[records[position]]
+        topic.type = strings[records[position + 1]]
+        topic.role = pub_sub_roles[records[position + 2]]
+        interfaces[name] = topic
+        position += 3
+    node.topics = interfaces
+    return position
+
+
+class _LazyCompiledNode(Node):
+    """Node whose interfaces are built from the records of a compiled file on first access."""
+
+    __slots__ = ('_records', '_position', '_strings')
+
+    _records: List[int]
+    _position: int
+    _strings: List[str]
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in _INTERFACE_FIELDS:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        _build_interfaces(self, self._strings, self._records, self._position)
+        # Drop the references so the file's records can be freed once every node is built.
+        self._strings = []
+        self._records = []
+        return getattr(self, name)
+
+    def __reduce__(self) -> Any:
+        restore = functools.partial(
+            Node,
+            name=self.name,
+            executable=self.executable,
+            actions=list(self.actions.values()),
+            parameters=list(self.parameters.values()),
+            services=list(self.services.values()),
+            topics=list(self.topics.values()),
+        )
+        return restore, ()
+
+
+def _decode(payload: bytes, *, lazy: bool = False) -> List[Node]:
+    (string_table_size,) = struct.unpack_from('<I', payload)
+    strings = payload[4:4 + string_table_size].decode().split('\0')
+    array_records = _uint32_array()
+    array_records.frombytes(payload[4 + string_table_size:])
+    if sys.byteorder == 'big':
+        array_records.byteswap()
+    records = array_records.tolist()
+
+    nodes: List[Node] = []
+    position = 1
+    for _ in range(records[0]):
+        name = strings[records[position]]
+        executable = strings[records[position + 1]]
+        position += 2
+        node: Node
+        if lazy:
+            node = lazy_node = object.__new__(_LazyCompiledNode)
+            lazy_node._strings = strings
+            lazy_node._records = records
+            lazy_node._position = position
+            actions, parameters, services, topics = records[position:position + 4]
+            position += 4 + 3 * actions + 2 * parameters + 3 * services + 3 * topics
+        else:
+            node = object.__new__(Node)
+            position = _build_interfaces(node, strings, records, position)
+        node.name = name
+        node.executable = executable
+        nodes.append(node)
+    if position != len(records):
+        raise ValueError('Trailing records')
+    return nodes
+
+
+def dumps(nodes: List[Node], *, stat: os.stat_result, data: bytes) -> bytes:
+    """Return the compiled form of nodes, parsed from data when its file had the given stat."""
+    flags = _FLAG_RACY if time.time_ns() - stat.st_mtime_ns < _RACY_WINDOW_NS else 0
+    payload = _encode(nodes)
+    header = _HEADER.pack(
+        _MAGIC,
+        _FORMAT_VERSION,
+        flags,
+        stat.st_mtime_ns,
+        stat.st_size,
+        bytes.fromhex(_digest(data)),
+        len(payload),
+        zlib.crc32(payload),
+    )
+    return header + payload
+
+
+def write_compiled(path: Union[str, Path], nodes: List[Node], *, stat: os.stat_result,
+                   data: bytes) -> Path:
+    """Compile nodes parsed from the NoDL file at path, see dumps.
+
+    The compiled file is given the permissions of its source, so whoever can read the source
+    can load it.
+
+    :raises OSError: if the compiled file could not be written
+    :return: location of the compiled file
+    :rtype: Path
+    """
+    destination = compiled_path(path)
+    content = dumps(nodes, stat=stat, data=data)
+    if not write_atomic(destination, content, mode=stat.st_mode & 0o777):
+        raise OSError(f'Could not write {destination}')
+    return destination
+
+
+def load_compiled(path: Union[str, Path], *, lazy: bool = False) -> Optional[List[Node]]:
+    """Return the nodes of a NoDL file from its compiled counterpart, if it is up to date.
+
+    :param path: location of the NoDL file
+    :type path: Union[str, Path]
+    :param lazy: defer building the interfaces of each node until they are first accessed
+    :type lazy: bool
+    :return: nodes of the file, or None if there is no usable compiled file
+    :rtype: Optional[List[Node]]
+    """
+    path = os.fspath(path)
+    compiled_name = _compiled_name(path)
+    try:
+        with open(compiled_name, 'rb') as compiled_file:
+            content = compiled_file.read()
+            compiled_mode = os.fstat(compiled_file.fileno()).st_mode & 0o777
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if len(content) < _HEADER.size:
+        return None
+    magic, version, flags, mtime_ns, size, digest, payload_size, crc = _HEADER.unpack_from(
+        content
+    )
+    if magic != _MAGIC or version != _FORMAT_VERSION:
+        return None
+    if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+        return None
+    payload = content[_HEADER.size:]
+    if len(payload) != payload_size or zlib.crc32(payload) != crc:
+        return None
+    if flags & _FLAG_RACY:
+        try:
+            with open(path, 'rb') as source_file:
+                if bytes.fromhex(_digest(source_file.read())) != digest:
+                    return None
+        except OSError:
+            return None
+        if time.time_ns() - mtime_ns >= _RACY_WINDOW_NS:
+            # The source can no longer change without its mtime changing, so later loads can
+            # trust its stat. Failing to rewrite, e.g. in a read-only prefix, is harmless.
+            header = _HEADER.pack(
+                magic, version, flags & ~_FLAG_RACY, mtime_ns, size, digest, payload_size, crc
+            )
+            write_atomic(Path(compiled_name), header + payload, mode=compiled_mode)
+    _stats.count_bytes('parse.compiled', len(content))
+    try:
+        with _stats.stage('parse.compiled'):
+            return _decode(payload, lazy=lazy)
+    except (IndexError, ValueError, struct.error):
+        return None
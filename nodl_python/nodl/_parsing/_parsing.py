@@ -12,16 +12,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+import functools
+import mmap
+import os
 from pathlib import Path
-from typing import Dict, IO, Iterable, List, Union
+from typing import Deque, Dict, IO, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
 from lxml import etree
+from nodl import _stats
 from nodl._parsing import _v1 as parse_v1
+from nodl._parsing._cache import ParseCache
+from nodl._parsing._compiled import load_compiled, write_compiled
 from nodl._parsing._schemas import interface_schema
 from nodl.errors import (
     DuplicateNodeError,
     InvalidNoDLDocumentError,
     InvalidXMLError,
+    NoDLError,
     UnsupportedInterfaceError,
 )
 from nodl.types import Node
@@ -29,63 +38,359 @@ from nodl.types import Node
 
 NODL_MAX_SUPPORTED_VERSION = 1
 
+_SUPPORTED_VERSIONS = frozenset(str(v) for v in range(1, NODL_MAX_SUPPORTED_VERSION + 1))
 
-def _parse_interface(interface: etree._Element) -> List[Node]:
+_interface_version = etree.XPath('string(/interface/@version)')
+
+
+def _parse_interface(
+    interface: etree._Element, *, lazy: bool = False, native: bool = False
+) -> List[Node]:
     """Parse out all nodes from an interface element."""
     if interface.get('version') == '1':
-        return parse_v1.parse(interface)
+        return parse_v1.parse(interface, lazy=lazy, native=native)
     else:
         raise UnsupportedInterfaceError(interface.get('version'), NODL_MAX_SUPPORTED_VERSION)
 
 
-def _parse_element_tree(element_tree: etree._ElementTree) -> List[Node]:
+@_stats.timed('parse.validate_interface')
+def _assert_valid_interface(element_tree: etree._ElementTree) -> None:
+    """Validate a tree against the version-agnostic interface schema."""
+    try:
+        interface_schema().assertValid(element_tree)
+    except etree.DocumentInvalid as e:
+        raise InvalidNoDLDocumentError(e)
+
+
+def _parse_element_tree(
+    element_tree: etree._ElementTree, *, lazy: bool = False, native: bool = False
+) -> List[Node]:
     """Extract an interface element from an ElementTree if present.
 
+    Documents declaring a supported version are validated once, against the schema of that
+    version. The interface schema is only consulted to report errors, so diagnostics are the
+    same as when every document was validated against both.
+
     :param element_tree: parsed xml tree to operate on
     :type element_tree: etree._ElementTree
+    :param lazy: defer parsing the interfaces of each node until they are first accessed
+    :type lazy: bool
+    :param native: validate with the built-in validator rather than against the XSD with lxml
+    :type native: bool
     :raises InvalidNoDLDocumentError: if tree does not adhere to schema
     :return: List of NoDL nodes present in the xml tree.
     :rtype: List[Node]
     """
+    if _interface_version(element_tree) not in _SUPPORTED_VERSIONS:
+        _assert_valid_interface(element_tree)
+        return _parse_interface(element_tree.getroot(), lazy=lazy, native=native)
     try:
-        interface_schema().assertValid(element_tree)
-    except etree.DocumentInvalid as e:
-        raise InvalidNoDLDocumentError(e)
-    return _parse_interface(element_tree.getroot())
+        return _parse_interface(element_tree.getroot(), lazy=lazy, native=native)
+    except InvalidNoDLDocumentError:
+        # Errors caught by the interface schema take precedence, as they used to.
+        _assert_valid_interface(element_tree)
+        raise
+
+
+def _source(path: Union[str, Path, IO]) -> Union[str, IO]:
+    """Turn a path into the resolved filename lxml expects, passing file objects through."""
+    if isinstance(path, str):
+        path = Path(path)
+    if isinstance(path, Path):
+        return str(path.resolve())
+    return path
+
+
+def _read_and_parse(
+    path: Path, *, native: bool = False
+) -> Tuple[os.stat_result, bytes, List[Node]]:
+    """Parse a NoDL file, returning its stat and content along with its nodes."""
+    # Stat before reading, so a concurrent edit can only make what is derived look stale.
+    stat = path.stat()
+    try:
+        with _stats.stage('parse.xml'):
+            data = path.read_bytes()
+            element = etree.fromstring(data, base_url=str(path.resolve()))
+    except etree.XMLSyntaxError as e:
+        raise InvalidXMLError(e)
+    _stats.count_bytes('parse.xml', len(data))
+    return stat, data, _parse_element_tree(element.getroottree(), native=native)
+
+
+def _parse_cached(path: Path, cache: ParseCache, *, native: bool = False) -> List[Node]:
+    """Parse a NoDL file through a persistent cache."""
+    nodes = cache.get(path)
+    if nodes is not None:
+        return nodes
+
+    stat, data, nodes = _read_and_parse(path, native=native)
+    cache.put(path, stat, data, nodes)
+    return nodes
+
 
+def compile_file(path: Union[str, Path], *, native: bool = False) -> Path:
+    """Validate a NoDL file and write its compiled counterpart next to it.
 
-def parse(path: Union[str, Path, IO]) -> List[Node]:
+    Compiled files are named after their source, foo.nodl.xml compiling to foo.nodl.bin. parse
+    loads them instead of the XML for as long as the source is unchanged.
+
+    :param path: location of the NoDL file
+    :type path: Union[str, Path]
+    :param native: validate with the built-in validator rather than against the XSD schemas
+    :type native: bool
+    :raises InvalidNoDLDocumentError: if the file does not adhere to schema
+    :raises OSError: if the file could not be read or the compiled file written
+    :return: location of the compiled file
+    :rtype: Path
+    """
+    path = Path(path)
+    stat, data, nodes = _read_and_parse(path, native=native)
+    return write_compiled(path, nodes, stat=stat, data=data)
+
+
+def parse(
+    path: Union[str, Path, IO],
+    *,
+    cache: Optional[ParseCache] = None,
+    lazy: bool = False,
+    strict: bool = False,
+    native: bool = False,
+) -> List[Node]:
     """Parse the nodes out of a given NoDL file.
 
+    The whole document is validated up front either way. With lazy, only the name and
+    executable of each node are read immediately; its actions, parameters, services and topics
+    are built from the retained element when first accessed, which makes listing nodes or
+    looking one up much cheaper. Nodes served from a cache are always fully parsed.
+
+    A file path whose compiled counterpart, see compile_file, is up to date is loaded from it,
+    skipping XML parsing and validation; the XML is parsed as usual when the compiled file is
+    missing, stale or corrupt, and always with strict. Given a cache, the cache is consulted
+    instead of compiled files, so that a hit costs a single stat call.
+
+    Documents are validated against the XSD schemas with lxml. With native, they are validated
+    by a built-in validator as their nodes are built instead, which enforces the same rules and
+    raises the same errors.
+
     :param path: location of file, or opened file object
     :type path: Union[str, Path, IO]
+    :param cache: persistent cache to consult for file paths, defaults to no caching
+    :type cache: Optional[ParseCache]
+    :param lazy: defer parsing the interfaces of each node until they are first accessed
+    :type lazy: bool
+    :param strict: always parse and validate the XML, ignoring compiled files
+    :type strict: bool
+    :param native: validate with the built-in validator rather than against the XSD schemas
+    :type native: bool
     :raises InvalidNoDLDocumentError: raised if tree does not adhere to schema
     :return: List of NoDL nodes present in the file
     :rtype: List[Node]
     """
     if isinstance(path, str):
         path = Path(path)
-    if isinstance(path, Path):
-        path = str(path.resolve())
+    if cache is not None and isinstance(path, Path):
+        return _parse_cached(path, cache, native=native)
+    if isinstance(path, Path) and not strict:
+        nodes = load_compiled(path, lazy=lazy)
+        if nodes is not None:
+            return nodes
+    try:
+        with _stats.stage('parse.xml'):
+            element_tree = etree.parse(_source(path))
+    except etree.XMLSyntaxError as e:
+        raise InvalidXMLError(e)
+    if _stats.is_enabled() and isinstance(path, Path):
+        _stats.count_bytes('parse.xml', path.stat().st_size)
+
+    return _parse_element_tree(element_tree, lazy=lazy, native=native)
+
+
+_Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def parse_bytes(
+    data: _Buffer, *, filename: str = '<bytes>', lazy: bool = False, native: bool = False
+) -> List[Node]:
+    """Parse the nodes out of a NoDL document held in memory.
+
+    Any object supporting the buffer protocol is accepted, such as bytes, bytearray,
+    memoryview or a mmap of a file, and parsed in place without being copied first. Documents
+    are validated as by parse, and errors refer to the document as filename.
+
+    :param data: content of the document, encoded as declared in it or else as UTF-8
+    :type data: Union[bytes, bytearray, memoryview, mmap.mmap]
+    :param filename: name given to the document in errors, e.g. its path in an archive
+    :type filename: str
+    :param lazy: defer parsing the interfaces of each node until they are first accessed
+    :type lazy: bool
+    :param native: validate with the built-in validator rather than against the XSD schemas
+    :type native: bool
+    :raises TypeError: if data is a str rather than a buffer
+    :raises InvalidNoDLDocumentError: raised if tree does not adhere to schema
+    :return: List of NoDL nodes present in the document
+    :rtype: List[Node]
+    """
+    if isinstance(data, str):
+        raise TypeError('parse_bytes expects a buffer, parse reads paths given as str')
     try:
-        element_tree = etree.parse(path)
+        with _stats.stage('parse.xml'):
+            try:
+                element = etree.fromstring(data, base_url=filename)
+            except (TypeError, ValueError):
+                # Versions of lxml before 5.0 only parse bytes and str.
+                element = etree.fromstring(bytes(data), base_url=filename)
     except etree.XMLSyntaxError as e:
         raise InvalidXMLError(e)
+    if _stats.is_enabled():
+        _stats.count_bytes('parse.xml', memoryview(data).nbytes)
+    return _parse_element_tree(element.getroottree(), lazy=lazy, native=native)
+
+
+# Same as parse_bytes, for callers holding memoryviews or mmaps rather than bytes.
+parse_buffer = parse_bytes
 
-    return _parse_element_tree(element_tree)
 
+def _is_blank(text: Optional[str]) -> bool:
+    return not text or text.isspace()
 
-def _parse_multiple(paths: Iterable[Union[str, Path, IO]]) -> List[Node]:
+
+def _iterparse_events(
+    context: etree.iterparse, *, executable: Optional[str] = None, native: bool = False
+) -> Iterator[Node]:
+    """Validate and build nodes from iterparse start/end events as their elements complete.
+
+    Each node is validated on its own against the v1 schema. Only the most recent node is kept
+    in the tree, so that a structural problem at the interface level can be reported by reading
+    and validating the rest of the document, raising the same error as parse.
+    If executable is given, other nodes are skipped without being validated or built.
+    """
+    _, root = next(context)
+    if root.tag != 'interface' or root.get('version') != '1' or len(root.attrib) != 1:
+        for _ in context:
+            pass
+        nodes = _parse_element_tree(root.getroottree(), native=native)
+        yield from (
+            node for node in nodes if executable is None or node.executable == executable
+        )
+        return
+
+    depth = 0
+    previous = None
+    for event, element in context:
+        if event == 'start':
+            depth += 1
+            # Text preceding a child of the interface is complete once the child starts.
+            if depth == 1 and not _is_blank(root.text if previous is None else previous.tail):
+                break
+            continue
+
+        depth -= 1
+        if depth > 0:
+            continue
+        if depth < 0:
+            if previous is None or not _is_blank(previous.tail):
+                break
+            return
+        if element.tag != 'node':
+            break
+
+        if previous is not None:
+            root.remove(previous)
+        previous = element
+        if executable is None or element.get('executable') == executable:
+            yield parse_v1.parse_node(element, native=native)
+
+    # Only reached on a structural error, which validating the remaining tree always reports.
+    for _ in context:
+        pass
+    _parse_element_tree(root.getroottree(), native=native)
+
+
+def iterparse(path: Union[str, Path, IO], *, native: bool = False) -> Iterator[Node]:
+    """Parse the nodes out of a given NoDL file one at a time.
+
+    Nodes are validated and yielded as soon as their element has been read, and their elements
+    are discarded afterwards, so memory use does not grow with the number of nodes in the file.
+    Errors are raised once reached, after the nodes preceding them have been yielded.
+
+    :param path: location of file, or opened file object
+    :type path: Union[str, Path, IO]
+    :param native: validate with the built-in validator rather than against the XSD schemas
+    :type native: bool
+    :raises InvalidNoDLDocumentError: raised if tree does not adhere to schema
+    :return: Iterator over the NoDL nodes present in the file
+    :rtype: Iterator[Node]
+    """
+    return _iterparse(path, native=native)
+
+
+def _iterparse(
+    path: Union[str, Path, IO], *, executable: Optional[str] = None, native: bool = False
+) -> Iterator[Node]:
+    context = etree.iterparse(_source(path), events=('start', 'end'))
+    try:
+        yield from _iterparse_events(context, executable=executable, native=native)
+    except etree.XMLSyntaxError as e:
+        raise InvalidXMLError(e)
+
+
+@_stats.timed('parse.find_node')
+def _find_node(path: Union[str, Path, IO], executable: str) -> Optional[Node]:
+    """Return the node of a NoDL file associated with executable, or None.
+
+    The file is streamed and reading stops at the first match. Only that node is validated and
+    built, so errors in other nodes of the file go unnoticed. An up to date compiled file is
+    used instead of the XML.
+    """
+    if isinstance(path, (str, Path)):
+        nodes = load_compiled(path, lazy=True)
+        if nodes is not None:
+            return next((node for node in nodes if node.executable == executable), None)
+    return next(_iterparse(path, executable=executable), None)
+
+
+def _parse_multiple(
+    paths: Iterable[Union[str, Path, IO]],
+    *,
+    cache: Optional[ParseCache] = None,
+    executor: Optional[Executor] = None,
+    max_workers: Optional[int] = None,
+    lazy: bool = False,
+    strict: bool = False,
+    native: bool = False,
+) -> List[Node]:
     """Merge nodl files into one large node list.
 
     :param paths: List of nodl files to parse
     :type paths: Iterable[Union[str, Path, IO]]
+    :param cache: persistent cache to consult for file paths, defaults to no caching
+    :type cache: Optional[ParseCache]
+    :param executor: executor to parse the files on, defaults to parsing them serially
+    :type executor: Optional[Executor]
+    :param max_workers: number of threads to parse the files on when no executor is given
+    :type max_workers: Optional[int]
+    :param lazy: defer parsing the interfaces of each node until they are first accessed
+    :type lazy: bool
+    :param strict: always parse and validate the XML, ignoring compiled files
+    :type strict: bool
+    :param native: validate with the built-in validator rather than against the XSD schemas
+    :type native: bool
     :raises DuplicateNodeError: if node is defined multiple times
     :raises InvalidNoDLDocumentError: if doc does not adhere to schema
     :return: flat list of nodes provided by the documents
     :rtype: List[Node]
     """
-    node_lists = [parse(path) for path in paths]
+    parse_path = functools.partial(parse, cache=cache, lazy=lazy, strict=strict, native=native)
+    if executor is not None:
+        node_lists = list(executor.map(parse_path, paths))
+    elif max_workers is not None and max_workers > 1:
+        # lxml releases the GIL while parsing and validating, so threads overlap usefully.
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            node_lists = list(pool.map(parse_path, paths))
+    else:
+        node_lists = [parse_path(path) for path in paths]
+
+    # Merging happens in input order once every file is parsed, exactly as in the serial case.
     combined_dict: Dict[str, Node] = {}
     for node_list in node_lists:
         for node in node_list:
@@ -93,3 +398,145 @@ def _parse_multiple(paths: Iterable[Union[str, Path, IO]]) -> List[Node]:
                 raise DuplicateNodeError(node=node)
             combined_dict[node.executable] = node
     return list(combined_dict.values())
+
+
+def parse_multiple(
+    paths: Iterable[Union[str, Path, IO]],
+    *,
+    cache: Optional[ParseCache] = None,
+    executor: Optional[Executor] = None,
+    max_workers: Optional[int] = None,
+    lazy: bool = False,
+    strict: bool = False,
+    native: bool = False,
+) -> List[Node]:
+    """Parse several NoDL files, optionally concurrently, into one list of nodes.
+
+    Files are parsed on executor if given, else on a pool of max_workers threads, else serially.
+    Results are merged in the order of paths whichever way they were parsed, so the output and
+    the DuplicateNodeError raised for an executable defined twice do not depend on scheduling.
+    A process pool executor requires paths rather than file objects.
+
+    :param paths: nodl files to parse
+    :type paths: Iterable[Union[str, Path, IO]]
+    :param cache: persistent cache to consult for file paths, defaults to no caching
+    :type cache: Optional[ParseCache]
+    :param executor: executor to parse the files on, defaults to parsing them serially
+    :type executor: Optional[Executor]
+    :param max_workers: number of threads to parse the files on when no executor is given
+    :type max_workers: Optional[int]
+    :param lazy: defer parsing the interfaces of each node until they are first accessed
+    :type lazy: bool
+    :param strict: always parse and validate the XML, ignoring compiled files
+    :type strict: bool
+    :param native: validate with the built-in validator rather than against the XSD schemas
+    :type native: bool
+    :raises DuplicateNodeError: if node is defined multiple times
+    :raises InvalidNoDLDocumentError: if doc does not adhere to schema
+    :return: flat list of nodes provided by the documents
+    :rtype: List[Node]
+    """
+    return _parse_multiple(
+        paths,
+        cache=cache,
+        executor=executor,
+        max_workers=max_workers,
+        lazy=lazy,
+        strict=strict,
+        native=native,
+    )
+
+
+class ParseResult(NamedTuple):
+    """Outcome of parsing one source of parse_many."""
+
+    source: Union[str, Path, IO]
+    nodes: List[Node]
+    error: Optional[Exception] = None
+
+
+def _parse_result(
+    source: Union[str, Path, IO],
+    *,
+    cache: Optional[ParseCache] = None,
+    lazy: bool = False,
+    strict: bool = False,
+    native: bool = False,
+) -> ParseResult:
+    try:
+        nodes = parse(source, cache=cache, lazy=lazy, strict=strict, native=native)
+        return ParseResult(source, nodes)
+    except (OSError, NoDLError) as e:
+        return ParseResult(source, [], e)
+
+
+def parse_many(
+    paths: Iterable[Union[str, Path, IO]],
+    *,
+    cache: Optional[ParseCache] = None,
+    executor: Optional[Executor] = None,
+    max_workers: Optional[int] = None,
+    lazy: bool = False,
+    strict: bool = False,
+    native: bool = False,
+) -> Iterator[ParseResult]:
+    """Parse many NoDL files, yielding the nodes or the error of each file in order.
+
+    Unlike parse_multiple, a file failing to parse or to be read does not stop the others:
+    its result carries the error instead of nodes, and nodes are not merged across files.
+    paths is consumed as results are consumed, and at most a few files per worker are parsed
+    ahead, so memory use does not grow with the number of files. Whatever the number of files,
+    each worker thread compiles the schemas once, as validators keep their error log and are
+    not shared between threads, and lxml reuses one parser per thread.
+
+    Files are parsed on executor if given, else on a pool of max_workers threads, else serially.
+
+    :param paths: nodl files to parse
+    :type paths: Iterable[Union[str, Path, IO]]
+    :param cache: persistent cache to consult for file paths, defaults to no caching
+    :type cache: Optional[ParseCache]
+    :param executor: executor to parse the files on, defaults to parsing them serially
+    :type executor: Optional[Executor]
+    :param max_workers: number of threads to parse the files on when no executor is given
+    :type max_workers: Optional[int]
+    :param lazy: defer parsing the interfaces of each node until they are first accessed
+    :type lazy: bool
+    :param strict: always parse and validate the XML, ignoring compiled files
+    :type strict: bool
+    :param native: validate with the built-in validator rather than against the XSD schemas
+    :type native: bool
+    :return: Iterator over the result of each file, in the order of paths
+    :rtype: Iterator[ParseResult]
+    """
+    parse_one = functools.partial(
+        _parse_result, cache=cache, lazy=lazy, strict=strict, native=native
+    )
+    if executor is None and (max_workers is None or max_workers <= 1):
+        return map(parse_one, paths)
+    return _parse_many_concurrently(paths, parse_one, executor=executor, max_workers=max_workers)
+
+
+def _parse_many_concurrently(
+    paths: Iterable[Union[str, Path, IO]],
+    parse_one: 'functools.partial[ParseResult]',
+    *,
+    executor: Optional[Executor],
+    max_workers: Optional[int],
+) -> Iterator[ParseResult]:
+    pool = executor if executor is not None else ThreadPoolExecutor(max_workers=max_workers)
+    # Enough files in flight to keep every worker busy while results are consumed.
+    window = 2 * (max_workers or getattr(pool, '_max_workers', None) or 8)
+    pending: Deque['Future[ParseResult]'] = deque()
+    try:
+        for path in paths:
+            pending.append(pool.submit(parse_one, path))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Stop queued work when the caller stops consuming results early.
+        for future in pending:
+            future.cancel()
+        if executor is None:
+            pool.shutdown()
@@ -13,28 +13,31 @@
 # limitations under the License.
 
 import importlib.resources
+import threading
 
 from lxml import etree
+from nodl import _stats
 
 
-__interface_schema: etree.XMLSchema = None
-__v1_schema: etree.XMLSchema = None
+# Validators keep their error log on the instance, so each thread compiles its own copy.
+__schemas = threading.local()
 
 
 def interface_schema() -> etree.XMLSchema:
-    global __interface_schema
-    if not __interface_schema:
-        __interface_schema = _get_schema('interface.xsd')
-    return __interface_schema
+    schema = getattr(__schemas, 'interface', None)
+    if not schema:
+        schema = __schemas.interface = _get_schema('interface.xsd')
+    return schema
 
 
 def v1_schema() -> etree.XMLSchema:
-    global __v1_schema
-    if not __v1_schema:
-        __v1_schema = _get_schema('v1.xsd')
-    return __v1_schema
+    schema = getattr(__schemas, 'v1', None)
+    if not schema:
+        schema = __schemas.v1 = _get_schema('v1.xsd')
+    return schema
 
 
+@_stats.timed('parse.schema_compile')
 def _get_schema(name: str) -> etree.XMLSchema:
     with importlib.resources.path('nodl._schemas', name) as path:
         return etree.XMLSchema(file=str(path))
@@ -12,11 +12,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List
+import functools
+import sys
+from typing import Any, Dict, List, Optional, Tuple
 
 from lxml import etree
-from nodl import errors
+from nodl import _stats, errors
 from nodl._parsing._schemas import v1_schema
+from nodl._parsing._v1._validation import (
+    check_attributes,
+    check_empty,
+    check_text,
+    missing_child,
+    SchemaRequired,
+    unexpected_child,
+    XML_WHITESPACE,
+)
 from nodl.types import (
     Action,
     Node,
@@ -28,49 +39,153 @@ from nodl.types import (
 )
 
 
-def _parse_action(element: etree._Element) -> Action:
-    """Parse a NoDL action from an xml element."""
-    name = element.get('name')
-    action_type = element.get('type')
+def _intern(value: str) -> str:
+    """Share one string object per distinct name or type, e.g. std_msgs/msg/String."""
+    # Unvalidated elements may lack the attribute altogether.
+    return sys.intern(value) if value is not None else value
+
+
+# Attribute and child declarations of v1.xsd, in schema order as libxml2 reports them.
+_NODE_ATTRIBUTES = ('name', 'executable')
+_NODE_CHILDREN = ('action', 'parameter', 'topic', 'service')
+_PARAMETER_ATTRIBUTES = ('name', 'type')
+_ROLE_ATTRIBUTES = ('name', 'type', 'role')
+
+# Looking roles up by value is several times faster than calling the enum.
+_SERVER_CLIENT_ROLES = {role.value: role for role in ServerClientRole}
+_PUB_SUB_ROLES = {role.value: role for role in PubSubRole}
 
-    role = ServerClientRole(element.get('role'))
 
-    return Action(name=name, action_type=action_type, role=role)
+def _validate_interface(
+    element: etree._Element,
+    attributes: Tuple[str, ...],
+    roles: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Check an action, parameter, service or topic element against v1.xsd.
 
+    Parsers only call this once a cheap test finds something off with an element, to raise
+    the error the schema would.
+    """
+    check_attributes(element, attributes, enumerations={'role': tuple(roles)} if roles else None)
+    check_empty(element)
 
-def _parse_parameter(element: etree._Element) -> Parameter:
+
+def _parse_action(element: etree._Element, *, validate: bool = False) -> Action:
+    """Parse a NoDL action from an xml element."""
+    name = _intern(element.get('name'))
+    action_type = _intern(element.get('type'))
+    role = _SERVER_CLIENT_ROLES.get(element.get('role'))
+    if validate and (
+        role is None
+        or name is None
+        or action_type is None
+        or len(element.attrib) != 3
+        or element.text is not None
+        or len(element)
+    ):
+        _validate_interface(element, _ROLE_ATTRIBUTES, _SERVER_CLIENT_ROLES)
+
+    return Action(
+        name=name, action_type=action_type, role=role or ServerClientRole(element.get('role'))
+    )
+
+
+def _parse_parameter(element: etree._Element, *, validate: bool = False) -> Parameter:
     """Parse a NoDL parameter from an xml element."""
-    return Parameter(name=element.get('name'), parameter_type=element.get('type'))
+    name = _intern(element.get('name'))
+    parameter_type = _intern(element.get('type'))
+    if validate and (
+        name is None
+        or parameter_type is None
+        or len(element.attrib) != 2
+        or element.text is not None
+        or len(element)
+    ):
+        _validate_interface(element, _PARAMETER_ATTRIBUTES)
 
+    return Parameter(name=name, parameter_type=parameter_type)
 
-def _parse_service(element: etree._Element) -> Service:
-    """Parse a NoDL service from an xml element."""
-    name = element.get('name')
-    service_type = element.get('type')
 
-    role = ServerClientRole(element.get('role'))
+def _parse_service(element: etree._Element, *, validate: bool = False) -> Service:
+    """Parse a NoDL service from an xml element."""
+    name = _intern(element.get('name'))
+    service_type = _intern(element.get('type'))
+    role = _SERVER_CLIENT_ROLES.get(element.get('role'))
+    if validate and (
+        role is None
+        or name is None
+        or service_type is None
+        or len(element.attrib) != 3
+        or element.text is not None
+        or len(element)
+    ):
+        _validate_interface(element, _ROLE_ATTRIBUTES, _SERVER_CLIENT_ROLES)
 
-    return Service(name=name, service_type=service_type, role=role)
+    return Service(
+        name=name, service_type=service_type, role=role or ServerClientRole(element.get('role'))
+    )
 
 
-def _parse_topic(element: etree._Element) -> Topic:
+def _parse_topic(element: etree._Element, *, validate: bool = False) -> Topic:
     """Parse a NoDL topic from an xml element."""
-    name = element.get('name')
-    message_type = element.get('type')
+    name = _intern(element.get('name'))
+    message_type = _intern(element.get('type'))
+    role = _PUB_SUB_ROLES.get(element.get('role'))
+    if validate and (
+        role is None
+        or name is None
+        or message_type is None
+        or len(element.attrib) != 3
+        or element.text is not None
+        or len(element)
+    ):
+        _validate_interface(element, _ROLE_ATTRIBUTES, _PUB_SUB_ROLES)
+
+    return Topic(
+        name=name, message_type=message_type, role=role or PubSubRole(element.get('role'))
+    )
+
 
-    role = PubSubRole(element.get('role'))
+@_stats.timed('v1.build')
+def _parse_nodes(
+    interface: etree._Element, *, lazy: bool = False, validate: bool = False
+) -> List[Node]:
+    """Parse the nodes contained in an interface element and return a list.
 
-    return Topic(name=name, message_type=message_type, role=role)
+    With validate, the interface is checked against the rules of v1.xsd as it is walked.
+    """
+    if not validate:
+        node_elements = [child for child in interface if child.tag == 'node']
+        if lazy:
+            return [_LazyNode(node) for node in node_elements]
+        return [_parse_node(node) for node in node_elements]
 
+    check_attributes(interface, ('version',), fixed={'version': '1'})
+    check_text(interface, interface.text)
+    nodes = []
+    for child in interface:
+        if child.tag == 'node':
+            nodes.append(_parse_node(child, validate=True))
+        elif isinstance(child.tag, str):
+            raise unexpected_child(child, ('node',), first=not nodes)
+        tail = child.tail
+        if tail is not None and tail.strip(XML_WHITESPACE):
+            check_text(interface, tail)
+    if not nodes:
+        raise missing_child(interface, ('node',))
+    return nodes
 
-def _parse_nodes(interface: etree._Element) -> List[Node]:
-    """Parse the nodes contained in an interface element and return a list."""
-    node_elements = [child for child in interface if child.tag == 'node']
-    return [_parse_node(node) for node in node_elements]
 
+def _parse_node(node: etree._Element, *, validate: bool = False) -> Node:
+    """Parse a NoDL node and all the elements it contains from an xml element.
 
-def _parse_node(node: etree._Element) -> Node:
-    """Parse a NoDL node and all the elements it contains from an xml element."""
+    With validate, the node is checked against the rules of v1.xsd while it is built, raising
+    InvalidNoDLDocumentError as the schema would instead of InvalidNodeChildError.
+    """
+    if validate:
+        if len(node.attrib) != 2 or node.get('name') is None or node.get('executable') is None:
+            check_attributes(node, _NODE_ATTRIBUTES)
+        check_text(node, node.text)
     name = node.attrib['name']
     executable = node.attrib['executable']
 
@@ -81,15 +196,27 @@ def _parse_node(node: etree._Element) -> Node:
 
     for child in node:
         if child.tag == 'action':
-            actions.append(_parse_action(child))
+            actions.append(_parse_action(child, validate=validate))
         elif child.tag == 'parameter':
-            parameters.append(_parse_parameter(child))
+            parameters.append(_parse_parameter(child, validate=validate))
         elif child.tag == 'service':
-            services.append(_parse_service(child))
+            services.append(_parse_service(child, validate=validate))
         elif child.tag == 'topic':
-            topics.append(_parse_topic(child))
+            topics.append(_parse_topic(child, validate=validate))
+        elif not isinstance(child.tag, str):
+            # Comments and processing instructions carry no data.
+            pass
+        elif validate:
+            first = not (actions or parameters or services or topics)
+            raise unexpected_child(child, _NODE_CHILDREN, first=first)
         else:
             raise errors.InvalidNodeChildError(child)
+        if validate:
+            tail = child.tail
+            if tail is not None and tail.strip(XML_WHITESPACE):
+                check_text(node, tail)
+    if validate and not (actions or parameters or services or topics):
+        raise missing_child(node, _NODE_CHILDREN)
     return Node(
         name=name,
         executable=executable,
@@ -100,10 +227,94 @@ def _parse_node(node: etree._Element) -> Node:
     )
 
 
-def parse(interface: etree._Element) -> List[Node]:
-    """"""
+_INTERFACE_FIELDS = frozenset(('actions', 'parameters', 'services', 'topics'))
+
+
+class _LazyNode(Node):
+    """Node whose interfaces are parsed from its validated element on first access.
+
+    The interface slots stay unset until then, so __getattr__ is only reached for them and
+    attribute access costs nothing extra once they are parsed.
+    """
+
+    __slots__ = ('_element',)
+
+    def __init__(self, element: etree._Element) -> None:
+        self.name = element.attrib['name']
+        self.executable = element.attrib['executable']
+        self._element: Optional[etree._Element] = element
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in _INTERFACE_FIELDS or self._element is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        node = _parse_node(self._element)
+        self.actions = node.actions
+        self.parameters = node.parameters
+        self.services = node.services
+        self.topics = node.topics
+        # Drop the reference so the document can be freed once every node is parsed.
+        self._element = None
+        return getattr(self, name)
+
+    def __reduce__(self) -> Any:
+        # Elements cannot be pickled, so lazy nodes are pickled as regular nodes.
+        restore = functools.partial(
+            Node,
+            name=self.name,
+            executable=self.executable,
+            actions=list(self.actions.values()),
+            parameters=list(self.parameters.values()),
+            services=list(self.services.values()),
+            topics=list(self.topics.values()),
+        )
+        return restore, ()
+
+
+@_stats.timed('v1.validate_xsd')
+def _assert_valid(element: etree._Element) -> None:
+    """Validate an element against v1.xsd."""
     try:
-        v1_schema().assertValid(interface)
+        v1_schema().assertValid(element)
     except etree.DocumentInvalid as e:
         raise errors.InvalidNoDLDocumentError(e) from e
-    return _parse_nodes(interface)
+
+
+def parse_node(node: etree._Element, *, native: bool = False) -> Node:
+    """Validate a single node element against the v1 rules and parse it.
+
+    :param native: validate with the built-in validator rather than against v1.xsd with lxml
+    """
+    if native and node.tag == 'node':
+        try:
+            return _parse_node(node, validate=True)
+        except SchemaRequired:
+            pass
+    _assert_valid(node)
+    return _parse_node(node)
+
+
+def parse(interface: etree._Element, *, lazy: bool = False, native: bool = False) -> List[Node]:
+    """Validate a v1 interface element and parse the nodes it contains.
+
+    By default the interface is validated against v1.xsd with lxml. With native, it is
+    validated by the built-in validator while the nodes are built, in a single walk; it enforces
+    the rules of v1.xsd and raises the same errors. Documents using xsi attributes, and lazy
+    parses, are validated with the XSD either way.
+
+    :param interface: interface element to operate on
+    :type interface: etree._Element
+    :param lazy: defer parsing the interfaces of each node until they are first accessed
+    :type lazy: bool
+    :param native: validate with the built-in validator rather than against v1.xsd with lxml
+    :type native: bool
+    :raises InvalidNoDLDocumentError: if interface does not adhere to the v1 schema
+    :return: List of NoDL nodes present in the interface
+    :rtype: List[Node]
+    """
+    if native and not lazy and interface.tag == 'interface':
+        try:
+            return _parse_nodes(interface, validate=True)
+        except SchemaRequired:
+            pass
+    _assert_valid(interface)
+    return _parse_nodes(interface, lazy=lazy)
@@ -0,0 +1,158 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Checks enforcing the rules of v1.xsd while elements are walked.
+
+Each check raises the first error libxml2 would report for the element, with the same message,
+file and line, so errors do not depend on which validator was used.
+"""
+
+from typing import List, Mapping, NamedTuple, Optional, Tuple
+
+from lxml import etree
+from nodl import errors
+
+
+_XSI_NAMESPACE = '{http://www.w3.org/2001/XMLSchema-instance}'
+
+XML_WHITESPACE = ' \t\r\n'
+
+
+class SchemaErrorEntry(NamedTuple):
+    """Mirror of the lxml error log entries read by InvalidNoDLDocumentError."""
+
+    filename: str
+    line: int
+    column: int
+    message: str
+
+
+class SchemaViolation:
+    """Counterpart of etree.DocumentInvalid for errors found by the built-in validator."""
+
+    def __init__(self, element: etree._Element, message: str) -> None:
+        filename = element.getroottree().docinfo.URL or '<string>'
+        self.error_log: List[SchemaErrorEntry] = [
+            SchemaErrorEntry(filename, element.sourceline, 0, f"Element '{element.tag}'{message}")
+        ]
+
+    def __str__(self) -> str:
+        return self.error_log[0].message
+
+
+class SchemaRequired(Exception):
+    """Raised for constructs the built-in validator leaves to the XSD, such as xsi attributes."""
+
+
+def _invalid(element: etree._Element, message: str) -> errors.InvalidNoDLDocumentError:
+    return errors.InvalidNoDLDocumentError(SchemaViolation(element, message))
+
+
+def is_blank(text: Optional[str]) -> bool:
+    """Whether text is absent or only made of XML whitespace."""
+    return not text or not text.strip(XML_WHITESPACE)
+
+
+def check_attributes(
+    element: etree._Element,
+    required: Tuple[str, ...],
+    *,
+    enumerations: Optional[Mapping[str, Tuple[str, ...]]] = None,
+    fixed: Optional[Mapping[str, str]] = None,
+) -> None:
+    """Check element only has the required attributes, with values from enumerations or fixed.
+
+    :raises InvalidNoDLDocumentError: if an attribute is unknown, missing or has a bad value
+    """
+    attributes = element.attrib
+    for name, value in attributes.items():
+        if name not in required:
+            if name.startswith(_XSI_NAMESPACE):
+                raise SchemaRequired(name)
+            raise _invalid(
+                element, f", attribute '{name}': The attribute '{name}' is not allowed."
+            )
+        allowed = enumerations.get(name) if enumerations else None
+        if allowed is not None and value not in allowed:
+            raise _invalid(
+                element,
+                f", attribute '{name}': [facet 'enumeration'] The value '{value}' is not an "
+                'element of the set {' + ', '.join(f"'{a}'" for a in allowed) + '}.',
+            )
+        constraint = fixed.get(name) if fixed else None
+        if constraint is not None and value != constraint:
+            raise _invalid(
+                element,
+                f", attribute '{name}': The value '{value}' does not match the fixed value "
+                f"constraint '{constraint}'.",
+            )
+    if len(attributes) != len(required):
+        for name in required:
+            if name not in attributes:
+                raise _invalid(element, f": The attribute '{name}' is required but missing.")
+
+
+_EMPTY_TEXT = ': Character content is not allowed, because the content type is empty.'
+_EMPTY_ELEMENT = ': Element content is not allowed, because the content type is empty.'
+
+
+def check_empty(element: etree._Element) -> None:
+    """Check an element declared with attributes only has no content besides comments.
+
+    :raises InvalidNoDLDocumentError: if the element contains text or elements
+    """
+    if element.text is not None:
+        raise _invalid(element, _EMPTY_TEXT)
+    for child in element:
+        if isinstance(child.tag, str):
+            raise _invalid(element, _EMPTY_ELEMENT)
+        if child.tail is not None:
+            raise _invalid(element, _EMPTY_TEXT)
+
+
+def check_text(element: etree._Element, text: Optional[str]) -> None:
+    """Check text found directly in an element-only element is whitespace.
+
+    :raises InvalidNoDLDocumentError: if it is not
+    """
+    if not is_blank(text):
+        raise _invalid(
+            element,
+            ': Character content other than whitespace is not allowed because the content type '
+            "is 'element-only'.",
+        )
+
+
+def _expected(tags: Tuple[str, ...]) -> str:
+    if len(tags) == 1:
+        return f'( {tags[0]} )'
+    return f'one of ( {", ".join(tags)} )'
+
+
+def unexpected_child(
+    child: etree._Element, expected: Tuple[str, ...], first: bool
+) -> errors.InvalidNoDLDocumentError:
+    """Return the error for a child outside the content model of its parent.
+
+    libxml2 only lists the expected elements while the parent has no valid child yet.
+    """
+    suffix = f' Expected is {_expected(expected)}.' if first else ''
+    return _invalid(child, f': This element is not expected.{suffix}')
+
+
+def missing_child(
+    element: etree._Element, expected: Tuple[str, ...]
+) -> errors.InvalidNoDLDocumentError:
+    """Return the error for an element lacking a mandatory child."""
+    return _invalid(element, f': Missing child element(s). Expected is {_expected(expected)}.')
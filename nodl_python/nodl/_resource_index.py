@@ -0,0 +1,130 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Registration of NoDL files in the ament resource index.
+
+A package registers its NoDL files with a marker file named after the package in the 'nodl'
+resource type, i.e. share/ament_index/resource_index/nodl/<package> in its install prefix.
+The marker lists the package's NoDL files one per line, relative to the package's share
+directory, and may be empty for packages without any.
+
+Packages that do not register are searched by globbing their share directory, so every
+lookup of a package's files goes through find_nodl_files to agree on which files exist.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from ament_index_python.packages import get_package_share_directory, get_packages_with_prefixes
+from ament_index_python.resources import get_resource, get_resources
+
+from nodl._util import FILE_EXTENSION, write_atomic
+
+
+RESOURCE_TYPE = 'nodl'
+
+
+def get_packages_with_nodl() -> Dict[str, str]:
+    """Return the packages registering NoDL files, with the prefix each is installed in.
+
+    This lists the 'nodl' resource type of each prefix of AMENT_PREFIX_PATH and reads no
+    other directory, so packages that do not register their files are not included.
+
+    :return: install prefix by package name
+    :rtype: Dict[str, str]
+    """
+    return get_resources(RESOURCE_TYPE)
+
+
+def get_registered_nodl_files(package_name: str) -> Optional[List[Path]]:
+    """Return the NoDL files a package registers, sorted, or None if it does not register.
+
+    Only the package's marker is read; the files it lists are not checked for existence.
+    """
+    try:
+        content, prefix = get_resource(RESOURCE_TYPE, package_name)
+    except LookupError:
+        return None
+    share_directory = Path(prefix) / 'share' / package_name
+    return sorted(share_directory / line.strip() for line in content.splitlines() if line.strip())
+
+
+def get_nodl_package_prefixes() -> Dict[str, str]:
+    """Return every package that may export NoDL files, with the prefix to find them in.
+
+    Packages registering NoDL files are given the prefix of their marker, so their share
+    directory is the one the marker lists files in; the other packages have to be searched.
+
+    :return: install prefix by package name
+    :rtype: Dict[str, str]
+    """
+    packages = get_packages_with_prefixes()
+    packages.update(get_packages_with_nodl())
+    return packages
+
+
+def find_nodl_files(
+    package_name: str, share_directory: Optional[Union[str, Path]] = None
+) -> List[Path]:
+    """Return the NoDL files of a package, sorted.
+
+    The files a package registers are read from its marker, without listing its share
+    directory, and those missing from it are skipped, as a marker can outlive its files;
+    only packages that do not register are globbed for .nodl.xml files.
+
+    :param package_name: name of the package
+    :type package_name: str
+    :param share_directory: share directory to glob, defaults to the package's in the ament index
+    :type share_directory: Optional[Union[str, Path]]
+    :raises PackageNotFoundError: if the package has to be located and is not found
+    :return: paths of the package's NoDL files
+    :rtype: List[Path]
+    """
+    nodl_paths = get_registered_nodl_files(package_name)
+    if nodl_paths is not None:
+        return [path for path in nodl_paths if path.is_file()]
+    if share_directory is None:
+        share_directory = get_package_share_directory(package_name)
+    return sorted(
+        path for path in Path(share_directory).glob('*' + FILE_EXTENSION) if path.is_file()
+    )
+
+
+def register_nodl_files(
+    prefix: Union[str, Path], package_name: str, file_names: Iterable[str]
+) -> Path:
+    """Write the marker registering the NoDL files of a package installed in prefix.
+
+    :param prefix: install prefix of the package
+    :type prefix: Union[str, Path]
+    :param package_name: name of the package
+    :type package_name: str
+    :param file_names: NoDL files relative to the package's share directory
+    :type file_names: Iterable[str]
+    :raises ValueError: if a file name is absolute, leaves the share directory or has a newline
+    :raises OSError: if the marker could not be written
+    :return: location of the marker, readable by every user
+    :rtype: Path
+    """
+    file_names = sorted(set(file_names))
+    for file_name in file_names:
+        parts = Path(file_name).parts
+        if os.path.isabs(file_name) or '..' in parts or '\n' in file_name or not parts:
+            raise ValueError(f'Invalid NoDL file name {file_name!r} for {package_name}')
+    marker = Path(prefix) / 'share/ament_index/resource_index' / RESOURCE_TYPE / package_name
+    content = ''.join(f'{file_name}\n' for file_name in file_names)
+    if not write_atomic(marker, content.encode(), mode=0o666):
+        raise OSError(f'Could not write {marker}')
+    return marker
@@ -0,0 +1,250 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Read-only index of parsed nodes, memory-mapped and queried in place by many processes."""
+
+import bisect
+import json
+import mmap
+import os
+from pathlib import Path
+import struct
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from nodl._parsing._cache import default_cache_directory
+from nodl._parsing._compiled import _decode, _encode
+from nodl._resource_index import find_nodl_files, get_nodl_package_prefixes
+from nodl._util import write_atomic
+from nodl.errors import NoDLError
+from nodl.types import Node
+
+
+_MAGIC = b'NODLIDX\0'
+# Bump whenever the layout of shared index files changes.
+_FORMAT_VERSION = 1
+# Magic, version, reserved, number of entries, offset and size of the sources.
+_HEADER = struct.Struct('<8sHHIII')
+# Offset and size of the key, offset and size of the node record.
+_ENTRY = struct.Struct('<IIII')
+
+
+def _key(package_name: str, executable_name: str) -> bytes:
+    # UTF-8 preserves code point order, so keys sort like (package, executable) pairs.
+    return f'{package_name}\0{executable_name}'.encode()
+
+
+def _scan_package(package_name: str, share_directory: str) -> Tuple[List[Path], Dict[str, int]]:
+    """Return the NoDL files of a package and the mtimes to detect changes with."""
+    paths = find_nodl_files(package_name, share_directory)
+    mtimes = {share_directory: os.stat(share_directory).st_mtime_ns}
+    mtimes.update((str(path), path.stat().st_mtime_ns) for path in paths)
+    return paths, mtimes
+
+
+def _dumps(nodes: Dict[bytes, Node], sources: Dict[str, int]) -> bytes:
+    keys = sorted(nodes)
+    entries_size = _ENTRY.size * len(keys)
+    offset = _HEADER.size + entries_size
+    entries = []
+    blobs: List[bytes] = []
+    for key in keys:
+        record = _encode([nodes[key]])
+        entries.append(_ENTRY.pack(offset, len(key), offset + len(key), len(record)))
+        blobs += (key, record)
+        offset += len(key) + len(record)
+    sources_blob = json.dumps(sources).encode()
+    header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, 0, len(keys), offset, len(sources_blob))
+    return b''.join((header, *entries, *blobs, sources_blob))
+
+
+class _Keys(Sequence[bytes]):
+    """Sorted keys of a mapped index, read from the mapping as they are bisected."""
+
+    def __init__(self, buffer: mmap.mmap, count: int) -> None:
+        self._buffer = buffer
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: Any) -> Any:
+        key_offset, key_size, _, _ = _ENTRY.unpack_from(
+            self._buffer, _HEADER.size + index * _ENTRY.size
+        )
+        return self._buffer[key_offset:key_offset + key_size]
+
+
+class SharedIndex:
+    """Nodes of every package on AMENT_PREFIX_PATH in a single read-only, memory-mapped file.
+
+    The file holds a sorted table of (package, executable) keys and one compiled record per
+    node, see nodl.compile_file. A lookup bisects the table in place and decodes only the
+    matching record, so it costs microseconds and never reads the rest of the file. Processes
+    mapping the same file share its pages through the page cache instead of each parsing and
+    holding its own copy of the NoDL files.
+
+    The file is a snapshot written by build, typically once per workspace build: lookups do
+    not check whether the files it was built from changed since, is_stale does.
+    Packages that could not be parsed, e.g. because they define an executable twice, are left
+    out, so lookups through get_node_by_executable fall back to reading their files.
+    A missing or invalid file reads as an empty index.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        """Use the index stored at path, defaulting to $XDG_CACHE_HOME/nodl/nodes.index."""
+        self.path = Path(path) if path else default_cache_directory() / 'nodes.index'
+        self._buffer: Optional[mmap.mmap] = None
+        self._keys: Sequence[bytes] = ()
+        self._lock = threading.Lock()
+
+    def build(self, package_names: Optional[Iterable[str]] = None) -> int:
+        """Parse every package, or only package_names, and write the index atomically.
+
+        Processes that have the previous file mapped keep reading it until they call close.
+
+        :raises OSError: if the index could not be written
+        :return: number of nodes indexed
+        :rtype: int
+        """
+        # Imported here so that processes only querying the index do not load lxml.
+        from nodl._parsing._parsing import _parse_multiple
+
+        prefixes = get_nodl_package_prefixes()
+        if package_names is not None:
+            prefixes = {name: prefixes[name] for name in package_names if name in prefixes}
+
+        nodes: Dict[bytes, Node] = {}
+        sources: Dict[str, int] = {}
+        for package_name, prefix in sorted(prefixes.items()):
+            try:
+                share_directory = os.path.join(prefix, 'share', package_name)
+                paths, mtimes = _scan_package(package_name, share_directory)
+                package_nodes = _parse_multiple(paths)
+            except (OSError, NoDLError):
+                continue
+            sources.update(mtimes)
+            for node in package_nodes:
+                nodes[_key(package_name, node.executable)] = node
+
+        if not write_atomic(self.path, _dumps(nodes, sources)):
+            raise OSError(f'Could not write {self.path}')
+        self.close()
+        return len(nodes)
+
+    def _map(self) -> Sequence[bytes]:
+        with self._lock:
+            return self._map_locked()
+
+    def _map_locked(self) -> Sequence[bytes]:
+        if self._buffer is not None:
+            return self._keys
+        try:
+            with self.path.open('rb') as index_file:
+                buffer = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Missing or empty files read as an empty index.
+            self._keys = ()
+            return self._keys
+        if len(buffer) >= _HEADER.size:
+            magic, version, _, count, _, _ = _HEADER.unpack_from(buffer)
+            if magic == _MAGIC and version == _FORMAT_VERSION:
+                self._buffer = buffer
+                self._keys = _Keys(buffer, count)
+                return self._keys
+        buffer.close()
+        self._keys = ()
+        return self._keys
+
+    def close(self) -> None:
+        """Unmap the file; it is mapped again, possibly rebuilt, on next use."""
+        with self._lock:
+            if self._buffer is not None:
+                self._buffer.close()
+            self._buffer = None
+            self._keys = ()
+
+    def __enter__(self) -> 'SharedIndex':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._map())
+
+    def __contains__(self, package_name: object) -> bool:
+        """Whether package_name has at least one node in the index."""
+        if not isinstance(package_name, str):
+            return False
+        prefix = _key(package_name, '')
+        with self._lock:
+            keys = self._map_locked()
+            position = bisect.bisect_left(keys, prefix)
+            return position < len(keys) and keys[position].startswith(prefix)
+
+    def get_node(self, package_name: str, executable_name: str) -> Optional[Node]:
+        """Return the node associated with executable_name in package_name, or None."""
+        key = _key(package_name, executable_name)
+        # The record is copied out under the lock, as close may unmap the file at any time.
+        with self._lock:
+            keys = self._map_locked()
+            position = bisect.bisect_left(keys, key)
+            if position == len(keys) or keys[position] != key:
+                return None
+            buffer = self._buffer
+            if buffer is None:
+                raise ValueError('index is closed')
+            _, _, record_offset, record_size = _ENTRY.unpack_from(
+                buffer, _HEADER.size + position * _ENTRY.size
+            )
+            record = buffer[record_offset:record_offset + record_size]
+        return _decode(record)[0]
+
+    def get_nodes(
+        self, package_name: str, executable_names: Iterable[str]
+    ) -> Tuple[List[Node], List[str]]:
+        """Return the nodes associated with executable_names in package_name.
+
+        :return: Tuple containing nodes with matching executable field, unmatched executables
+        :rtype: Tuple[List[Node], List[str]]
+        """
+        nodes = []
+        missing = []
+        for name in dict.fromkeys(executable_names):
+            node = self.get_node(package_name, name)
+            if node is None:
+                missing.append(name)
+            else:
+                nodes.append(node)
+        return nodes, missing
+
+    def is_stale(self) -> bool:
+        """Whether any file or share directory the index was built from changed or is gone.
+
+        Packages installed since the index was built are not detected.
+        """
+        with self._lock:
+            self._map_locked()
+            if self._buffer is None:
+                return True
+            _, _, _, _, sources_offset, sources_size = _HEADER.unpack_from(self._buffer)
+            sources = json.loads(self._buffer[sources_offset:sources_offset + sources_size])
+        for path, mtime_ns in sources.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime_ns:
+                    return True
+            except OSError:
+                return True
+        return False
@@ -0,0 +1,189 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Counters and timings of the stages of package lookup and parsing.
+
+Collection is off by default; instrumented code then only pays for checking a global flag.
+Times are inclusive and measured per thread, so stages running on several threads at once can
+add up to more than the wall clock time.
+"""
+
+import functools
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple, TypeVar, Union
+
+
+_F = TypeVar('_F', bound=Callable[..., Any])
+
+_enabled = False
+_tracing = False
+_lock = threading.Lock()
+# Stage name to calls, seconds and bytes.
+_counters: Dict[str, List[Any]] = {}
+# Stage name, thread, start and end times for the Chrome trace.
+_events: List[Tuple[str, int, float, float]] = []
+
+
+class StageStats(NamedTuple):
+    """Statistics of one stage since collection was enabled or reset."""
+
+    calls: int
+    seconds: float
+    bytes_read: int
+
+
+def enable_stats(*, trace: bool = False) -> None:
+    """Start collecting statistics, and every timed call for a Chrome trace if trace is set."""
+    global _enabled, _tracing
+    _tracing = trace
+    _enabled = True
+
+
+def disable_stats() -> None:
+    """Stop collecting statistics, keeping those collected so far."""
+    global _enabled, _tracing
+    _enabled = _tracing = False
+
+
+def reset_stats() -> None:
+    """Forget the statistics and trace events collected so far."""
+    with _lock:
+        _counters.clear()
+        _events.clear()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def stats() -> Dict[str, StageStats]:
+    """Return the statistics collected for each stage, by stage name.
+
+    Stages are named after the component they belong to:
+
+    - index.glob: finding the NoDL files of a package, from its resource index marker or
+      its share directory
+    - parse.find_node: streaming a file for a single executable
+    - parse.xml: reading and parsing XML, with the bytes read
+    - parse.validate_interface: validating against interface.xsd
+    - parse.schema_compile: loading and compiling an XSD schema
+    - v1.validate_xsd: validating against v1.xsd
+    - v1.build: building nodes, including the built-in validation
+    - cache.get and cache.put: parse cache reads and writes
+    - parse.compiled: building nodes from compiled files, with the bytes read
+
+    :return: statistics by stage name
+    :rtype: Dict[str, StageStats]
+    """
+    with _lock:
+        return {name: StageStats(*counter) for name, counter in sorted(_counters.items())}
+
+
+def _record(name: str, start: float, end: float) -> None:
+    with _lock:
+        counter = _counters.setdefault(name, [0, 0.0, 0])
+        counter[0] += 1
+        counter[1] += end - start
+        if _tracing:
+            _events.append((name, threading.get_ident(), start, end))
+
+
+def count_bytes(name: str, size: int) -> None:
+    """Add size to the bytes read by a stage, when statistics are collected."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters.setdefault(name, [0, 0.0, 0])[2] += size
+
+
+def timed(name: str) -> Callable[[_F], _F]:
+    """Decorate a function to be counted and timed as stage name."""
+
+    def decorator(function: _F) -> _F:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _record(name, start, time.perf_counter())
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        _record(self.name, self.start, time.perf_counter())
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str) -> Union[_Stage, _NoStage]:
+    """Return a context manager counting and timing its block as stage name."""
+    return _Stage(name) if _enabled else _NO_STAGE
+
+
+def chrome_trace() -> Dict[str, Any]:
+    """Return the collected trace events in the Chrome trace event format."""
+    with _lock:
+        events = list(_events)
+    origin = min((start for _, _, start, _ in events), default=0.0)
+    pid = os.getpid()
+    return {
+        'traceEvents': [
+            {
+                'name': name,
+                'cat': name.split('.', 1)[0],
+                'ph': 'X',
+                'ts': (start - origin) * 1e6,
+                'dur': (end - start) * 1e6,
+                'pid': pid,
+                'tid': tid,
+            }
+            for name, tid, start, end in events
+        ],
+        'displayTimeUnit': 'ms',
+    }
+
+
+def write_chrome_trace(path: Union[str, Path]) -> None:
+    """Write the collected trace events to path, for chrome://tracing or Perfetto."""
+    Path(path).write_text(json.dumps(chrome_trace()))
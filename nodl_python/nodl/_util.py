@@ -12,12 +12,81 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import distutils.util
+import functools
+import os
+from pathlib import Path
+import tempfile
+import threading
+from typing import Optional, TYPE_CHECKING
 
-from lxml import etree
+if TYPE_CHECKING:
+    from lxml import etree
 
 
-def get_bool_attribute(element: etree._Element, attribute: str) -> bool:
+FILE_EXTENSION = '.nodl.xml'
+
+
+_TRUE_STRINGS = frozenset(('y', 'yes', 't', 'true', 'on', '1'))
+_FALSE_STRINGS = frozenset(('n', 'no', 'f', 'false', 'off', '0'))
+
+
+def str_to_bool(value: str) -> bool:
+    """Convert a string representation of truth to a bool.
+
+    Accepts the same spellings as the deprecated distutils.util.strtobool.
+
+    :raises ValueError: if value is not a recognised boolean string
+    """
+    lowered = value.lower()
+    if lowered in _TRUE_STRINGS:
+        return True
+    if lowered in _FALSE_STRINGS:
+        return False
+    raise ValueError(f'invalid truth value {value!r}')
+
+
+def get_bool_attribute(element: 'etree._Element', attribute: str) -> bool:
     """Access attribute and bool conversion."""
-    boolean_string = element.get(attribute, 'False')
-    return bool(distutils.util.strtobool(boolean_string))
+    return str_to_bool(element.get(attribute, 'False'))
+
+
+_umask_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _umask() -> int:
+    # The umask can only be read by setting it, so it is read once.
+    with _umask_lock:
+        umask = os.umask(0o022)
+        os.umask(umask)
+    return umask
+
+
+def write_atomic(path: Path, data: bytes, *, mode: Optional[int] = None) -> bool:
+    """Replace the content of path with data, so readers never see a partial file.
+
+    Failures are swallowed, as callers only use this for caches.
+
+    :param mode: permissions of the file, less the umask, defaults to only the owner's
+    :type mode: Optional[int]
+    :return: whether the file was written
+    :rtype: bool
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix='.', suffix='.tmp')
+    except OSError:
+        return False
+    try:
+        with os.fdopen(tmp_fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+        if mode is not None:
+            os.chmod(tmp_name, mode & ~_umask())
+        os.replace(tmp_name, path)
+    except OSError:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        return False
+    return True
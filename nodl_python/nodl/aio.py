@@ -0,0 +1,224 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Awaitable counterparts of the NoDL parsing and package lookup functions.
+
+Reading and parsing files blocks, so every call is run on an executor instead of the event
+loop: the one passed as executor, or else a thread pool shared by this module and bounded to
+DEFAULT_MAX_WORKERS threads.
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+import functools
+import os
+from pathlib import Path
+import threading
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    IO,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from ament_index_python.packages import PackageNotFoundError
+
+from nodl import _index
+from nodl._executable_index import ExecutableIndex
+from nodl._parsing import _parsing
+from nodl._parsing._cache import ParseCache
+from nodl._shared_index import SharedIndex
+from nodl.errors import NoDLError
+from nodl.types import Node
+
+
+DEFAULT_MAX_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+_T = TypeVar('_T')
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix='nodl-aio'
+            )
+        return _executor
+
+
+async def _run(
+    executor: Optional[Executor], function: Callable[..., _T], **kwargs: Any
+) -> _T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor or _default_executor(), functools.partial(function, **kwargs)
+    )
+
+
+async def parse(
+    path: Union[str, Path, IO],
+    *,
+    cache: Optional[ParseCache] = None,
+    lazy: bool = False,
+    strict: bool = False,
+    native: bool = False,
+    executor: Optional[Executor] = None,
+) -> List[Node]:
+    """Parse the nodes out of a given NoDL file without blocking the event loop.
+
+    See nodl.parse for the other parameters.
+
+    :param executor: executor to read and parse the file on, defaults to the module's pool
+    :type executor: Optional[Executor]
+    """
+    return await _run(
+        executor,
+        _parsing.parse,
+        path=path,
+        cache=cache,
+        lazy=lazy,
+        strict=strict,
+        native=native,
+    )
+
+
+async def get_node_by_executable(
+    *,
+    package_name: str,
+    executable_name: str,
+    cache: Optional[ParseCache] = None,
+    strict: bool = False,
+    index: Optional[Union[ExecutableIndex, SharedIndex]] = None,
+    executor: Optional[Executor] = None,
+) -> Node:
+    """Return node associated with given executable from a package's exported nodl.
+
+    See nodl.get_node_by_executable for the other parameters and the errors raised.
+
+    :param executor: executor to run the lookup on, defaults to the module's pool
+    :type executor: Optional[Executor]
+    """
+    return await _run(
+        executor,
+        _index.get_node_by_executable,
+        package_name=package_name,
+        executable_name=executable_name,
+        cache=cache,
+        strict=strict,
+        index=index,
+    )
+
+
+async def get_nodes_by_executables(
+    *,
+    package_name: str,
+    executable_names: Iterable[str],
+    cache: Optional[ParseCache] = None,
+    index: Optional[Union[ExecutableIndex, SharedIndex]] = None,
+    executor: Optional[Executor] = None,
+) -> Tuple[List[Node], List[str]]:
+    """Return nodes associated with given executables from a package's exported nodl.
+
+    :param executor: executor to run the lookup on, defaults to the module's pool
+    :type executor: Optional[Executor]
+    :raises PackageNotFoundError: if package is not found
+    :raises NoNoDLFilesError: if package has no .nodl.xml files
+    :return: Tuple containing nodes with matching executable field, unmatched executables
+    :rtype: Tuple[List[Node], List[str]]
+    """
+    return await _run(
+        executor,
+        _index._get_nodes_by_executables,
+        package_name=package_name,
+        executable_names=list(executable_names),
+        cache=cache,
+        index=index,
+    )
+
+
+class PackageNodes(NamedTuple):
+    """Result of looking up executables in one package of a batch."""
+
+    package_name: str
+    nodes: List[Node]
+    missing: List[str]
+    error: Optional[Exception] = None
+
+
+async def iter_nodes_by_executables(
+    requests: Iterable[Tuple[str, Iterable[str]]],
+    *,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    cache: Optional[ParseCache] = None,
+    index: Optional[Union[ExecutableIndex, SharedIndex]] = None,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[PackageNodes]:
+    """Look executables up in many packages at once, yielding results as they complete.
+
+    At most max_concurrency lookups are in flight at a time. A package that cannot be resolved
+    or read does not stop the batch: its result carries the error and lists every executable
+    as missing. Leaving the iteration early cancels the lookups that have not started.
+
+    :param requests: pairs of package name and executable names to look up in it
+    :type requests: Iterable[Tuple[str, Iterable[str]]]
+    :param max_concurrency: maximum number of lookups running at a time
+    :type max_concurrency: int
+    :param cache: persistent parse cache to use, defaults to no caching
+    :type cache: Optional[ParseCache]
+    :param index: workspace executable index to locate the nodes with
+    :type index: Optional[Union[ExecutableIndex, SharedIndex]]
+    :param executor: executor to run the lookups on, defaults to the module's pool
+    :type executor: Optional[Executor]
+    :return: asynchronous iterator over the result of each package, in completion order
+    :rtype: AsyncIterator[PackageNodes]
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def lookup(package_name: str, executable_names: List[str]) -> PackageNodes:
+        async with semaphore:
+            try:
+                nodes, missing = await get_nodes_by_executables(
+                    package_name=package_name,
+                    executable_names=executable_names,
+                    cache=cache,
+                    index=index,
+                    executor=executor,
+                )
+            except (PackageNotFoundError, NoDLError, OSError) as e:
+                return PackageNodes(package_name, [], executable_names, e)
+        return PackageNodes(package_name, nodes, missing)
+
+    tasks = [
+        asyncio.ensure_future(lookup(package_name, list(executable_names)))
+        for package_name, executable_names in requests
+    ]
+    try:
+        for future in asyncio.as_completed(tasks):
+            yield await future
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -12,9 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from lxml import etree
+from typing import TYPE_CHECKING, Union
 
-from .types import Node
+if TYPE_CHECKING:  # Keeps lxml out of `import nodl.errors`.
+    from lxml import etree
+
+    from ._parsing._v1._validation import SchemaViolation
+    from .types import Node
 
 
 class NoDLError(Exception):
@@ -51,14 +55,14 @@ class InvalidNoDLError(NoDLError):
 class InvalidXMLError(InvalidNoDLError):
     """Error raised when unable to parse XML."""
 
-    def __init__(self, err: etree.XMLSyntaxError):
+    def __init__(self, err: 'etree.XMLSyntaxError'):
         super().__init__(f'XML syntax error: {err.filename}: {err.msg}')
 
 
 class InvalidNoDLDocumentError(InvalidNoDLError):
     """Error raised when schema validation fails."""
 
-    def __init__(self, invalid: etree.DocumentInvalid):
+    def __init__(self, invalid: Union['etree.DocumentInvalid', 'SchemaViolation']):
         self.invalid = invalid
         e = invalid.error_log[0]
         super().__init__(
@@ -69,7 +73,7 @@ class InvalidNoDLDocumentError(InvalidNoDLError):
 class InvalidElementError(InvalidNoDLError):
     """Base class for all bad NoDL elements."""
 
-    def __init__(self, message: str, element: etree._Element):
+    def __init__(self, message: str, element: 'etree._Element'):
         super().__init__(
             f'Error parsing {element.tag} from {element.base}, line {element.sourceline}: '
             + message
@@ -96,7 +100,7 @@ class InvalidServiceError(InvalidElementError):
 class InvalidNodeChildError(InvalidElementError):
     """Error raised when a node has a child with an unsupported tag."""
 
-    def __init__(self, element: etree._Element) -> None:
+    def __init__(self, element: 'etree._Element') -> None:
         super().__init__(
             (
                 f'Nodes cannot contain {element.tag},'
@@ -0,0 +1,342 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""System-wide view of how the interfaces of many nodes connect."""
+
+import json
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from nodl.errors import DuplicateNodeError
+from nodl.types import Action, Node, PubSubRole, ServerClientRole, Service, Topic
+
+
+_Interface = Union[Action, Service, Topic]
+
+TOPIC = 'topic'
+SERVICE = 'service'
+ACTION = 'action'
+_KINDS = (TOPIC, SERVICE, ACTION)
+
+# Roles on the providing and the using end of each kind of channel.
+_PROVIDER_ROLES = {PubSubRole.PUBLISHER, ServerClientRole.SERVER}
+_USER_ROLES = {PubSubRole.SUBSCRIPTION, ServerClientRole.CLIENT}
+
+_DOT_SHAPES = {TOPIC: 'box', SERVICE: 'hexagon', ACTION: 'octagon'}
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+class Problem(NamedTuple):
+    """Inconsistency between the interfaces of several nodes, see InterfaceGraph.problems."""
+
+    severity: str
+    kind: str
+    name: str
+    nodes: Tuple[str, ...]
+    message: str
+
+
+def _dot_id(value: str) -> str:
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+class InterfaceGraph:
+    """Adjacency indexes from topics, services and actions to the nodes using them.
+
+    Each channel, i.e. a topic, service or action name, maps to the nodes on its providing
+    end (publishers and servers) and on its using end (subscriptions and clients), keyed by node
+    name. Interfaces with the role 'both' are on both ends. Looking the endpoints of a channel
+    up takes constant time whatever the number of nodes, and returns read-only views that
+    follow later changes to the graph.
+
+    Nodes are identified by name, which must be unique in the graph; nodes gathered from
+    several packages can be given qualified names instead, such as 'package/node'.
+    """
+
+    def __init__(self, nodes: Iterable[Node] = ()) -> None:
+        self._nodes: Dict[str, Node] = {}
+        self._providers: Dict[str, Dict[str, Dict[str, _Interface]]] = {k: {} for k in _KINDS}
+        self._users: Dict[str, Dict[str, Dict[str, _Interface]]] = {k: {} for k in _KINDS}
+        self._components: Optional[Dict[str, Set[str]]] = None
+        self.add_nodes(nodes)
+
+    @staticmethod
+    def _interfaces(node: Node) -> Iterator[Tuple[str, _Interface]]:
+        yield from ((TOPIC, topic) for topic in node.topics.values())
+        yield from ((SERVICE, service) for service in node.services.values())
+        yield from ((ACTION, action) for action in node.actions.values())
+
+    def add_node(self, node: Node, *, name: Optional[str] = None) -> None:
+        """Add node and index its topics, services and actions.
+
+        :param node: node to add
+        :type node: Node
+        :param name: name identifying the node in the graph, defaults to the node's name
+        :type name: Optional[str]
+        :raises DuplicateNodeError: if a node of the same name is already in the graph
+        """
+        if name is None:
+            name = node.name
+        if name in self._nodes:
+            raise DuplicateNodeError(node=node)
+        self._nodes[name] = node
+        for kind, interface in self._interfaces(node):
+            if interface.role not in _USER_ROLES:
+                self._providers[kind].setdefault(interface.name, {})[name] = interface
+            if interface.role not in _PROVIDER_ROLES:
+                self._users[kind].setdefault(interface.name, {})[name] = interface
+        self._components = None
+
+    def add_nodes(self, nodes: Iterable[Node]) -> None:
+        """Add every node of nodes, see add_node."""
+        for node in nodes:
+            self.add_node(node)
+
+    def remove_node(self, name: str) -> Node:
+        """Remove the node called name from the graph and return it.
+
+        :raises KeyError: if no node is called name
+        """
+        node = self._nodes.pop(name)
+        for kind, interface in self._interfaces(node):
+            for index in (self._providers[kind], self._users[kind]):
+                endpoints = index.get(interface.name)
+                if endpoints is not None:
+                    endpoints.pop(name, None)
+                    if not endpoints:
+                        del index[interface.name]
+        self._components = None
+        return node
+
+    @property
+    def nodes(self) -> Mapping[str, Node]:
+        """Nodes of the graph by name."""
+        return MappingProxyType(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._nodes
+
+    def channels(self, kind: str) -> List[str]:
+        """Return the sorted names of the topics, services or actions used by any node.
+
+        :param kind: one of 'topic', 'service' or 'action'
+        :type kind: str
+        """
+        return sorted(self._providers[kind].keys() | self._users[kind].keys())
+
+    def providers(self, kind: str, name: str) -> Mapping[str, _Interface]:
+        """Return the publishers or servers of the topic, service or action called name."""
+        return MappingProxyType(self._providers[kind].get(name, _EMPTY))
+
+    def users(self, kind: str, name: str) -> Mapping[str, _Interface]:
+        """Return the subscriptions or clients of the topic, service or action called name."""
+        return MappingProxyType(self._users[kind].get(name, _EMPTY))
+
+    def publishers(self, topic: str) -> Mapping[str, Topic]:
+        """Return the nodes publishing topic, by node name."""
+        return self.providers(TOPIC, topic)  # type: ignore
+
+    def subscriptions(self, topic: str) -> Mapping[str, Topic]:
+        """Return the nodes subscribing to topic, by node name."""
+        return self.users(TOPIC, topic)  # type: ignore
+
+    def service_servers(self, service: str) -> Mapping[str, Service]:
+        """Return the nodes serving service, by node name."""
+        return self.providers(SERVICE, service)  # type: ignore
+
+    def service_clients(self, service: str) -> Mapping[str, Service]:
+        """Return the clients of service, by node name."""
+        return self.users(SERVICE, service)  # type: ignore
+
+    def action_servers(self, action: str) -> Mapping[str, Action]:
+        """Return the nodes serving action, by node name."""
+        return self.providers(ACTION, action)  # type: ignore
+
+    def action_clients(self, action: str) -> Mapping[str, Action]:
+        """Return the clients of action, by node name."""
+        return self.users(ACTION, action)  # type: ignore
+
+    def _compute_components(self) -> Dict[str, Set[str]]:
+        parents = {name: name for name in self._nodes}
+
+        def find(name: str) -> str:
+            while parents[name] != name:
+                parents[name] = parents[parents[name]]
+                name = parents[name]
+            return name
+
+        for kind in _KINDS:
+            for channel, providers in self._providers[kind].items():
+                users = self._users[kind].get(channel)
+                if not users:
+                    continue
+                root = find(next(iter(providers)))
+                for name in (*providers, *users):
+                    parents[find(name)] = root
+
+        components: Dict[str, Set[str]] = {}
+        for name in self._nodes:
+            components.setdefault(find(name), set()).add(name)
+        return {name: components[find(name)] for name in self._nodes}
+
+    def component(self, name: str) -> Set[str]:
+        """Return the names of the nodes connected to the node called name, itself included.
+
+        Two nodes are connected when one provides a topic, service or action the other uses,
+        directly or through other nodes.
+
+        :raises KeyError: if no node is called name
+        """
+        if self._components is None:
+            self._components = self._compute_components()
+        return set(self._components[name])
+
+    def connected_components(self) -> List[Set[str]]:
+        """Return the sets of connected node names, largest first, see component."""
+        if self._components is None:
+            self._components = self._compute_components()
+        unique = {id(component): component for component in self._components.values()}
+        return sorted(
+            (set(component) for component in unique.values()),
+            key=lambda component: (-len(component), min(component)),
+        )
+
+    def problems(self) -> List[Problem]:
+        """Return the inconsistencies between nodes, sorted by kind and name.
+
+        Every channel is checked once, from the indexes, so the cost grows with the number of
+        interfaces rather than with the number of pairs of nodes. Reported are, as errors:
+
+        - topics, services and actions used with more than one type
+        - services and actions with more than one server
+
+        and, as warnings, topics subscribed to but never published.
+        """
+        problems = []
+        for kind in _KINDS:
+            for name in self.channels(kind):
+                providers = self._providers[kind].get(name, {})
+                users = self._users[kind].get(name, {})
+                types: Dict[str, List[str]] = {}
+                for node_name, interface in sorted({**users, **providers}.items()):
+                    types.setdefault(interface.type, []).append(node_name)
+                if len(types) > 1:
+                    problems.append(
+                        Problem(
+                            'error',
+                            kind,
+                            name,
+                            tuple(sorted(providers.keys() | users.keys())),
+                            f'{kind} {name} is used with different types: '
+                            + '; '.join(
+                                f'{t} by {", ".join(nodes)}' for t, nodes in sorted(types.items())
+                            ),
+                        )
+                    )
+                if kind != TOPIC and len(providers) > 1:
+                    problems.append(
+                        Problem(
+                            'error',
+                            kind,
+                            name,
+                            tuple(sorted(providers)),
+                            f'{kind} {name} has {len(providers)} servers: '
+                            + ', '.join(sorted(providers)),
+                        )
+                    )
+                if kind == TOPIC and not providers:
+                    problems.append(
+                        Problem(
+                            'warning',
+                            kind,
+                            name,
+                            tuple(sorted(users)),
+                            f'{kind} {name} has no publisher, subscribed to by '
+                            + ', '.join(sorted(users)),
+                        )
+                    )
+        return problems
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the graph as plain data, ready to be serialized to JSON.
+
+        Every node is listed with its executable, and every topic, service and action with
+        the types it is used with and the names of its providers and users.
+        """
+        data: Dict[str, Any] = {
+            'nodes': [
+                {'name': name, 'executable': node.executable}
+                for name, node in sorted(self._nodes.items())
+            ]
+        }
+        for kind in _KINDS:
+            channels = []
+            for name in self.channels(kind):
+                providers = self.providers(kind, name)
+                users = self.users(kind, name)
+                channels.append(
+                    {
+                        'name': name,
+                        'types': sorted(
+                            {i.type for i in providers.values()}
+                            | {i.type for i in users.values()}
+                        ),
+                        'providers': sorted(providers),
+                        'users': sorted(users),
+                    }
+                )
+            data[kind + 's'] = channels
+        return data
+
+    def to_json(self, **kwargs: Any) -> str:
+        """Return to_dict serialized as JSON, kwargs are passed to json.dumps."""
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_dot(self, *, name: str = 'nodl') -> str:
+        """Return the graph in the Graphviz DOT language.
+
+        Nodes are ellipses and topics, services and actions are boxes, hexagons and octagons.
+        Edges go from providers to the channel and from the channel to its users.
+        """
+        lines = [f'digraph {_dot_id(name)} {{', '  rankdir=LR;']
+        for node_name in sorted(self._nodes):
+            lines.append(f'  {_dot_id("node:" + node_name)} [label={_dot_id(node_name)}];')
+        for kind in _KINDS:
+            for channel in self.channels(kind):
+                channel_id = _dot_id(f'{kind}:{channel}')
+                lines.append(
+                    f'  {channel_id} [label={_dot_id(channel)}, shape={_DOT_SHAPES[kind]}];'
+                )
+                for provider in sorted(self.providers(kind, channel)):
+                    lines.append(f'  {_dot_id("node:" + provider)} -> {channel_id};')
+                for user in sorted(self.users(kind, channel)):
+                    lines.append(f'  {channel_id} -> {_dot_id("node:" + user)};')
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,153 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""JSON and JSON lines serialization of nodes, written incrementally to text streams."""
+
+import json
+from typing import Any, Callable, Dict, Iterable, TextIO
+
+from nodl.types import (
+    Action,
+    Node,
+    NoDLInterface,
+    Parameter,
+    PubSubRole,
+    ServerClientRole,
+    Service,
+    Topic,
+)
+
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+def interface_to_dict(interface: NoDLInterface) -> Dict[str, Any]:
+    """Return an action, parameter, service or topic as plain data, roles as their value."""
+    data = {'name': interface.name, 'type': interface.type}
+    role = getattr(interface, 'role', None)
+    if role is not None:
+        data['role'] = role.value
+    return data
+
+
+def node_to_dict(node: Node) -> Dict[str, Any]:
+    """Return a node as plain data, ready to be serialized to JSON.
+
+    Interfaces are listed in document order under 'actions', 'parameters', 'services' and
+    'topics', see interface_to_dict.
+    """
+    return {
+        'name': node.name,
+        'executable': node.executable,
+        'actions': [interface_to_dict(action) for action in node.actions.values()],
+        'parameters': [interface_to_dict(parameter) for parameter in node.parameters.values()],
+        'services': [interface_to_dict(service) for service in node.services.values()],
+        'topics': [interface_to_dict(topic) for topic in node.topics.values()],
+    }
+
+
+def _interfaces(
+    data: Dict[str, Any], key: str, build: Callable[[Dict[str, Any]], Any]
+) -> Any:
+    return [build(interface) for interface in data.get(key, ())]
+
+
+def node_from_dict(data: Dict[str, Any]) -> Node:
+    """Return the node serialized by node_to_dict.
+
+    :raises KeyError: if a required field is missing
+    :raises ValueError: if a role is not valid for its interface
+    """
+    return Node(
+        name=data['name'],
+        executable=data['executable'],
+        actions=_interfaces(
+            data,
+            'actions',
+            lambda i: Action(
+                name=i['name'], action_type=i['type'], role=ServerClientRole(i['role'])
+            ),
+        ),
+        parameters=_interfaces(
+            data, 'parameters', lambda i: Parameter(name=i['name'], parameter_type=i['type'])
+        ),
+        services=_interfaces(
+            data,
+            'services',
+            lambda i: Service(
+                name=i['name'], service_type=i['type'], role=ServerClientRole(i['role'])
+            ),
+        ),
+        topics=_interfaces(
+            data,
+            'topics',
+            lambda i: Topic(name=i['name'], message_type=i['type'], role=PubSubRole(i['role'])),
+        ),
+    )
+
+
+class JSONWriter:
+    """Write nodes to a text stream as they come, as a JSON array or as JSON lines.
+
+    Each node is encoded and written on its own, so memory use does not grow with the number
+    of nodes written. A JSON array is only complete once the writer is closed, which using it
+    as a context manager does.
+    """
+
+    def __init__(self, stream: TextIO, *, lines: bool = False) -> None:
+        """Write to stream, as JSON lines if lines is set."""
+        self.stream = stream
+        self.lines = lines
+        self._count = 0
+        self._closed = False
+
+    def write(self, node: Node) -> None:
+        """Serialize node and write it to the stream."""
+        encoded = _encode(node_to_dict(node))
+        if self.lines:
+            self.stream.write(encoded + '\n')
+        else:
+            self.stream.write(('[\n' if not self._count else ',\n') + encoded)
+        self._count += 1
+
+    def write_all(self, nodes: Iterable[Node]) -> None:
+        """Write every node of nodes, see write."""
+        for node in nodes:
+            self.write(node)
+
+    def close(self) -> None:
+        """Terminate the JSON array, leaving the stream open."""
+        if self._closed:
+            return
+        self._closed = True
+        if not self.lines:
+            self.stream.write('\n]\n' if self._count else '[]\n')
+
+    def __enter__(self) -> 'JSONWriter':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def write_json(nodes: Iterable[Node], stream: TextIO) -> None:
+    """Write nodes to stream as a JSON array, one node at a time, see JSONWriter."""
+    with JSONWriter(stream) as writer:
+        writer.write_all(nodes)
+
+
+def write_jsonl(nodes: Iterable[Node], stream: TextIO) -> None:
+    """Write nodes to stream as JSON lines, one node per line, see JSONWriter."""
+    with JSONWriter(stream, lines=True) as writer:
+        writer.write_all(nodes)
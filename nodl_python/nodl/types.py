@@ -13,7 +13,8 @@
 # limitations under the License.
 
 from enum import Enum, unique
-from typing import Any, List, Optional, Union
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Type, TypeVar, Union
 
 
 @unique
@@ -31,18 +32,38 @@ class ServerClientRole(Enum):
 
 
 class NoDLData:
-    """Data structure base class for NoDL objects."""
+    """Data structure base class for NoDL objects.
+
+    NoDL objects declare __slots__ rather than carrying a per-instance __dict__, which keeps
+    large interface models compact.
+    """
+
+    __slots__ = ()
+
+    def _asdict(self) -> Dict[str, Any]:
+        """Return the fields of the object in declaration order."""
+        fields = {
+            name: getattr(self, name)
+            for cls in reversed(type(self).__mro__)
+            for name in getattr(cls, '__slots__', ())
+            if not name.startswith('_') and hasattr(self, name)
+        }
+        # Subclasses without __slots__ may still add attributes of their own.
+        fields.update(getattr(self, '__dict__', {}))
+        return fields
 
     def __repr__(self) -> str:
-        return str(self.__dict__)
+        return str(self._asdict())
 
     def __str__(self) -> str:
-        return str(self.__dict__)
+        return str(self._asdict())
 
 
 class NoDLInterface(NoDLData):
     """Abstract base class for NoDL communication interfaces."""
 
+    __slots__ = ('name', 'type')
+
     def __init__(self, *, name: str, value_type: str) -> None:
         self.name = name
         self.type = value_type
@@ -58,6 +79,8 @@ class NoDLInterface(NoDLData):
 class _NoDLInterfaceWithRole(NoDLInterface):
     """ABC providing role to interfaces."""
 
+    __slots__ = ('role',)
+
     def __init__(self, *, name: str, value_type: str, role: Union[PubSubRole, ServerClientRole]):
         super().__init__(name=name, value_type=value_type)
         self.role = role
@@ -69,34 +92,60 @@ class _NoDLInterfaceWithRole(NoDLInterface):
 class Action(_NoDLInterfaceWithRole):
     """Data structure for action entries in NoDL."""
 
+    __slots__ = ()
+
     def __init__(self, *, name: str, action_type: str, role: ServerClientRole) -> None:
         super().__init__(name=name, value_type=action_type, role=role)
 
+    def freeze(self) -> 'FrozenAction':
+        """Return an immutable, hashable copy."""
+        return FrozenAction(name=self.name, action_type=self.type, role=self.role)
+
 
 class Parameter(NoDLInterface):
     """Data structure for parameter entries in NoDL."""
 
+    __slots__ = ()
+
     def __init__(self, *, name: str, parameter_type: str):
         super().__init__(name=name, value_type=parameter_type)
 
+    def freeze(self) -> 'FrozenParameter':
+        """Return an immutable, hashable copy."""
+        return FrozenParameter(name=self.name, parameter_type=self.type)
+
 
 class Service(_NoDLInterfaceWithRole):
     """Data structure for service entries in NoDL."""
 
+    __slots__ = ()
+
     def __init__(self, *, name: str, service_type: str, role: ServerClientRole,) -> None:
         super().__init__(name=name, value_type=service_type, role=role)
 
+    def freeze(self) -> 'FrozenService':
+        """Return an immutable, hashable copy."""
+        return FrozenService(name=self.name, service_type=self.type, role=self.role)
+
 
 class Topic(_NoDLInterfaceWithRole):
     """Data structure for topic entries in NoDL."""
 
+    __slots__ = ()
+
     def __init__(self, *, name: str, message_type: str, role: PubSubRole,) -> None:
         super().__init__(name=name, value_type=message_type, role=role)
 
+    def freeze(self) -> 'FrozenTopic':
+        """Return an immutable, hashable copy."""
+        return FrozenTopic(name=self.name, message_type=self.type, role=self.role)
+
 
 class Node(NoDLData):
     """Data structure containing all interfaces a node exposes."""
 
+    __slots__ = ('name', 'executable', 'actions', 'parameters', 'services', 'topics')
+
     def __init__(
         self,
         *,
@@ -116,3 +165,133 @@ class Node(NoDLData):
         )
         self.services = {service.name: service for service in services} if services else {}
         self.topics = {topic.name: topic for topic in topics} if topics else {}
+
+    def freeze(self) -> 'FrozenNode':
+        """Return an immutable, hashable copy, freezing every interface."""
+        return FrozenNode(
+            name=self.name,
+            executable=self.executable,
+            actions=list(self.actions.values()),
+            parameters=list(self.parameters.values()),
+            services=list(self.services.values()),
+            topics=list(self.topics.values()),
+        )
+
+
+_FrozenT = TypeVar('_FrozenT', bound='_Frozen')
+
+
+def _restore_frozen(cls: Type['_Frozen'], fields: Dict[str, Any]) -> '_Frozen':
+    """Unpickle a frozen object, recomputing its hash in the current interpreter."""
+    frozen = cls.__new__(cls)
+    for name, value in fields.items():
+        object.__setattr__(frozen, name, value)
+    frozen._freeze()
+    return frozen
+
+
+class _Frozen(NoDLData):
+    """Mixin making a NoDL object immutable, with a structural hash computed once.
+
+    Concrete classes declare the _hash slot, which is set last and locks the object.
+    """
+
+    __slots__ = ()
+    _hash: int
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._freeze()
+
+    def _freeze(self) -> None:
+        fields = self._asdict()
+        for name, value in fields.items():
+            if isinstance(value, dict):
+                object.__setattr__(self, name, MappingProxyType(value))
+        key = tuple(
+            frozenset(value.values()) if isinstance(value, Mapping) else value
+            for value in fields.values()
+        )
+        object.__setattr__(self, '_hash', hash((type(self), key)))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if hasattr(self, '_hash'):
+            raise AttributeError(f'{type(self).__name__} is immutable')
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._hash == other._hash and self._asdict() == other._asdict()
+
+    def __reduce__(self) -> Any:
+        # Hashes of strings differ between interpreters, so they are never pickled.
+        fields = {
+            name: dict(value) if isinstance(value, Mapping) else value
+            for name, value in self._asdict().items()
+        }
+        return _restore_frozen, (type(self), fields)
+
+    def freeze(self: _FrozenT) -> _FrozenT:
+        return self
+
+
+class FrozenAction(_Frozen, Action):
+    """Immutable, hashable variant of Action."""
+
+    __slots__ = ('_hash',)
+
+
+class FrozenParameter(_Frozen, Parameter):
+    """Immutable, hashable variant of Parameter."""
+
+    __slots__ = ('_hash',)
+
+
+class FrozenService(_Frozen, Service):
+    """Immutable, hashable variant of Service."""
+
+    __slots__ = ('_hash',)
+
+
+class FrozenTopic(_Frozen, Topic):
+    """Immutable, hashable variant of Topic."""
+
+    __slots__ = ('_hash',)
+
+
+class FrozenNode(_Frozen, Node):
+    """Immutable, hashable variant of Node.
+
+    Interfaces are frozen and the four interface dicts become read-only mappings. Equality and
+    hashing are structural, so nodes can be deduplicated with sets across packages.
+    """
+
+    __slots__ = ('_hash',)
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        executable: str,
+        actions: Optional[List[Action]] = None,
+        parameters: Optional[List[Parameter]] = None,
+        services: Optional[List[Service]] = None,
+        topics: Optional[List[Topic]] = None,
+    ) -> None:
+        super().__init__(
+            name=name,
+            executable=executable,
+            actions=[action.freeze() for action in actions or ()],
+            parameters=[parameter.freeze() for parameter in parameters or ()],
+            services=[service.freeze() for service in services or ()],
+            topics=[topic.freeze() for topic in topics or ()],
+        )
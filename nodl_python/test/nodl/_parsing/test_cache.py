@@ -0,0 +1,164 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from pathlib import Path
+import shutil
+import sys
+
+import nodl._parsing
+import nodl._parsing._cache
+import pytest
+
+
+@pytest.fixture
+def cache(tmp_path) -> nodl._parsing.ParseCache:
+    return nodl._parsing.ParseCache(tmp_path / 'cache')
+
+
+@pytest.fixture
+def nodl_copy(tmp_path, test_nodl_path) -> Path:
+    path = tmp_path / 'test.nodl.xml'
+    shutil.copy(test_nodl_path, path)
+    # Age the file past the racy window so plain stat checks are trusted.
+    os.utime(path, ns=(0, 0))
+    return path
+
+
+def test_default_directory_honours_xdg(xdg_cache_home):
+    assert nodl._parsing.ParseCache().directory == xdg_cache_home
+
+
+def test_hit_after_miss(cache, nodl_copy):
+    first = nodl._parsing.parse(nodl_copy, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    second = nodl._parsing.parse(nodl_copy, cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert [node.executable for node in first] == [node.executable for node in second]
+
+
+def test_warm_hit_does_not_reparse(mocker, cache, nodl_copy):
+    nodl._parsing.parse(nodl_copy, cache=cache)
+    parse_mock = mocker.patch('nodl._parsing._parsing._parse_element_tree')
+
+    assert len(nodl._parsing.parse(nodl_copy, cache=cache)) == 2
+    parse_mock.assert_not_called()
+
+
+def test_warm_hit_skips_compiled_lookup(mocker, cache, nodl_copy):
+    nodl._parsing.parse(nodl_copy, cache=cache)
+    load_mock = mocker.patch('nodl._parsing._parsing.load_compiled')
+
+    assert len(nodl._parsing.parse(nodl_copy, cache=cache)) == 2
+    load_mock.assert_not_called()
+    assert cache.hits == 1
+
+
+def test_invalidates_on_content_change(cache, nodl_copy):
+    nodl._parsing.parse(nodl_copy, cache=cache)
+
+    nodl_copy.write_text(
+        '<interface version="1"><node name="n" executable="e">'
+        '<parameter name="p" type="int" /></node></interface>'
+    )
+    nodes = nodl._parsing.parse(nodl_copy, cache=cache)
+    assert [node.executable for node in nodes] == ['e']
+    assert cache.hits == 0
+
+
+def test_touch_with_same_content_is_a_hit(cache, nodl_copy):
+    nodl._parsing.parse(nodl_copy, cache=cache)
+    os.utime(nodl_copy, ns=(10 ** 9, 10 ** 9))
+
+    nodl._parsing.parse(nodl_copy, cache=cache)
+    assert cache.hits == 1
+
+
+def test_racy_entries_recheck_content(cache, nodl_copy):
+    os.utime(nodl_copy)
+    stat = nodl_copy.stat()
+    nodl._parsing.parse(nodl_copy, cache=cache)
+
+    # Rewrite with the same size and mtime, as a fast editor might within one tick.
+    nodl_copy.write_bytes(nodl_copy.read_bytes().replace(b'node_1', b'node_3'))
+    os.utime(nodl_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    nodes = nodl._parsing.parse(nodl_copy, cache=cache)
+    assert nodes[0].name == 'node_3'
+    assert cache.hits == 0
+
+
+def test_corrupt_entry_is_a_miss(cache, nodl_copy):
+    nodl._parsing.parse(nodl_copy, cache=cache)
+    for entry in cache.directory.glob('*.pickle'):
+        entry.write_bytes(b'garbage')
+
+    assert len(nodl._parsing.parse(nodl_copy, cache=cache)) == 2
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX permissions')
+def test_directory_is_private(cache, nodl_copy):
+    nodl._parsing.parse(nodl_copy, cache=cache)
+
+    assert cache.directory.stat().st_mode & 0o777 == 0o700
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX permissions')
+def test_writable_by_others_entry_is_not_loaded(mocker, cache, nodl_copy):
+    nodl._parsing.parse(nodl_copy, cache=cache)
+    for entry in cache.directory.glob('*.pickle'):
+        entry.chmod(0o666)
+    load_mock = mocker.patch('nodl._parsing._cache.pickle.load')
+
+    assert len(nodl._parsing.parse(nodl_copy, cache=cache)) == 2
+    load_mock.assert_not_called()
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX ownership')
+def test_foreign_entry_is_not_loaded(mocker, cache, nodl_copy):
+    nodl._parsing.parse(nodl_copy, cache=cache)
+    mocker.patch('os.getuid', return_value=os.getuid() + 1)
+    load_mock = mocker.patch('nodl._parsing._cache.pickle.load')
+
+    assert len(nodl._parsing.parse(nodl_copy, cache=cache)) == 2
+    load_mock.assert_not_called()
+    assert cache.misses == 2
+
+
+def test_unwritable_directory_does_not_fail(tmp_path, nodl_copy):
+    blocker = tmp_path / 'blocker'
+    blocker.touch()
+    cache = nodl._parsing.ParseCache(blocker / 'cache')
+
+    assert len(nodl._parsing.parse(nodl_copy, cache=cache)) == 2
+
+
+def test_clear(cache, nodl_copy):
+    nodl._parsing.parse(nodl_copy, cache=cache)
+    cache.clear()
+
+    nodl._parsing.parse(nodl_copy, cache=cache)
+    assert cache.misses == 2
+
+
+def test_invalid_files_are_not_cached(cache, tmp_path):
+    path = tmp_path / 'bad.nodl.xml'
+    path.write_text('<interface version="1"></interface>')
+
+    with pytest.raises(nodl.errors.InvalidNoDLDocumentError):
+        nodl._parsing.parse(path, cache=cache)
+    assert not list(cache.directory.glob('*.pickle'))
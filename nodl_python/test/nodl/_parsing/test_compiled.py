@@ -0,0 +1,176 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from pathlib import Path
+import pickle
+import shutil
+import stat
+import sys
+
+import nodl._parsing
+from nodl._parsing import _compiled
+import nodl._parsing._parsing
+import nodl._util
+import pytest
+
+
+@pytest.fixture
+def nodl_copy(tmp_path, test_nodl_path) -> Path:
+    path = tmp_path / 'test.nodl.xml'
+    shutil.copy(test_nodl_path, path)
+    # Age the file past the racy window so plain stat checks are trusted.
+    os.utime(path, ns=(0, 0))
+    return path
+
+
+def test_compiled_path():
+    assert _compiled.compiled_path('a/foo.nodl.xml') == Path('a/foo.nodl.bin')
+    assert _compiled.compiled_path('foo.xml') == Path('foo.xml.nodl.bin')
+
+
+def test_round_trip(nodl_copy):
+    compiled = nodl._parsing.compile_file(nodl_copy)
+    assert compiled == nodl_copy.with_name('test.nodl.bin')
+
+    expected = nodl._parsing.parse(nodl_copy, strict=True)
+    assert repr(_compiled.load_compiled(nodl_copy)) == repr(expected)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX permissions')
+def test_compiled_file_has_source_permissions(nodl_copy):
+    os.chmod(nodl_copy, 0o644)
+    compiled = nodl._parsing.compile_file(nodl_copy)
+    assert stat.S_IMODE(os.stat(compiled).st_mode) == 0o644 & ~nodl._util._umask()
+
+
+def test_parse_loads_compiled_without_xml(mocker, nodl_copy):
+    nodl._parsing.compile_file(nodl_copy)
+    parse_mock = mocker.patch('nodl._parsing._parsing._parse_element_tree')
+
+    nodes = nodl._parsing.parse(nodl_copy)
+    assert [node.executable for node in nodes] == ['first', 'second']
+    assert nodes[1].actions['/example_action'].role == nodl.types.ServerClientRole.BOTH
+    parse_mock.assert_not_called()
+
+
+def test_strict_parses_xml(mocker, nodl_copy):
+    nodl._parsing.compile_file(nodl_copy)
+    load_mock = mocker.patch('nodl._parsing._parsing.load_compiled')
+
+    assert len(nodl._parsing.parse(nodl_copy, strict=True)) == 2
+    load_mock.assert_not_called()
+
+
+def test_find_node_uses_compiled(mocker, nodl_copy):
+    nodl._parsing.compile_file(nodl_copy)
+    iterparse_mock = mocker.patch('nodl._parsing._parsing._iterparse')
+
+    assert nodl._parsing._parsing._find_node(nodl_copy, 'second').name == 'node_2'
+    assert nodl._parsing._parsing._find_node(nodl_copy, 'missing') is None
+    iterparse_mock.assert_not_called()
+
+
+def test_stale_after_content_change(nodl_copy):
+    nodl._parsing.compile_file(nodl_copy)
+    nodl_copy.write_text(
+        '<interface version="1"><node name="n" executable="e">'
+        '<parameter name="p" type="int" /></node></interface>'
+    )
+
+    assert _compiled.load_compiled(nodl_copy) is None
+    assert [node.executable for node in nodl._parsing.parse(nodl_copy)] == ['e']
+
+
+def test_racy_source_rechecks_content(nodl_copy):
+    os.utime(nodl_copy)
+    stat = nodl_copy.stat()
+    nodl._parsing.compile_file(nodl_copy)
+    assert _compiled.load_compiled(nodl_copy) is not None
+
+    # Rewrite with the same size and mtime, as a fast editor might within one tick.
+    nodl_copy.write_bytes(nodl_copy.read_bytes().replace(b'node_1', b'node_3'))
+    os.utime(nodl_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert _compiled.load_compiled(nodl_copy) is None
+    assert nodl._parsing.parse(nodl_copy)[0].name == 'node_3'
+
+
+def test_racy_flag_is_cleared_once_checked(mocker, nodl_copy):
+    os.utime(nodl_copy)
+    mtime_ns = nodl_copy.stat().st_mtime_ns
+    compiled = nodl._parsing.compile_file(nodl_copy)
+
+    def flags():
+        return _compiled._HEADER.unpack_from(compiled.read_bytes())[2]
+
+    # Within the racy window the source could still change unnoticed.
+    assert _compiled.load_compiled(nodl_copy) is not None
+    assert flags() & _compiled._FLAG_RACY
+
+    mocker.patch('time.time_ns', return_value=mtime_ns + _compiled._RACY_WINDOW_NS)
+    assert _compiled.load_compiled(nodl_copy) is not None
+    assert not flags() & _compiled._FLAG_RACY
+
+    digest = mocker.spy(_compiled, '_digest')
+    assert repr(_compiled.load_compiled(nodl_copy)) == repr(nodl._parsing.parse(nodl_copy))
+    digest.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    'corrupt',
+    [
+        lambda content: content[:10],
+        lambda content: b'NOTNODL\0' + content[8:],
+        lambda content: content[:8] + b'\xff\xff' + content[10:],
+        lambda content: content[:-1] + bytes([content[-1] ^ 1]),
+        lambda content: content + b'\0',
+    ],
+    ids=['truncated header', 'magic', 'version', 'checksum', 'size'],
+)
+def test_corrupt_falls_back_to_xml(nodl_copy, corrupt):
+    compiled = nodl._parsing.compile_file(nodl_copy)
+    compiled.write_bytes(corrupt(compiled.read_bytes()))
+
+    assert _compiled.load_compiled(nodl_copy) is None
+    assert len(nodl._parsing.parse(nodl_copy)) == 2
+
+
+def test_missing_source_is_not_loaded(nodl_copy):
+    nodl._parsing.compile_file(nodl_copy)
+    nodl_copy.unlink()
+
+    assert _compiled.load_compiled(nodl_copy) is None
+    with pytest.raises(OSError):
+        nodl._parsing.parse(nodl_copy)
+
+
+def test_invalid_files_are_not_compiled(tmp_path):
+    path = tmp_path / 'bad.nodl.xml'
+    path.write_text('<interface version="1"></interface>')
+
+    with pytest.raises(nodl.errors.InvalidNoDLDocumentError):
+        nodl._parsing.compile_file(path)
+    assert not _compiled.compiled_path(path).exists()
+
+
+def test_lazy_nodes_build_interfaces_on_access(nodl_copy):
+    nodl._parsing.compile_file(nodl_copy)
+    expected = nodl._parsing.parse(nodl_copy, strict=True)
+
+    nodes = nodl._parsing.parse(nodl_copy, lazy=True)
+    assert [node.name for node in nodes] == ['node_1', 'node_2']
+    assert nodes[1].services['/example_service'].role == nodl.types.ServerClientRole.CLIENT
+    assert repr(nodes) == repr(expected)
+    assert repr(pickle.loads(pickle.dumps(nodes))) == repr(expected)
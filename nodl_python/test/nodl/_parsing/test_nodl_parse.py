@@ -13,6 +13,10 @@
 # limitations under the License.
 
 
+import concurrent.futures
+import io
+import mmap
+
 from lxml.builder import E
 import lxml.etree as etree
 import nodl._parsing
@@ -127,3 +131,255 @@ def test_parse_interface(mocker):
         assert (
             nodl._parsing._parsing._parse_interface(interface) is not None
         ), f'Missing version {version}'
+
+
+def test_parse_element_tree_validates_once(mocker, test_nodl_path):
+    interface_mock = mocker.patch('nodl._parsing._parsing.interface_schema')
+
+    nodes = nodl._parsing._parsing._parse_element_tree(etree.parse(str(test_nodl_path)))
+    assert len(nodes) == 2
+    interface_mock.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    'document',
+    [
+        '<interface version="1"></interface>',
+        '<interface version="1"><foo /></interface>',
+        '<interface version="1" foo="bar"><node /></interface>',
+        '<interface version="1"><node name="foo" executable="bar" /></interface>',
+        '<interface version="1"><node name="foo"><topic name="a" type="b" role="c" />'
+        '</node></interface>',
+        '<interface version="2"><node /></interface>',
+        '<interface version="0"><node /></interface>',
+        '<interface><node /></interface>',
+        '<notinterface version="1" />',
+    ],
+)
+def test_parse_element_tree_preserves_errors(document):
+    element_tree = etree.ElementTree(etree.fromstring(document))
+
+    # Errors used to come from validating against the interface and then the v1 schema.
+    expected = None
+    try:
+        nodl._parsing._schemas.interface_schema().assertValid(element_tree)
+        if element_tree.getroot().get('version') != '1':
+            raise nodl.errors.UnsupportedInterfaceError(
+                element_tree.getroot().get('version'),
+                nodl._parsing._parsing.NODL_MAX_SUPPORTED_VERSION,
+            )
+        nodl._parsing._schemas.v1_schema().assertValid(element_tree)
+    except etree.DocumentInvalid as e:
+        expected = nodl.errors.InvalidNoDLDocumentError(e)
+    except nodl.errors.UnsupportedInterfaceError as e:
+        expected = e
+
+    with pytest.raises(type(expected)) as excinfo:
+        nodl._parsing._parsing._parse_element_tree(element_tree)
+    assert str(excinfo.value) == str(expected)
+
+
+def test_iterparse_matches_parse(test_nodl_path):
+    expected = nodl._parsing._parsing.parse(test_nodl_path)
+    nodes = list(nodl._parsing._parsing.iterparse(test_nodl_path))
+
+    assert [node.name for node in nodes] == [node.name for node in expected]
+    for node, expected_node in zip(nodes, expected):
+        assert node.topics == expected_node.topics
+        assert node.services == expected_node.services
+
+
+def test_iterparse_is_incremental():
+    document = b'<interface version="1">' + b''.join(
+        b'<node name="n%d" executable="e%d"><parameter name="p" type="int" /></node>' % (i, i)
+        for i in range(20000)
+    ) + b'</interface>'
+    source = io.BytesIO(document)
+
+    nodes = nodl._parsing._parsing.iterparse(source)
+    assert next(nodes).name == 'n0'
+    # The first node is available long before the whole document has been read.
+    assert source.tell() < len(document)
+
+    for node in nodes:
+        pass
+    assert node.name == 'n19999'
+
+
+def test_iterparse_discards_finished_elements(mocker, test_nodl_path):
+    parse_node = mocker.spy(nodl._parsing._parsing.parse_v1, 'parse_node')
+
+    for _ in nodl._parsing._parsing.iterparse(test_nodl_path):
+        # Only the element of the node being yielded is still attached to the interface.
+        assert parse_node.call_args[0][0].getprevious() is None
+
+
+@pytest.mark.parametrize(
+    'document',
+    [
+        '<interface version="1"></interface>',
+        '<interface version="1">text<node name="a" executable="b"><parameter name="p" type="i"/>'
+        '</node></interface>',
+        '<interface version="1"><node name="a" executable="b"><parameter name="p" type="i"/>'
+        '</node>text</interface>',
+        '<interface version="1"><node name="a" executable="b"><parameter name="p" type="i"/>'
+        '</node>text<node name="c" executable="d"><parameter name="p" type="i"/></node>'
+        '</interface>',
+        '<interface version="1"><node name="a" executable="b"><parameter name="p" type="i"/>'
+        '</node><foo /></interface>',
+        '<interface version="1"><node name="a" executable="b"><parameter name="p" type="i"/>'
+        '</node>\n<node name="c"><topic name="a" type="b" role="c" /></node></interface>',
+        '<interface version="1"><node name="a" executable="b" /></interface>',
+        '<interface version="1" foo="bar"><node /></interface>',
+        '<interface version="2"><node /></interface>',
+        '<notinterface version="1" />',
+        '<interface version="1"><node>',
+    ],
+)
+def test_iterparse_errors_match_parse(tmp_path, document):
+    path = tmp_path / 'test.nodl.xml'
+    path.write_text(document)
+
+    with pytest.raises(nodl.errors.NoDLError) as expected:
+        nodl._parsing._parsing.parse(path)
+    with pytest.raises(type(expected.value)) as excinfo:
+        list(nodl._parsing._parsing.iterparse(path))
+    assert str(excinfo.value) == str(expected.value)
+
+
+@pytest.fixture
+def nodl_files(tmp_path):
+    paths = []
+    for i in range(8):
+        path = tmp_path / f'{i}.nodl.xml'
+        path.write_text(
+            f'<interface version="1"><node name="node_{i}" executable="exe_{i}">'
+            '<parameter name="p" type="int" /></node></interface>'
+        )
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize('max_workers', [None, 1, 4])
+def test_parse_multiple_threads_keep_input_order(nodl_files, max_workers):
+    nodes = nodl._parsing.parse_multiple(nodl_files, max_workers=max_workers)
+    assert [node.executable for node in nodes] == [f'exe_{i}' for i in range(8)]
+
+
+def test_parse_multiple_uses_executor(nodl_files):
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+        nodes = nodl._parsing.parse_multiple(nodl_files, executor=executor)
+    assert [node.executable for node in nodes] == [f'exe_{i}' for i in range(8)]
+
+
+def test_parse_multiple_parallel_error_on_duplicate(nodl_files):
+    with pytest.raises(nodl.errors.DuplicateNodeError):
+        nodl._parsing.parse_multiple(nodl_files + nodl_files[:1], max_workers=4)
+
+
+def test_parse_multiple_parallel_raises_first_error(nodl_files, tmp_path):
+    bad = tmp_path / 'bad.nodl.xml'
+    bad.write_text('<interface version="1"></interface>')
+
+    with pytest.raises(nodl.errors.InvalidNoDLDocumentError):
+        nodl._parsing.parse_multiple([bad] + nodl_files + nodl_files, max_workers=4)
+
+
+def test_parse_lazy(test_nodl_path):
+    nodes = nodl._parsing._parsing.parse(test_nodl_path, lazy=True)
+    assert [node.name for node in nodes] == ['node_1', 'node_2']
+    assert set(nodes[0].parameters) == {'verbose'}
+
+    nodes = nodl._parsing.parse_multiple([test_nodl_path], lazy=True, max_workers=2)
+    assert set(nodes[1].services) == {'/example_service', '/example_service_2'}
+
+
+def test_find_node(mocker, test_nodl_path):
+    parse_node = mocker.spy(nodl._parsing._parsing.parse_v1, 'parse_node')
+
+    node = nodl._parsing._parsing._find_node(test_nodl_path, 'second')
+    assert node.name == 'node_2'
+    assert parse_node.call_count == 1
+
+    assert nodl._parsing._parsing._find_node(test_nodl_path, 'third') is None
+    assert parse_node.call_count == 1
+
+    with pytest.raises(nodl.errors.InvalidNoDLDocumentError):
+        nodl._parsing._parsing._find_node(io.BytesIO(b'<interface version="1" />'), 'first')
+
+
+@pytest.mark.parametrize('wrap', [bytes, bytearray, memoryview], ids=lambda wrap: wrap.__name__)
+def test_parse_bytes(test_nodl_path, wrap):
+    expected = nodl._parsing.parse(test_nodl_path)
+
+    nodes = nodl._parsing.parse_bytes(wrap(test_nodl_path.read_bytes()))
+    assert repr(nodes) == repr(expected)
+
+
+def test_parse_buffer_mmap(test_nodl_path):
+    with test_nodl_path.open('rb') as nodl_file:
+        with mmap.mmap(nodl_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            nodes = nodl._parsing.parse_buffer(buffer, native=True)
+    assert [node.executable for node in nodes] == ['first', 'second']
+
+
+def test_parse_bytes_rejects_str(test_nodl_path):
+    with pytest.raises(TypeError):
+        nodl._parsing.parse_bytes(test_nodl_path.read_text())
+
+
+def test_parse_bytes_errors_name_the_document():
+    with pytest.raises(nodl.errors.InvalidXMLError, match='bundle.tar/a.nodl.xml'):
+        nodl._parsing.parse_bytes(b'<interface', filename='bundle.tar/a.nodl.xml')
+
+    invalid = b'<interface version="1"><node name="n" executable="e"><bad /></node></interface>'
+    for native in (False, True):
+        with pytest.raises(nodl.errors.InvalidNoDLDocumentError, match='b.nodl.xml, line 1'):
+            nodl._parsing.parse_bytes(memoryview(invalid), filename='b.nodl.xml', native=native)
+
+
+@pytest.fixture
+def mixed_paths(tmp_path, test_nodl_path):
+    paths = []
+    for name in ['a', 'b', 'c']:
+        path = tmp_path / f'{name}.nodl.xml'
+        path.write_bytes(test_nodl_path.read_bytes())
+        paths.append(path)
+    paths[1].write_text('<interface version="1"></interface>')
+    paths.append(tmp_path / 'missing.nodl.xml')
+    return paths
+
+
+@pytest.mark.parametrize('max_workers', [None, 3])
+def test_parse_many_reports_every_file(mixed_paths, max_workers):
+    results = list(nodl._parsing.parse_many(mixed_paths, max_workers=max_workers))
+
+    assert [result.source for result in results] == mixed_paths
+    assert [len(result.nodes) for result in results] == [2, 0, 2, 0]
+    assert results[0].error is None and results[2].error is None
+    assert isinstance(results[1].error, nodl.errors.InvalidNoDLDocumentError)
+    assert isinstance(results[3].error, OSError)
+
+
+def test_parse_many_streams(test_nodl_path):
+    consumed = []
+
+    def sources():
+        for index in range(1000):
+            consumed.append(index)
+            yield test_nodl_path
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        results = nodl._parsing.parse_many(sources(), executor=executor)
+        assert not consumed
+        first = next(results)
+        # Only a bounded number of files are read ahead of the consumer.
+        assert len(first.nodes) == 2 and len(consumed) <= 8
+        results.close()
+    assert len(consumed) <= 8
+
+
+def test_parse_many_serial_is_lazy(test_nodl_path):
+    results = nodl._parsing.parse_many(iter([test_nodl_path, 'missing.nodl.xml']))
+    assert len(next(results).nodes) == 2
+    assert next(results).error is not None
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import pickle
+
 from lxml.builder import E
 import lxml.etree as etree
 from nodl import errors
@@ -98,3 +100,38 @@ def test__parse_node_invalid_child():
 def test__parse_nodes(valid_nodl: etree._ElementTree):
     nodes = nodl._parsing._v1._parsing._parse_nodes(valid_nodl.getroot())
     assert len(nodes) == 2
+
+
+def test__parse_node_interns_strings():
+    first = E.topic(name=''.join(['/ch', 'atter']), type='std_msgs/msg/String', role='publisher')
+    second = E.topic(name='/chatter', type=''.join(['std_msgs/', 'msg/String']), role='both')
+
+    topics = [nodl._parsing._v1._parsing._parse_topic(element) for element in (first, second)]
+    assert topics[0].name is topics[1].name
+    assert topics[0].type is topics[1].type
+
+
+def test_parse_lazy_defers_interfaces(mocker, valid_nodl):
+    parse_node = mocker.spy(nodl._parsing._v1._parsing, '_parse_node')
+    nodes = nodl._parsing._v1.parse(valid_nodl.getroot(), lazy=True)
+
+    assert [node.executable for node in nodes] == ['first', 'second']
+    assert all(isinstance(node, nodl.types.Node) for node in nodes)
+    parse_node.assert_not_called()
+
+    assert set(nodes[1].topics) == {'/foo/bar'}
+    assert parse_node.call_count == 1
+    assert nodes[1].actions and nodes[1].parameters and nodes[1].services
+    assert parse_node.call_count == 1
+
+    eager = nodl._parsing._v1.parse(valid_nodl.getroot())
+    assert nodes[1].services == eager[1].services
+    assert repr(nodes[0]) == repr(eager[0])
+
+
+def test_lazy_node_pickles_as_node(valid_nodl):
+    node = nodl._parsing._v1.parse(valid_nodl.getroot(), lazy=True)[1]
+    loaded = pickle.loads(pickle.dumps(node))
+
+    assert type(loaded) is nodl.types.Node
+    assert loaded.actions == node.actions and loaded.topics == node.topics
@@ -0,0 +1,182 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import io
+import random
+from typing import Callable, List
+
+import lxml.etree as etree
+import nodl._parsing
+import nodl._parsing._v1._parsing
+import nodl.errors
+import pytest
+
+P = '<parameter name="p" type="t"/>'
+N = f'<node name="a" executable="b">{P}</node>'
+
+# Each document exercises a rule of v1.xsd; parity tests expect identical outcomes with the
+# built-in validator and with lxml.
+DOCUMENTS = [
+    N,
+    P,
+    '<foo version="1"/>',
+    '<interface version="1"/>',
+    '<interface version="1">\n\n</interface>',
+    f'<interface version="1" foo="x">{N}</interface>',
+    f'<interface foo="x" version="2">{N}</interface>',
+    f'<interface version=" 1 ">{N}</interface>',
+    f'<interface version="1">text{N}</interface>',
+    f'<interface version="1">{N}tail</interface>',
+    f'<interface version="1">{N}<!--c-->text</interface>',
+    '<interface version="1"><foo/></interface>',
+    f'<interface version="1"><foo/>{N}</interface>',
+    f'<interface version="1">{N}<foo/></interface>',
+    f'<interface version="1"><q:node xmlns:q="urn:q" name="a" executable="b">{P}</q:node>'
+    '</interface>',
+    '<interface version="1"><!--c--></interface>',
+    '<interface version="1"><node name="a" executable="b"/></interface>',
+    '<interface version="1"><node name="a" executable="b"><!--c--></node></interface>',
+    f'<interface version="1"><node executable="b">{P}</node></interface>',
+    f'<interface version="1"><node>{P}</node></interface>',
+    f'<interface version="1"><node foo="1" name="a" bar="2">{P}</node></interface>',
+    f'<interface version="1"><node name="a" executable="b" xmlns:q="urn:q" q:foo="1">{P}</node>'
+    '</interface>',
+    f'<interface version="1"><node name="" executable="">{P}</node></interface>',
+    '<interface version="1"><node name="a" executable="b"><bad/></node></interface>',
+    f'<interface version="1"><node name="a" executable="b">{P}{P}<bad/></node></interface>',
+    f'<interface version="1"><node name="a" executable="b"><bad/>{P}</node></interface>',
+    f'<interface version="1"><node name="a" executable="b">x{P}</node></interface>',
+    f'<interface version="1"><node name="a" executable="b">{P}x</node></interface>',
+    f'<interface version="1"><node name="a" executable="b"><!--c-->{P}<?pi x?></node></interface>',
+    '<interface version="1"><node name="a" executable="b"><q:parameter xmlns:q="urn:q"/></node>'
+    '</interface>',
+    '<interface version="1"><node name="a" executable="b">'
+    '<parameter name="p" type="t">x</parameter></node></interface>',
+    '<interface version="1"><node name="a" executable="b">'
+    '<parameter name="p" type="t"> </parameter></node></interface>',
+    '<interface version="1"><node name="a" executable="b">'
+    '<parameter name="p" type="t"><x/></parameter></node></interface>',
+    '<interface version="1"><node name="a" executable="b">'
+    '<parameter name="p" type="t"><!--c--></parameter></node></interface>',
+    '<interface version="1"><node name="a" executable="b">'
+    '<parameter type="t">x<x/></parameter></node></interface>',
+    '<interface version="1"><node name="a" executable="b">'
+    '<parameter name="p" type="t" role="both"/></node></interface>',
+    '<interface version="1"><node name="a" executable="b">'
+    '<parameter name="p" type="t" xml:lang="en"/></node></interface>',
+    '<interface version="1"><node name="a" executable="b">'
+    '<action name="p" type="t" role="bad"/></node></interface>',
+    '<interface version="1"><node name="a" executable="b">'
+    '<service name="p" type="t" role="publisher"/></node></interface>',
+    '<interface version="1"><node name="a" executable="b">'
+    '<topic name="p" type="t" role="server"/></node></interface>',
+    '<interface version="1"><node name="a" executable="b">'
+    '<topic name="p" type="t" role=" both "/></node></interface>',
+    '<interface version="1"><node name="a" executable="b">'
+    '<topic role="bad" foo="1"/></node></interface>',
+    '<interface version="1"><node name="a" executable="b"><topic type="t"/></node></interface>',
+    '<interface version="1">\n<node name="a"\n executable="b">\n  x\n  <parameter\n name="p"'
+    ' type="t"/></node></interface>',
+    '<interface version="1"><node name="a" executable="b"'
+    ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:nil="true">'
+    f'{P}</node></interface>',
+]
+
+
+def outcome(parse: Callable[..., List[nodl.types.Node]], source, *, native: bool) -> str:
+    try:
+        return repr(parse(source, native=native))
+    except nodl.errors.InvalidNoDLError as e:
+        return f'{type(e).__name__}: {e}'
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+def test_parity_with_xsd(document, tmp_path):
+    path = tmp_path / 'test.nodl.xml'
+    path.write_text(document)
+
+    assert outcome(nodl._parsing.parse, path, native=True) == outcome(
+        nodl._parsing.parse, path, native=False
+    )
+    data = document.encode()
+    assert outcome(nodl._parsing.parse, io.BytesIO(data), native=True) == outcome(
+        nodl._parsing.parse, io.BytesIO(data), native=False
+    )
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+def test_iterparse_parity_with_xsd(document):
+    def iterparse(source, *, native):
+        return list(nodl._parsing.iterparse(source, native=native))
+
+    data = document.encode()
+    assert outcome(iterparse, io.BytesIO(data), native=True) == outcome(
+        iterparse, io.BytesIO(data), native=False
+    )
+
+
+def _mutate(tree: etree._ElementTree, rng: random.Random) -> None:
+    elements = list(tree.getroot().iter())
+    element = rng.choice(elements)
+    mutation = rng.randrange(7)
+    if mutation == 0 and element.attrib:
+        del element.attrib[rng.choice(list(element.attrib))]
+    elif mutation == 1:
+        element.set(rng.choice(['name', 'type', 'role', 'executable', 'version', 'x']), 'both')
+    elif mutation == 2:
+        element.tag = rng.choice(['node', 'action', 'parameter', 'topic', 'service', 'bad'])
+    elif mutation == 3:
+        element.text = rng.choice(['x', ' ', '\n  '])
+    elif mutation == 4:
+        element.tail = rng.choice(['x', ' ', None])
+    elif mutation == 5 and element.getparent() is not None:
+        element.getparent().remove(element)
+    else:
+        element.append(copy.deepcopy(rng.choice(elements)))
+
+
+def test_parity_with_xsd_on_mutations(valid_nodl_bytes):
+    rng = random.Random(20201016)
+    for _ in range(500):
+        tree = etree.ElementTree(etree.fromstring(valid_nodl_bytes))
+        for _ in range(rng.randint(1, 3)):
+            _mutate(tree, rng)
+        document = etree.tostring(tree)
+
+        native = outcome(nodl._parsing.parse, io.BytesIO(document), native=True)
+        assert native == outcome(nodl._parsing.parse, io.BytesIO(document), native=False), document
+
+
+@pytest.fixture
+def valid_nodl_bytes(test_nodl_path) -> bytes:
+    return test_nodl_path.read_bytes()
+
+
+def test_native_validation_skips_xsd(mocker, test_nodl_path):
+    v1_schema = mocker.spy(nodl._parsing._v1._parsing, 'v1_schema')
+
+    assert len(nodl._parsing.parse(test_nodl_path, native=True)) == 2
+    v1_schema.assert_not_called()
+
+    nodl._parsing.parse(test_nodl_path)
+    v1_schema.assert_called()
+
+
+def test_comments_are_allowed_in_nodes():
+    document = f'<interface version="1"><node name="a" executable="b"><!--c-->{P}</node>'
+    document += '</interface>'
+    for native in (False, True):
+        nodes = nodl._parsing.parse(io.BytesIO(document.encode()), native=native)
+        assert set(nodes[0].parameters) == {'p'}
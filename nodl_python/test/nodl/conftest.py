@@ -0,0 +1,80 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pytest
+
+
+def _write_nodl(path: Path, executables: List[str]) -> None:
+    path.write_text(
+        '<interface version="1">'
+        + ''.join(
+            f'<node name="{executable}_node" executable="{executable}">'
+            '<parameter name="p" type="int" /></node>'
+            for executable in executables
+        )
+        + '</interface>'
+    )
+
+
+@pytest.fixture
+def test_nodl_path() -> Path:
+    return Path(__file__).parent / '_parsing/test.nodl.xml'
+
+
+@pytest.fixture
+def write_nodl() -> Callable[[Path, List[str]], None]:
+    """Return a function writing a NoDL file describing a node for each executable."""
+    return _write_nodl
+
+
+@pytest.fixture
+def workspace(mocker, tmp_path) -> Dict[str, str]:
+    """Install packages in two prefixes, and return their prefix by package name.
+
+    Package foo describes its executables in two files, baz has no NoDL files and dup defines
+    the same executable twice. Removing a package from the returned dictionary uninstalls it.
+    """
+    prefixes = {
+        'foo': tmp_path / 'install',
+        'bar': tmp_path / 'install',
+        'baz': tmp_path / 'opt',
+        'dup': tmp_path / 'opt',
+    }
+    for package_name, prefix in prefixes.items():
+        (prefix / 'share' / package_name).mkdir(parents=True)
+    _write_nodl(prefixes['foo'] / 'share/foo/a.nodl.xml', ['talker', 'listener'])
+    _write_nodl(prefixes['foo'] / 'share/foo/b.nodl.xml', ['relay'])
+    _write_nodl(prefixes['bar'] / 'share/bar/bar.nodl.xml', ['talker'])
+    _write_nodl(prefixes['dup'] / 'share/dup/a.nodl.xml', ['talker'])
+    _write_nodl(prefixes['dup'] / 'share/dup/b.nodl.xml', ['talker'])
+
+    packages = {package_name: str(prefix) for package_name, prefix in prefixes.items()}
+    mocker.patch('nodl._resource_index.get_packages_with_prefixes', return_value=packages)
+
+    def get_package_share_directory(package_name: str) -> str:
+        return os.path.join(packages[package_name], 'share', package_name)
+
+    mocker.patch('nodl._resource_index.get_package_share_directory', get_package_share_directory)
+    return packages
+
+
+@pytest.fixture
+def xdg_cache_home(monkeypatch, tmp_path) -> Path:
+    """Point XDG_CACHE_HOME to a temporary directory, and return where nodl caches in it."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    return tmp_path / 'nodl'
@@ -0,0 +1,138 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import time
+
+from ament_index_python.packages import PackageNotFoundError
+import nodl._parsing
+import nodl.aio
+import nodl.errors
+import pytest
+
+
+def test_parse(test_nodl_path):
+    nodes = asyncio.run(nodl.aio.parse(test_nodl_path))
+    assert repr(nodes) == repr(nodl._parsing.parse(test_nodl_path))
+
+
+def test_parse_runs_off_the_event_loop(mocker, test_nodl_path):
+    threads = []
+    parse = nodl._parsing._parsing.parse
+
+    def spy(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return parse(*args, **kwargs)
+
+    mocker.patch('nodl._parsing._parsing.parse', side_effect=spy)
+    asyncio.run(nodl.aio.parse(test_nodl_path))
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_parse_errors_propagate(tmp_path):
+    path = tmp_path / 'bad.nodl.xml'
+    path.write_text('<interface version="1">')
+    with pytest.raises(nodl.errors.InvalidNoDLError):
+        asyncio.run(nodl.aio.parse(path))
+
+
+def test_get_node_by_executable(mocker):
+    sync = mocker.patch('nodl._index.get_node_by_executable')
+    node = asyncio.run(
+        nodl.aio.get_node_by_executable(package_name='foo', executable_name='bar', strict=True)
+    )
+    assert node is sync.return_value
+    sync.assert_called_once_with(
+        package_name='foo', executable_name='bar', cache=None, strict=True, index=None
+    )
+
+
+def fake_lookup(delays, running):
+    lock = threading.Lock()
+    peak = [0]
+
+    def lookup(*, package_name, executable_names, cache, index):
+        if package_name not in delays:
+            raise PackageNotFoundError(package_name)
+        with lock:
+            running.append(package_name)
+            peak[0] = max(peak[0], len(running))
+        time.sleep(delays[package_name])
+        with lock:
+            running.remove(package_name)
+        return [], [name for name in executable_names if name != package_name]
+
+    return lookup, peak
+
+
+async def collect(requests, **kwargs):
+    return [result async for result in nodl.aio.iter_nodes_by_executables(requests, **kwargs)]
+
+
+def test_iter_nodes_by_executables_yields_as_completed(mocker):
+    delays = {'slow': 0.2, 'fast': 0.0}
+    lookup, _ = fake_lookup(delays, [])
+    mocker.patch('nodl._index._get_nodes_by_executables', side_effect=lookup)
+
+    results = asyncio.run(collect([('slow', ['slow', 'x']), ('fast', ['y']), ('gone', ['z'])]))
+    by_package = {result.package_name: result for result in results}
+    assert results[-1].package_name == 'slow'
+    assert by_package['fast'] == ('fast', [], ['y'], None)
+    assert by_package['slow'].missing == ['x']
+    # Unresolvable packages are reported instead of aborting the batch.
+    assert isinstance(by_package['gone'].error, PackageNotFoundError)
+    assert by_package['gone'].missing == ['z']
+
+
+def test_iter_nodes_by_executables_reports_unreadable_files(mocker):
+    lookup, _ = fake_lookup({'foo': 0.0}, [])
+
+    def unreadable(*, package_name, **kwargs):
+        if package_name == 'bad':
+            raise OSError('Error reading file')
+        return lookup(package_name=package_name, **kwargs)
+
+    mocker.patch('nodl._index._get_nodes_by_executables', side_effect=unreadable)
+
+    results = asyncio.run(collect([('bad', ['a']), ('foo', ['b'])]))
+    by_package = {result.package_name: result for result in results}
+    assert isinstance(by_package['bad'].error, OSError)
+    assert by_package['bad'].missing == ['a']
+    assert by_package['foo'] == ('foo', [], ['b'], None)
+
+
+def test_iter_nodes_by_executables_limits_concurrency(mocker):
+    running = []
+    lookup, peak = fake_lookup({str(i): 0.02 for i in range(12)}, running)
+    mocker.patch('nodl._index._get_nodes_by_executables', side_effect=lookup)
+
+    results = asyncio.run(collect([(str(i), ['a']) for i in range(12)], max_concurrency=3))
+    assert len(results) == 12
+    assert 1 < peak[0] <= 3
+
+
+def test_iter_nodes_by_executables_cancels_on_exit(mocker):
+    running = []
+    lookup, _ = fake_lookup({str(i): 0.01 for i in range(6)}, running)
+    sync = mocker.patch('nodl._index._get_nodes_by_executables', side_effect=lookup)
+
+    async def first():
+        async for result in nodl.aio.iter_nodes_by_executables(
+            [(str(i), ['a']) for i in range(6)], max_concurrency=1
+        ):
+            return result
+
+    assert asyncio.run(first()).error is None
+    assert sync.call_count < 6
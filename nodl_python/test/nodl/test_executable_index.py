@@ -0,0 +1,158 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from pathlib import Path
+
+import nodl._executable_index
+import nodl._index
+import nodl.errors
+import pytest
+
+
+@pytest.fixture
+def index(tmp_path) -> nodl._executable_index.ExecutableIndex:
+    return nodl._executable_index.ExecutableIndex(tmp_path / 'cache/executables.json')
+
+
+def test_default_path_honours_xdg(xdg_cache_home):
+    assert nodl._executable_index.ExecutableIndex().path == xdg_cache_home / 'executables.json'
+
+
+def test_lookup_and_find(workspace, index):
+    entry = index.lookup('foo', 'relay')
+    assert entry == ('foo', Path(workspace['foo']) / 'share/foo' / 'b.nodl.xml', 'relay_node')
+    # The first file in sorted order wins, as for get_node_by_executable.
+    assert index.lookup('dup', 'talker').path.name == 'a.nodl.xml'
+    assert index.lookup('foo', 'missing') is None
+    assert index.lookup('missing', 'talker') is None
+
+    assert [entry.package_name for entry in index.find('talker')] == ['bar', 'dup', 'foo']
+    assert 'foo' in index and 'baz' not in index and 'missing' not in index
+
+
+def test_persisted_index_is_not_rescanned(mocker, workspace, index):
+    index.refresh()
+    assert index.path.is_file()
+
+    scan = mocker.spy(nodl._executable_index, '_scan_share_directory')
+    warm = nodl._executable_index.ExecutableIndex(index.path)
+    assert warm.lookup('bar', 'talker').node_name == 'talker_node'
+    scan.assert_not_called()
+
+
+def test_refresh_rescans_changed_packages_only(mocker, workspace, index, write_nodl):
+    index.refresh()
+    write_nodl(Path(workspace['baz']) / 'share/baz' / 'baz.nodl.xml', ['server'])
+    os.utime(Path(workspace['baz']) / 'share/baz', ns=(0, 0))
+
+    scan = mocker.spy(nodl._executable_index, '_scan_share_directory')
+    index.refresh()
+    share_directory = os.path.join(workspace['baz'], 'share', 'baz')
+    assert [call.args[1] for call in scan.call_args_list] == [share_directory]
+    assert index.lookup('baz', 'server') is not None
+
+
+def test_refresh_drops_removed_packages(workspace, index):
+    index.refresh()
+    del workspace['bar']
+
+    index.refresh()
+    assert [entry.package_name for entry in index.find('talker')] == ['dup', 'foo']
+    assert 'bar' not in nodl._executable_index.ExecutableIndex(index.path)
+
+
+def test_files_edited_in_place_are_picked_up(workspace, index, write_nodl):
+    index.refresh()
+    path = Path(workspace['bar']) / 'share/bar' / 'bar.nodl.xml'
+    write_nodl(path, ['talker', 'listener'])
+    os.utime(path, ns=(0, 0))
+
+    assert index.get_node('bar', 'listener').name == 'listener_node'
+
+
+def test_get_node_with_extra_interface_attributes(workspace, index):
+    share_directory = Path(workspace['baz']) / 'share/baz'
+    path = share_directory / 'baz.nodl.xml'
+
+    def write(executables):
+        path.write_text(
+            '<interface version="1" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+            'xsi:noNamespaceSchemaLocation="interface.xsd">'
+            + ''.join(
+                f'<node name="{executable}_node" executable="{executable}">'
+                '<parameter name="p" type="int" /></node>'
+                for executable in executables
+            )
+            + '</interface>'
+        )
+        os.utime(path, ns=(0, 0))
+        os.utime(share_directory, ns=(0, 0))
+
+    write(['a', 'b'])
+    assert index.get_node('baz', 'b').executable == 'b'
+
+    # The index still points to the file, which no longer describes the executable.
+    write(['a'])
+    assert index.get_node('baz', 'b') is None
+
+
+def test_scan_file_skips_nested_nodes(tmp_path):
+    path = tmp_path / 'a.nodl.xml'
+    path.write_text(
+        '<interface version="1">'
+        '<node name="a_node" executable="a"><node name="b_node" executable="b" /></node>'
+        '</interface>'
+    )
+
+    assert nodl._executable_index._scan_file(path) == [('a', 'a_node')]
+
+
+def test_corrupt_index_is_rebuilt(workspace, index):
+    index.path.parent.mkdir(parents=True)
+    index.path.write_text('{"version": 1')
+
+    assert index.lookup('foo', 'listener') is not None
+
+
+def test_get_node_by_executable_with_index(mocker, workspace, index):
+    find_node = mocker.spy(nodl._index, '_find_node')
+
+    node = nodl._index.get_node_by_executable(
+        package_name='foo', executable_name='relay', index=index
+    )
+    assert node.name == 'relay_node' and set(node.parameters) == {'p'}
+    find_node.assert_not_called()
+
+    with pytest.raises(nodl.errors.ExecutableNotFoundError):
+        nodl._index.get_node_by_executable(
+            package_name='foo', executable_name='missing', index=index
+        )
+
+
+def test_get_node_by_executable_with_index_keeps_errors(workspace, index):
+    with pytest.raises(nodl.errors.NoNoDLFilesError):
+        nodl._index.get_node_by_executable(package_name='baz', executable_name='a', index=index)
+
+
+def test_get_nodes_by_executables_with_index(mocker, workspace, index):
+    parse = mocker.spy(nodl._executable_index, 'parse')
+
+    nodes, missing = nodl._index._get_nodes_by_executables(
+        package_name='foo', executable_names=['talker', 'listener', 'fizz'], index=index
+    )
+    assert [node.name for node in nodes] == ['talker_node', 'listener_node']
+    assert missing == ['fizz']
+    assert parse.call_count == 1
@@ -0,0 +1,185 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import nodl
+import nodl.errors
+from nodl.graph import InterfaceGraph
+from nodl.types import Action, Node, PubSubRole, ServerClientRole, Service, Topic
+import pytest
+
+
+def topic(name, role, message_type='std_msgs/msg/String'):
+    return Topic(name=name, message_type=message_type, role=PubSubRole(role))
+
+
+@pytest.fixture
+def nodes():
+    return [
+        Node(name='talker', executable='talker', topics=[topic('/chatter', 'publisher')]),
+        Node(
+            name='listener',
+            executable='listener',
+            topics=[topic('/chatter', 'subscription'), topic('/echo', 'both')],
+            services=[
+                Service(name='/reset', service_type='std_srvs/srv/Empty',
+                        role=ServerClientRole.SERVER)
+            ],
+        ),
+        Node(
+            name='resetter',
+            executable='resetter',
+            services=[
+                Service(name='/reset', service_type='std_srvs/srv/Empty',
+                        role=ServerClientRole.CLIENT)
+            ],
+        ),
+        Node(
+            name='planner',
+            executable='planner',
+            actions=[
+                Action(name='/plan', action_type='nav/action/Plan', role=ServerClientRole.SERVER)
+            ],
+            topics=[topic('/chatter', 'publisher', 'std_msgs/msg/Bool')],
+        ),
+        Node(name='lonely', executable='lonely', topics=[topic('/void', 'subscription')]),
+    ]
+
+
+@pytest.fixture
+def graph(nodes):
+    return InterfaceGraph(nodes)
+
+
+def test_endpoint_lookups(graph, nodes):
+    assert set(graph.publishers('/chatter')) == {'talker', 'planner'}
+    assert graph.publishers('/chatter')['talker'] is nodes[0].topics['/chatter']
+    assert set(graph.subscriptions('/chatter')) == {'listener'}
+    # Both roles are on both ends.
+    assert set(graph.publishers('/echo')) == set(graph.subscriptions('/echo')) == {'listener'}
+    assert set(graph.service_servers('/reset')) == {'listener'}
+    assert set(graph.service_clients('/reset')) == {'resetter'}
+    assert set(graph.action_servers('/plan')) == {'planner'}
+    assert not graph.action_clients('/plan')
+    assert not graph.publishers('/missing')
+
+    with pytest.raises(TypeError):
+        graph.publishers('/chatter')['other'] = None
+
+
+def test_channels(graph):
+    assert graph.channels('topic') == ['/chatter', '/echo', '/void']
+    assert graph.channels('service') == ['/reset']
+    assert graph.channels('action') == ['/plan']
+
+
+def test_duplicate_node(graph, nodes):
+    with pytest.raises(nodl.errors.DuplicateNodeError):
+        graph.add_node(nodes[0])
+
+
+def test_connected_components(graph):
+    assert graph.connected_components() == [
+        {'listener', 'planner', 'resetter', 'talker'},
+        {'lonely'},
+    ]
+    assert graph.component('resetter') == {'listener', 'planner', 'resetter', 'talker'}
+
+
+def test_remove_node_updates_indexes(graph):
+    graph.connected_components()
+    graph.remove_node('listener')
+
+    assert 'listener' not in graph and len(graph) == 4
+    assert not graph.subscriptions('/chatter')
+    assert graph.channels('service') == ['/reset']
+    assert '/echo' not in graph.channels('topic')
+    assert graph.component('talker') == {'talker'}
+    with pytest.raises(KeyError):
+        graph.remove_node('listener')
+
+
+def test_to_json(graph):
+    data = json.loads(graph.to_json())
+    assert [node['name'] for node in data['nodes']] == [
+        'listener', 'lonely', 'planner', 'resetter', 'talker'
+    ]
+    assert data['topics'][0] == {
+        'name': '/chatter',
+        'types': ['std_msgs/msg/Bool', 'std_msgs/msg/String'],
+        'providers': ['planner', 'talker'],
+        'users': ['listener'],
+    }
+    assert data['services'] == [
+        {'name': '/reset', 'types': ['std_srvs/srv/Empty'], 'providers': ['listener'],
+         'users': ['resetter']}
+    ]
+    assert data['actions'][0]['users'] == []
+
+
+def test_to_dot(graph):
+    dot = graph.to_dot()
+    assert dot.startswith('digraph "nodl" {\n')
+    assert '  "node:talker" -> "topic:/chatter";\n' in dot
+    assert '  "topic:/chatter" -> "node:listener";\n' in dot
+    assert '  "service:/reset" [label="/reset", shape=hexagon];\n' in dot
+    assert '  "service:/reset" -> "node:resetter";\n' in dot
+    assert dot.endswith('}\n')
+
+
+def test_dot_escapes_names():
+    graph = InterfaceGraph([Node(name='a"b', executable='x', topics=[topic('\\t', 'both')])])
+    assert '"node:a\\"b" [label="a\\"b"];' in graph.to_dot()
+    assert '"topic:\\\\t"' in graph.to_dot()
+
+
+def test_lazy_export():
+    assert nodl.InterfaceGraph is InterfaceGraph
+
+
+def test_problems(graph):
+    graph.add_node(
+        Node(
+            name='resetter2',
+            executable='resetter2',
+            services=[
+                Service(name='/reset', service_type='std_srvs/srv/Trigger',
+                        role=ServerClientRole.SERVER)
+            ],
+        )
+    )
+    assert [(p.severity, p.kind, p.name, p.nodes) for p in graph.problems()] == [
+        ('error', 'topic', '/chatter', ('listener', 'planner', 'talker')),
+        ('warning', 'topic', '/void', ('lonely',)),
+        ('error', 'service', '/reset', ('listener', 'resetter', 'resetter2')),
+        ('error', 'service', '/reset', ('listener', 'resetter2')),
+    ]
+    messages = [problem.message for problem in graph.problems()]
+    assert messages[0] == (
+        'topic /chatter is used with different types: std_msgs/msg/Bool by planner; '
+        'std_msgs/msg/String by listener, talker'
+    )
+    assert messages[1] == 'topic /void has no publisher, subscribed to by lonely'
+    assert messages[3] == 'service /reset has 2 servers: listener, resetter2'
+
+
+def test_qualified_names():
+    node = Node(name='talker', executable='talker', topics=[topic('/chatter', 'publisher')])
+    graph = InterfaceGraph()
+    graph.add_node(node, name='a/talker')
+    graph.add_node(node, name='b/talker')
+    assert set(graph.publishers('/chatter')) == {'a/talker', 'b/talker'}
+    assert [n['name'] for n in graph.to_dict()['nodes']] == ['a/talker', 'b/talker']
+    assert graph.problems() == []
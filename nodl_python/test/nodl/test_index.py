@@ -14,6 +14,7 @@
 
 from typing import List
 
+from ament_index_python.packages import PackageNotFoundError
 import nodl._index
 import nodl.errors
 import pytest
@@ -33,7 +34,7 @@ def tmp_share(tmp_path):
 
 def test__get_nodl_files_from_package_share(mocker, tmp_share):
     # Test gets all files recursively
-    mock = mocker.patch('nodl._index.get_package_share_directory', return_value=tmp_share)
+    mock = mocker.patch('nodl._resource_index.get_package_share_directory', return_value=tmp_share)
     assert (tmp_share / 'a.nodl.xml') in nodl._index._get_nodl_files_from_package_share(
         package_name='foo'
     )
@@ -60,16 +61,67 @@ def test_nodes(mocker) -> List[nodl.types.Node]:
     ]
 
 
-def test_get_node_by_executable(mocker, test_nodes):
+def test_get_node_by_executable_strict(mocker, test_nodes):
     mocker.patch('nodl._index._get_nodes_from_package', return_value=test_nodes)
 
     assert (
-        nodl._index.get_node_by_executable(package_name='', executable_name='bar').executable
+        nodl._index.get_node_by_executable(
+            package_name='', executable_name='bar', strict=True
+        ).executable
         == 'bar'
     )
 
     with pytest.raises(nodl.errors.ExecutableNotFoundError):
-        nodl._index.get_node_by_executable(package_name='', executable_name='fizz')
+        nodl._index.get_node_by_executable(package_name='', executable_name='fizz', strict=True)
+
+
+@pytest.fixture
+def nodl_share(tmp_path, write_nodl):
+    for name, executables in [('a', ['foo', 'bar']), ('b', ['baz', 'foo']), ('c', ['fizz'])]:
+        write_nodl(tmp_path / f'{name}.nodl.xml', executables)
+    return tmp_path
+
+
+def test_get_node_by_executable_stops_at_first_match(mocker, nodl_share):
+    mocker.patch('nodl._resource_index.get_package_share_directory', return_value=nodl_share)
+    find_node = mocker.spy(nodl._index, '_find_node')
+
+    node = nodl._index.get_node_by_executable(package_name='foo', executable_name='bar')
+    assert node.name == 'bar_node' and set(node.parameters) == {'p'}
+    assert find_node.call_count == 1
+
+    with pytest.raises(nodl.errors.ExecutableNotFoundError):
+        nodl._index.get_node_by_executable(package_name='foo', executable_name='buzz')
+    assert find_node.call_count == 4
+
+
+def test_get_node_by_executable_with_extra_interface_attributes(mocker, tmp_path):
+    # Interfaces with other attributes than version are parsed whole rather than streamed.
+    (tmp_path / 'a.nodl.xml').write_text(
+        '<interface version="1" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+        'xsi:noNamespaceSchemaLocation="interface.xsd">'
+        + ''.join(
+            f'<node name="{executable}_node" executable="{executable}">'
+            '<parameter name="p" type="int" /></node>'
+            for executable in ['a', 'b']
+        )
+        + '</interface>'
+    )
+    mocker.patch('nodl._resource_index.get_package_share_directory', return_value=tmp_path)
+
+    node = nodl._index.get_node_by_executable(package_name='foo', executable_name='b')
+    assert node.executable == 'b'
+    with pytest.raises(nodl.errors.ExecutableNotFoundError):
+        nodl._index.get_node_by_executable(package_name='foo', executable_name='nope')
+
+
+def test_get_node_by_executable_strict_detects_duplicates(mocker, nodl_share):
+    mocker.patch('nodl._resource_index.get_package_share_directory', return_value=nodl_share)
+
+    assert nodl._index.get_node_by_executable(package_name='foo', executable_name='foo')
+    with pytest.raises(nodl.errors.DuplicateNodeError):
+        nodl._index.get_node_by_executable(package_name='foo', executable_name='foo', strict=True)
 
 
 def test_get_nodes_by_executables(mocker, test_nodes):
@@ -82,3 +134,59 @@ def test_get_nodes_by_executables(mocker, test_nodes):
 
     assert 'foo' in nodes and 'bar' in nodes and len(nodes.keys()) == 2
     assert missing[0] == 'fizz'
+
+
+def test_resolve_many_parses_each_package_once(mocker, test_nodes):
+    get_nodes = mocker.patch(
+        'nodl._index._get_nodes_from_package', autospec=True, return_value=test_nodes
+    )
+
+    resolution = nodl._index.resolve_many(
+        [('a', 'foo'), ('b', 'bar'), ('a', 'bar'), ('a', 'fizz'), ('a', 'foo')]
+    )
+
+    assert sorted(call.kwargs['package_name'] for call in get_nodes.call_args_list) == ['a', 'b']
+    assert list(resolution.nodes) == [('a', 'foo'), ('a', 'bar'), ('b', 'bar')]
+    assert resolution.nodes['a', 'bar'].executable == 'bar'
+    assert resolution.missing == [nodl._index.Miss('a', 'fizz')]
+
+
+@pytest.mark.parametrize('max_workers', [None, 4])
+def test_resolve_many_reports_unreadable_packages(mocker, nodl_share, max_workers):
+    def share_directory(package_name):
+        if package_name == 'gone':
+            raise PackageNotFoundError(package_name)
+        return nodl_share / package_name
+
+    (nodl_share / 'good').mkdir()
+    (nodl_share / 'a.nodl.xml').rename(nodl_share / 'good' / 'a.nodl.xml')
+    mocker.patch('nodl._resource_index.get_package_share_directory', side_effect=share_directory)
+
+    resolution = nodl._index.resolve_many(
+        [('good', 'foo'), ('gone', 'foo'), ('good', 'baz'), ('gone', 'bar')],
+        max_workers=max_workers,
+    )
+
+    assert list(resolution.nodes) == [('good', 'foo')]
+    assert resolution.nodes['good', 'foo'].name == 'foo_node'
+    assert [miss[:2] for miss in resolution.missing] == [
+        ('good', 'baz'),
+        ('gone', 'foo'),
+        ('gone', 'bar'),
+    ]
+    assert resolution.missing[0].error is None
+    assert all(isinstance(miss.error, PackageNotFoundError) for miss in resolution.missing[1:])
+
+
+def test_resolve_many_reports_unreadable_files(mocker, nodl_share):
+    # Package gone lists a file that is not there, e.g. removed since it was registered.
+    mocker.patch(
+        'nodl._index._get_nodl_files_from_package_share',
+        side_effect=lambda package_name: [nodl_share / f'{package_name}.nodl.xml'],
+    )
+
+    resolution = nodl._index.resolve_many([('gone', 'foo'), ('c', 'fizz')])
+
+    assert list(resolution.nodes) == [('c', 'fizz')]
+    [miss] = resolution.missing
+    assert miss[:2] == ('gone', 'foo') and isinstance(miss.error, OSError)
@@ -0,0 +1,50 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import sys
+
+import nodl
+import pytest
+
+
+def test_import_does_not_load_parsing_stack():
+    code = (
+        'import sys, nodl, nodl.errors, nodl.types; '
+        'print(sorted(name for name in ("lxml.etree", "nodl._parsing", "nodl._index") '
+        'if name in sys.modules))'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code], stdout=subprocess.PIPE, universal_newlines=True, check=True
+    )
+    assert result.stdout.strip() == '[]'
+
+
+def test_shared_index_does_not_load_lxml():
+    code = 'import sys, nodl; nodl.SharedIndex; print("lxml.etree" in sys.modules)'
+    result = subprocess.run(
+        [sys.executable, '-c', code], stdout=subprocess.PIPE, universal_newlines=True, check=True
+    )
+    assert result.stdout.strip() == 'False'
+
+
+def test_public_names_resolve_lazily():
+    assert nodl.parse is nodl._parsing.parse
+    assert nodl.get_node_by_executable is nodl._index.get_node_by_executable
+    assert set(nodl.__all__) <= set(dir(nodl))
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        nodl.does_not_exist
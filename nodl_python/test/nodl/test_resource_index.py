@@ -0,0 +1,134 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import stat
+import sys
+
+import nodl
+import nodl._executable_index
+import nodl._index
+import nodl._resource_index
+import nodl._shared_index
+import nodl._util
+import nodl.errors
+import pytest
+
+
+@pytest.fixture
+def prefixes(monkeypatch, tmp_path):
+    prefixes = [tmp_path / 'install', tmp_path / 'opt']
+    for prefix in prefixes:
+        (prefix / 'share/ament_index/resource_index/packages').mkdir(parents=True)
+    monkeypatch.setenv('AMENT_PREFIX_PATH', os.pathsep.join(str(p) for p in prefixes))
+    return prefixes
+
+
+def test_register_and_lookup(prefixes):
+    marker = nodl.register_nodl_files(
+        prefixes[0], 'foo', ['b.nodl.xml', 'nodl/a.nodl.xml', 'b.nodl.xml']
+    )
+    assert marker.read_text() == 'b.nodl.xml\nnodl/a.nodl.xml\n'
+
+    share = prefixes[0] / 'share/foo'
+    assert nodl._resource_index.get_registered_nodl_files('foo') == [
+        share / 'b.nodl.xml',
+        share / 'nodl/a.nodl.xml',
+    ]
+    assert nodl._resource_index.get_registered_nodl_files('bar') is None
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX permissions')
+def test_marker_is_readable_by_everyone(prefixes):
+    marker = nodl.register_nodl_files(prefixes[0], 'foo', ['foo.nodl.xml'])
+    assert stat.S_IMODE(os.stat(marker).st_mode) == 0o666 & ~nodl._util._umask()
+
+
+def test_get_packages_with_nodl(prefixes):
+    nodl.register_nodl_files(prefixes[0], 'foo', ['foo.nodl.xml'])
+    nodl.register_nodl_files(prefixes[1], 'bar', [])
+    (prefixes[1] / 'share/ament_index/resource_index/packages/baz').touch()
+
+    assert nodl.get_packages_with_nodl() == {'foo': str(prefixes[0]), 'bar': str(prefixes[1])}
+
+
+@pytest.mark.parametrize('file_name', ['/abs.nodl.xml', '../up.nodl.xml', 'a\nb', ''])
+def test_register_rejects_invalid_names(prefixes, file_name):
+    with pytest.raises(ValueError):
+        nodl.register_nodl_files(prefixes[0], 'foo', [file_name])
+
+
+def test_discovery_reads_marker_without_globbing(mocker, prefixes):
+    (prefixes[0] / 'share/foo').mkdir()
+    (prefixes[0] / 'share/foo/foo.nodl.xml').touch()
+    nodl.register_nodl_files(prefixes[0], 'foo', ['foo.nodl.xml'])
+    share_mock = mocker.patch('nodl._resource_index.get_package_share_directory')
+
+    assert nodl._index._get_nodl_files_from_package_share(package_name='foo') == [
+        prefixes[0] / 'share/foo/foo.nodl.xml'
+    ]
+    share_mock.assert_not_called()
+
+
+def test_discovery_falls_back_to_globbing(mocker, prefixes, tmp_path):
+    (tmp_path / 'bar.nodl.xml').touch()
+    mocker.patch('nodl._resource_index.get_package_share_directory', return_value=tmp_path)
+
+    assert nodl._index._get_nodl_files_from_package_share(package_name='bar') == [
+        tmp_path / 'bar.nodl.xml'
+    ]
+
+
+def test_discovery_skips_missing_registered_files(prefixes, tmp_path, write_nodl):
+    share = prefixes[0] / 'share/foo'
+    share.mkdir()
+    write_nodl(share / 'a.nodl.xml', ['a'])
+    nodl.register_nodl_files(prefixes[0], 'foo', ['a.nodl.xml', 'gone.nodl.xml'])
+
+    assert nodl._resource_index.find_nodl_files('foo') == [share / 'a.nodl.xml']
+    nodes = nodl._index._get_nodes_from_package(package_name='foo')
+    assert [node.executable for node in nodes] == ['a']
+    with pytest.raises(nodl.errors.ExecutableNotFoundError):
+        nodl.get_node_by_executable(package_name='foo', executable_name='b')
+    with nodl._shared_index.SharedIndex(tmp_path / 'nodes.index') as shared_index:
+        assert shared_index.build() == 1
+
+
+def test_empty_registration_has_no_files(prefixes):
+    nodl.register_nodl_files(prefixes[0], 'foo', [])
+
+    with pytest.raises(nodl.errors.NoNoDLFilesError):
+        nodl._index._get_nodl_files_from_package_share(package_name='foo')
+
+
+def test_every_lookup_uses_registered_files(prefixes, tmp_path, write_nodl):
+    share = prefixes[1] / 'share/foo'
+    (share / 'nodl').mkdir(parents=True)
+    (prefixes[0] / 'share/ament_index/resource_index/packages/foo').touch()
+    write_nodl(share / 'nodl/registered.xml', ['registered'])
+    write_nodl(share / 'ignored.nodl.xml', ['ignored'])
+    nodl.register_nodl_files(prefixes[1], 'foo', ['nodl/registered.xml'])
+
+    assert nodl._resource_index.get_nodl_package_prefixes()['foo'] == str(prefixes[1])
+    assert nodl._index._get_nodl_files_from_package_share(package_name='foo') == [
+        share / 'nodl/registered.xml'
+    ]
+
+    executable_index = nodl._executable_index.ExecutableIndex(tmp_path / 'executables.json')
+    assert executable_index.lookup('foo', 'registered').path == share / 'nodl/registered.xml'
+    assert executable_index.lookup('foo', 'ignored') is None
+
+    with nodl._shared_index.SharedIndex(tmp_path / 'nodes.index') as shared_index:
+        assert shared_index.build() == 1
+        assert shared_index.get_node('foo', 'registered').name == 'registered_node'
+        assert shared_index.get_node('foo', 'ignored') is None
@@ -0,0 +1,92 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import io
+import json
+
+from nodl.serialization import (
+    JSONWriter,
+    node_from_dict,
+    node_to_dict,
+    write_json,
+    write_jsonl,
+)
+from nodl.types import Action, Node, Parameter, PubSubRole, ServerClientRole, Service, Topic
+import pytest
+
+
+@pytest.fixture
+def node():
+    return Node(
+        name='nöde',
+        executable='exe',
+        actions=[Action(name='/a', action_type='pkg/action/A', role=ServerClientRole.BOTH)],
+        parameters=[Parameter(name='rate', parameter_type='int')],
+        services=[Service(name='/s', service_type='pkg/srv/S', role=ServerClientRole.CLIENT)],
+        topics=[Topic(name='/t', message_type='pkg/msg/T', role=PubSubRole.PUBLISHER)],
+    )
+
+
+def test_node_to_dict(node):
+    assert node_to_dict(node) == {
+        'name': 'nöde',
+        'executable': 'exe',
+        'actions': [{'name': '/a', 'type': 'pkg/action/A', 'role': 'both'}],
+        'parameters': [{'name': 'rate', 'type': 'int'}],
+        'services': [{'name': '/s', 'type': 'pkg/srv/S', 'role': 'client'}],
+        'topics': [{'name': '/t', 'type': 'pkg/msg/T', 'role': 'publisher'}],
+    }
+
+
+def test_round_trip(node):
+    restored = node_from_dict(json.loads(json.dumps(node_to_dict(node))))
+    assert restored.freeze() == node.freeze()
+    assert restored.topics['/t'].role is PubSubRole.PUBLISHER
+
+
+def test_from_dict_rejects_invalid_roles(node):
+    data = node_to_dict(node)
+    data['services'][0]['role'] = 'publisher'
+    with pytest.raises(ValueError):
+        node_from_dict(data)
+
+
+def test_write_json(node):
+    stream = io.StringIO()
+    write_json((n for n in [node, node]), stream)
+    assert json.loads(stream.getvalue()) == [node_to_dict(node)] * 2
+
+
+def test_write_json_empty():
+    stream = io.StringIO()
+    write_json([], stream)
+    assert json.loads(stream.getvalue()) == []
+
+
+def test_write_jsonl(node):
+    stream = io.StringIO()
+    write_jsonl([node, node], stream)
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == [node_to_dict(node)] * 2
+
+
+def test_writer_streams_nodes(node):
+    stream = io.StringIO()
+    writer = JSONWriter(stream)
+    writer.write(node)
+    # The node is written before the array is terminated.
+    assert '"exe"' in stream.getvalue()
+
+    writer.close()
+    writer.close()
+    assert json.loads(stream.getvalue()) == [node_to_dict(node)]
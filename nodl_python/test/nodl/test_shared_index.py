@@ -0,0 +1,148 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+from pathlib import Path
+import sys
+import threading
+from typing import Iterator
+
+import nodl
+import nodl._index
+import nodl._shared_index
+import pytest
+
+
+@pytest.fixture
+def index(tmp_path) -> Iterator[nodl._shared_index.SharedIndex]:
+    with nodl._shared_index.SharedIndex(tmp_path / 'cache/nodes.index') as index:
+        yield index
+
+
+def test_default_path_honours_xdg(xdg_cache_home):
+    assert nodl.SharedIndex().path == xdg_cache_home / 'nodes.index'
+
+
+def test_get_node(workspace, index):
+    assert index.build() == 4
+    assert len(index) == 4
+
+    node = index.get_node('foo', 'relay')
+    expected = nodl.parse(Path(workspace['foo']) / 'share/foo/b.nodl.xml')[0]
+    assert repr(node) == repr(expected)
+    assert index.get_node('bar', 'talker').name == 'talker_node'
+    assert index.get_node('bar', 'relay') is None
+    assert index.get_node('missing', 'talker') is None
+
+
+def test_contains(workspace, index):
+    index.build()
+    assert 'foo' in index and 'bar' in index
+    assert 'ba' not in index
+    assert 'baz' not in index
+    # Packages that fail to parse are left to the regular lookup.
+    assert 'dup' not in index
+
+
+def test_build_selected_packages(workspace, index):
+    assert index.build(['bar', 'unknown']) == 1
+    assert 'bar' in index and 'foo' not in index
+
+
+def test_get_nodes(workspace, index):
+    index.build()
+    nodes, missing = index.get_nodes('foo', ['talker', 'missing', 'listener', 'talker'])
+    assert [node.executable for node in nodes] == ['talker', 'listener']
+    assert missing == ['missing']
+
+
+def test_get_node_by_executable(workspace, index):
+    index.build()
+    node = nodl._index.get_node_by_executable(
+        package_name='foo', executable_name='listener', index=index
+    )
+    assert node.name == 'listener_node'
+    with pytest.raises(nodl.errors.ExecutableNotFoundError):
+        nodl._index.get_node_by_executable(
+            package_name='foo', executable_name='missing', index=index
+        )
+    with pytest.raises(nodl.errors.DuplicateNodeError):
+        nodl._index.get_node_by_executable(
+            package_name='dup', executable_name='talker', index=index, strict=True
+        )
+
+
+def test_missing_or_invalid_file_is_empty(tmp_path):
+    index = nodl._shared_index.SharedIndex(tmp_path / 'nodes.index')
+    assert len(index) == 0 and 'foo' not in index
+    assert index.is_stale()
+
+    index.path.write_bytes(b'')
+    index.close()
+    assert len(index) == 0
+
+    index.path.write_bytes(b'not an index, but long enough to have a header')
+    index.close()
+    assert index.get_node('foo', 'talker') is None
+
+
+def test_rebuild_is_seen_after_close(workspace, index, write_nodl):
+    index.build()
+    other = nodl._shared_index.SharedIndex(index.path)
+    assert other.get_node('bar', 'talker') is not None
+
+    write_nodl(Path(workspace['bar']) / 'share/bar/bar.nodl.xml', ['relay'])
+    index.build()
+    # The previous file stays mapped until it is closed.
+    assert other.get_node('bar', 'talker') is not None
+    other.close()
+    assert other.get_node('bar', 'talker') is None
+    assert other.get_node('bar', 'relay') is not None
+    other.close()
+
+
+def test_is_stale(workspace, index):
+    index.build()
+    assert not index.is_stale()
+
+    path = Path(workspace['foo']) / 'share/foo/a.nodl.xml'
+    os.utime(path, ns=(0, 0))
+    assert index.is_stale()
+
+
+def test_lookups_race_with_close(workspace, index):
+    index.build()
+    errors = []
+
+    def look_up():
+        try:
+            for _ in range(500):
+                assert index.get_node('foo', 'relay').name == 'relay_node'
+                assert 'foo' in index
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=look_up) for _ in range(4)]
+    # Switch threads as often as possible, for lookups to be interrupted by close.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            index.close()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert errors == []
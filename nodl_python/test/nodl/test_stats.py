@@ -0,0 +1,89 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import nodl
+import nodl._stats
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    nodl.reset_stats()
+    yield
+    nodl.disable_stats()
+    nodl.reset_stats()
+
+
+def test_nothing_is_collected_by_default(test_nodl_path):
+    nodl.parse(test_nodl_path)
+    assert nodl.stats() == {}
+
+
+def test_parse_stages(test_nodl_path):
+    nodl.enable_stats()
+    nodl.parse(test_nodl_path, native=True)
+    nodl.parse(test_nodl_path)
+    nodl.disable_stats()
+    nodl.parse(test_nodl_path)
+
+    stats = nodl.stats()
+    assert stats['parse.xml'].calls == 2
+    assert stats['parse.xml'].bytes_read == 2 * test_nodl_path.stat().st_size
+    assert stats['v1.build'].calls == 2
+    assert stats['v1.validate_xsd'].calls == 1
+    assert all(stage.seconds > 0 for stage in stats.values())
+
+
+def test_index_stages(mocker, test_nodl_path):
+    mocker.patch(
+        'nodl._resource_index.get_package_share_directory', return_value=test_nodl_path.parent
+    )
+    nodl.enable_stats()
+    nodl.get_node_by_executable(package_name='foo', executable_name='second')
+
+    stats = nodl.stats()
+    assert stats['index.glob'].calls == 1
+    assert stats['parse.find_node'].calls == 1
+
+
+def test_failed_calls_are_counted():
+    @nodl._stats.timed('test.fail')
+    def fail():
+        raise ValueError
+
+    nodl.enable_stats()
+    with pytest.raises(ValueError):
+        fail()
+    with nodl._stats.stage('test.block'):
+        pass
+    assert nodl.stats()['test.fail'].calls == 1
+    assert nodl.stats()['test.block'].calls == 1
+
+
+def test_chrome_trace(tmp_path, test_nodl_path):
+    nodl.enable_stats()
+    nodl.parse(test_nodl_path)
+    assert nodl._stats.chrome_trace()['traceEvents'] == []
+
+    nodl.enable_stats(trace=True)
+    nodl.parse(test_nodl_path)
+    trace_path = tmp_path / 'trace.json'
+    nodl.write_chrome_trace(trace_path)
+
+    events = json.loads(trace_path.read_text())['traceEvents']
+    assert [event['name'] for event in events] == ['parse.xml', 'v1.validate_xsd', 'v1.build']
+    assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in events)
+    assert events[0]['ts'] == 0 and events[1]['ts'] >= events[0]['dur']
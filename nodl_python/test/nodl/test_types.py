@@ -13,6 +13,8 @@
 # limitations under the License.
 
 
+import pickle
+
 import nodl.types
 import pytest
 
@@ -105,3 +107,73 @@ def test_node(topic_publisher):
     assert node.executable == 'toast'
     assert node.topics[topic_publisher.name] == topic_publisher
     assert node.services[service.name] == service
+
+
+def test_instances_are_slotted(topic_publisher):
+    node = nodl.types.Node(name='test', executable='toast', topics=[topic_publisher])
+    assert not hasattr(topic_publisher, '__dict__')
+    assert not hasattr(node, '__dict__')
+    assert repr(topic_publisher) == str(
+        {'name': 'foo', 'type': 'bar', 'role': nodl.types.PubSubRole.PUBLISHER}
+    )
+
+
+def test_pickle_round_trip(topic_publisher):
+    node = nodl.types.Node(name='test', executable='toast', topics=[topic_publisher])
+    loaded = pickle.loads(pickle.dumps(node))
+    assert loaded.name == 'test' and loaded.topics['foo'] == topic_publisher
+
+
+def test_frozen_interfaces_are_hashable(topic_publisher):
+    frozen = topic_publisher.freeze()
+    assert type(frozen) is nodl.types.FrozenTopic
+    assert frozen.freeze() is frozen
+    assert frozen == nodl.types.FrozenTopic(
+        name='foo', message_type='bar', role=nodl.types.PubSubRole.PUBLISHER
+    )
+    assert hash(frozen) == hash(topic_publisher.freeze())
+    assert frozen != topic_publisher
+
+    interfaces = [
+        nodl.types.Action(name='foo', action_type='bar', role=nodl.types.ServerClientRole.BOTH),
+        nodl.types.Parameter(name='foo', parameter_type='bar'),
+        nodl.types.Service(name='foo', service_type='bar', role=nodl.types.ServerClientRole.BOTH),
+        topic_publisher,
+    ]
+    # Same name and type but different kinds of interface stay distinct.
+    assert len({interface.freeze() for interface in interfaces * 2}) == 4
+
+
+def test_frozen_interfaces_are_immutable(topic_publisher):
+    frozen = topic_publisher.freeze()
+    with pytest.raises(AttributeError):
+        frozen.name = 'bar'
+    with pytest.raises(AttributeError):
+        del frozen.role
+
+
+def test_frozen_node(topic_publisher):
+    node = nodl.types.Node(name='test', executable='toast', topics=[topic_publisher])
+    frozen = node.freeze()
+
+    assert frozen.topics['foo'] == topic_publisher.freeze()
+    with pytest.raises(TypeError):
+        frozen.topics['bar'] = topic_publisher.freeze()
+    with pytest.raises(AttributeError):
+        frozen.executable = 'bread'
+
+    assert frozen == nodl.types.FrozenNode(
+        name='test', executable='toast', topics=[topic_publisher]
+    )
+    assert frozen != nodl.types.FrozenNode(name='test', executable='toast')
+    assert len({frozen, node.freeze(), nodl.types.FrozenNode(name='a', executable='b')}) == 2
+    assert 'toast' in repr(frozen) and '_hash' not in repr(frozen)
+
+
+def test_frozen_pickle_round_trip(topic_publisher):
+    frozen = nodl.types.Node(name='test', executable='toast', topics=[topic_publisher]).freeze()
+    loaded = pickle.loads(pickle.dumps(frozen))
+
+    assert loaded == frozen and hash(loaded) == hash(frozen)
+    with pytest.raises(TypeError):
+        loaded.topics['bar'] = topic_publisher.freeze()
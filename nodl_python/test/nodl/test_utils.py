@@ -12,8 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import stat
+import sys
+
 from lxml import etree
-from nodl._util import get_bool_attribute
+from nodl._util import _umask, get_bool_attribute, str_to_bool, write_atomic
+import pytest
 
 
 def test_get_bool_attribute_except(mocker):
@@ -21,3 +26,30 @@ def test_get_bool_attribute_except(mocker):
     assert get_bool_attribute(foo, 'bar')
     foo.set('bar', 'false')
     assert not get_bool_attribute(foo, 'bar')
+
+
+@pytest.mark.parametrize('value', ['true', 'True', '1', 'yes', 'on', 't', 'Y'])
+def test_str_to_bool_true(value):
+    assert str_to_bool(value) is True
+
+
+@pytest.mark.parametrize('value', ['false', 'FALSE', '0', 'no', 'off', 'f', 'n'])
+def test_str_to_bool_false(value):
+    assert str_to_bool(value) is False
+
+
+def test_str_to_bool_invalid():
+    with pytest.raises(ValueError):
+        str_to_bool('maybe')
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX permissions')
+def test_write_atomic_mode(tmp_path):
+    private = tmp_path / 'private'
+    assert write_atomic(private, b'data')
+    assert stat.S_IMODE(os.stat(private).st_mode) == 0o600
+
+    shared = tmp_path / 'shared'
+    assert write_atomic(shared, b'data', mode=0o666)
+    assert shared.read_bytes() == b'data'
+    assert stat.S_IMODE(os.stat(shared).st_mode) == 0o666 & ~_umask()
@@ -0,0 +1,80 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Track the cold-start import cost of nodl and of the ros2 nodl verbs.
+
+Every module is imported in a fresh interpreter under `-X importtime`, keeping the best of
+several runs. The modules pulled in by nodl's parsing stack must not be loaded just by
+importing a verb; the script exits with 1 if they are, or if --max-ms is exceeded.
+
+Run from the package root: python3 benchmark/bench_importtime.py [--max-ms MS]
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+MODULES = [
+    'nodl',
+    'ros2nodl._verb._check',
+    'ros2nodl._verb._compile',
+    'ros2nodl._verb._show',
+    'ros2nodl._verb._validate',
+]
+
+# Only needed once a verb actually parses files.
+DEFERRED_MODULES = ['lxml.etree', 'nodl._parsing', 'nodl._index']
+
+
+def import_time(module: str) -> Tuple[int, Dict[str, int]]:
+    """Return the cumulative import time of module and of everything it loaded, in us."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    loaded = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        loaded[name.strip()] = int(cumulative)
+    return loaded[module], loaded
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per module.')
+    parser.add_argument('--max-ms', type=float, help='Fail if any module takes longer.')
+    args = parser.parse_args(argv)
+
+    failed = False
+    print(f'{"module":<28} {"best ms":>8} {"worst ms":>9}  deferred modules loaded')
+    for module in MODULES:
+        runs = [import_time(module) for _ in range(args.repeat)]
+        times = [total for total, _ in runs]
+        eager = [name for name in DEFERRED_MODULES if name in runs[0][1]]
+        print(
+            f'{module:<28} {min(times) / 1e3:>8.1f} {max(times) / 1e3:>9.1f}'
+            f'  {", ".join(eager) or "-"}'
+        )
+        if eager or (args.max_ms is not None and min(times) / 1e3 > args.max_ms):
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,52 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The --format option shared by the verbs printing nodes."""
+
+import argparse
+import contextlib
+import pprint
+import shutil
+import sys
+from typing import Callable, Iterator
+
+import nodl
+
+PRETTY = 'pretty'
+JSON = 'json'
+JSON_LINES = 'jsonl'
+
+
+def add_format_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        '--format',
+        choices=(PRETTY, JSON, JSON_LINES),
+        default=PRETTY,
+        help='Print nodes pretty-printed, as a JSON array or as JSON lines, one node per line.',
+    )
+
+
+@contextlib.contextmanager
+def node_printer(format_: str) -> Iterator[Callable[['nodl.types.Node'], None]]:
+    """Return a function printing nodes to stdout in format_, as each is passed to it."""
+    if format_ == PRETTY:
+        width = shutil.get_terminal_size()[0]
+        yield lambda node: pprint.pprint(node, width=width)
+        return
+
+    # Imported here as every ros2 invocation loads the verbs.
+    from nodl.serialization import JSONWriter
+
+    with JSONWriter(sys.stdout, lines=format_ == JSON_LINES) as writer:
+        yield writer.write
@@ -0,0 +1,71 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The --profile option shared by the verbs."""
+
+import argparse
+import contextlib
+import sys
+import time
+from typing import Dict, Iterator, Optional
+
+import nodl
+
+_TO_STDERR = '-'
+
+
+def add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const=_TO_STDERR,
+        metavar='TRACE_FILE',
+        help='Print the time spent in each stage of NoDL lookup and parsing to stderr, '
+        'or write a Chrome trace of every stage to TRACE_FILE.',
+    )
+
+
+def format_stats(stats: Dict[str, 'nodl.StageStats'], elapsed: float) -> str:
+    """Return a table of stats, with each stage's share of elapsed seconds."""
+    lines = [f'{"stage":<26} {"calls":>6} {"total ms":>9} {"share":>6} {"bytes read":>11}']
+    for name, stage in stats.items():
+        share = stage.seconds / elapsed if elapsed else 0.0
+        lines.append(
+            f'{name:<26} {stage.calls:>6} {stage.seconds * 1e3:>9.2f} {share:>6.1%}'
+            f' {stage.bytes_read or "-":>11}'
+        )
+    lines.append(f'{"wall clock":<26} {"":>6} {elapsed * 1e3:>9.2f}')
+    return '\n'.join(lines)
+
+
+@contextlib.contextmanager
+def profile(destination: Optional[str]) -> Iterator[None]:
+    """Collect NoDL statistics while the block runs, if destination is set by --profile."""
+    if destination is None:
+        yield
+        return
+
+    nodl.reset_stats()
+    nodl.enable_stats(trace=destination != _TO_STDERR)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        nodl.disable_stats()
+        if destination == _TO_STDERR:
+            print(format_stats(nodl.stats(), elapsed), file=sys.stderr)
+        else:
+            nodl.write_chrome_trace(destination)
+            print(f'Wrote trace to {destination}', file=sys.stderr)
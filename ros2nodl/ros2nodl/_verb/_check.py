@@ -0,0 +1,105 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import sys
+import time
+from typing import Iterator, List, Union
+
+import nodl
+from ros2cli.verb import VerbExtension
+from ros2nodl._profile import add_profile_argument, profile
+from ros2pkg.api import package_name_completer, PackageNotFoundError
+
+
+class _CheckVerb(VerbExtension):
+    """Check the NoDL of packages for conflicts between nodes."""
+
+    def add_arguments(self, parser: argparse.ArgumentParser, cli_name: None = None):
+        # Ignoring type because of https://github.com/python/typeshed/issues/1878
+        parser.add_argument(  # type: ignore
+            'packages',
+            nargs='*',
+            default=[],
+            metavar='package',
+            help='Packages to check together, defaults to every package exporting NoDL.',
+        ).completer = package_name_completer
+        parser.add_argument(
+            '-j',
+            '--jobs',
+            type=int,
+            default=1,
+            metavar='N',
+            help='Number of packages to load in parallel.',
+        )
+        add_profile_argument(parser)
+
+    def main(self, args: argparse.Namespace) -> int:
+        with profile(args.profile):
+            return self._main(args)
+
+    def _main(self, args: argparse.Namespace) -> int:
+        start = time.perf_counter()
+        # Found like the files of each package, so packages registering NoDL files in the
+        # ament resource index are checked from the prefix they register in.
+        packages = args.packages or sorted(nodl._resource_index.get_nodl_package_prefixes())
+
+        graph = nodl.InterfaceGraph()
+        loaded = 0
+        failed = False
+        for package, result in zip(packages, _load_all(packages, jobs=args.jobs)):
+            if isinstance(result, nodl.errors.NoNoDLFilesError) and not args.packages:
+                continue
+            if isinstance(result, Exception):
+                print(result, file=sys.stderr)
+                failed = True
+                continue
+            loaded += 1
+            for node in result:
+                # Executables are unique within a package, node names need not be.
+                graph.add_node(node, name=f'{package}/{node.executable}')
+
+        problems = graph.problems()
+        for problem in problems:
+            print(f'{problem.severity}: {problem.message}')
+        errors = sum(problem.severity == 'error' for problem in problems)
+        elapsed = time.perf_counter() - start
+        print(
+            f'{errors} errors, {len(problems) - errors} warnings in {len(graph)} nodes'
+            f' from {loaded} packages in {elapsed:.2f}s'
+        )
+        return 1 if errors or failed else 0
+
+
+def _load(package: str) -> Union[List[nodl.types.Node], Exception]:
+    """Return the nodes of a package, or the error raised loading them."""
+    try:
+        return nodl._index._get_nodes_from_package(package_name=package)
+    except (PackageNotFoundError, nodl.errors.NoDLError, OSError) as e:
+        return e
+
+
+def _load_all(
+    packages: List[str], *, jobs: int
+) -> Iterator[Union[List[nodl.types.Node], Exception]]:
+    """Yield the nodes of each package in order, loading them on jobs workers."""
+    if jobs <= 1:
+        yield from map(_load, packages)
+        return
+
+    # Imported here as every ros2 invocation loads the verbs.
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(_load, packages)
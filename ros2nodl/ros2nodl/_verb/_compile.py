@@ -0,0 +1,91 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import argparse
+from pathlib import Path
+import sys
+import time
+from typing import List
+
+from argcomplete.completers import FilesCompleter
+import nodl
+from nodl._util import FILE_EXTENSION
+from ros2cli.verb import VerbExtension
+from ros2nodl._profile import add_profile_argument, profile
+
+
+class _CompileVerb(VerbExtension):
+    """Validate NoDL XML documents and compile them for faster loading."""
+
+    def add_arguments(self, parser: argparse.ArgumentParser, cli_name: None = None):
+        # Ignoring type because of https://github.com/python/typeshed/issues/1878
+        parser.add_argument(  # type: ignore
+            'files',
+            nargs='*',
+            default=[],
+            metavar='file',
+            help=f'Specific {FILE_EXTENSION} file(s) to compile.',
+        ).completer = FilesCompleter(allowednames=[FILE_EXTENSION], directories=False)
+        parser.add_argument(
+            '--native',
+            action='store_true',
+            help='Validate with the built-in validator rather than the XSD schemas.',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report files whose compiled file is missing or out of date.',
+        )
+        add_profile_argument(parser)
+
+    def main(self, args: argparse.Namespace) -> int:
+        with profile(args.profile):
+            return self._main(args)
+
+    def _main(self, args: argparse.Namespace) -> int:
+        if args.files:
+            paths = [Path(filename) for filename in args.files]
+        else:
+            paths = sorted(Path.cwd().glob('*' + FILE_EXTENSION))
+        if not paths:
+            print('No files to compile', file=sys.stderr)
+            return 1
+        if args.check:
+            return _check(paths)
+
+        start = time.perf_counter()
+        failed = 0
+        for path in paths:
+            try:
+                compiled = nodl.compile_file(path, native=args.native)
+            except (OSError, nodl.errors.NoDLError) as e:
+                print(f'Failed to compile {path}', file=sys.stderr)
+                print(e, file=sys.stderr)
+                failed += 1
+                continue
+            print(f'Compiled {path} to {compiled.name} ({compiled.stat().st_size} bytes)')
+        elapsed = time.perf_counter() - start
+        print(f'{len(paths) - failed} succeeded, {failed} failed in {elapsed:.2f}s')
+        return 1 if failed else 0
+
+
+def _check(paths: List[Path]) -> int:
+    """Report the paths without an up to date compiled file, returning 1 if there are any."""
+    # Imported here as every ros2 invocation loads the verbs.
+    from nodl._parsing._compiled import load_compiled
+
+    outdated = [path for path in paths if load_compiled(path) is None]
+    for path in outdated:
+        print(f'{path} is not compiled or has changed since')
+    print(f'{len(paths) - len(outdated)} up to date, {len(outdated)} out of date')
+    return 1 if outdated else 0
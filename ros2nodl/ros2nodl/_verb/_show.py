@@ -13,12 +13,12 @@
 # limitations under the License.
 
 import argparse
-import pprint
-import shutil
 import sys
 
 import nodl
 from ros2cli.verb import VerbExtension
+from ros2nodl._format import add_format_argument, node_printer
+from ros2nodl._profile import add_profile_argument, profile
 from ros2pkg.api import package_name_completer, PackageNotFoundError
 from ros2run.api import ExecutableNameCompleter
 
@@ -40,8 +40,14 @@ class _ShowVerb(VerbExtension):
             metavar='executable',
             help='Specific Executable to display.',
         ).completer = ExecutableNameCompleter(package_name_key='package_name')
+        add_format_argument(parser)
+        add_profile_argument(parser)
 
     def main(self, args: argparse.Namespace) -> int:
+        with profile(args.profile):
+            return self._main(args)
+
+    def _main(self, args: argparse.Namespace) -> int:
         package = args.package_name
 
         nodes_to_show = []
@@ -64,6 +70,7 @@ class _ShowVerb(VerbExtension):
                 print(e, file=sys.stderr)
                 return 1
 
-        for node in nodes_to_show:
-            pprint.pprint(node, width=shutil.get_terminal_size()[0])
+        with node_printer(args.format) as print_node:
+            for node in nodes_to_show:
+                print_node(node)
         return 0
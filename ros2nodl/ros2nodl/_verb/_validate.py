@@ -13,15 +13,19 @@
 # limitations under the License.
 
 import argparse
+import contextlib
+import os
 from pathlib import Path
-import pprint
-import shutil
 import sys
+import time
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional, TextIO, Union
 
 from argcomplete.completers import FilesCompleter
 import nodl
-from nodl._index import _FILE_EXTENSION
+from nodl._util import FILE_EXTENSION
 from ros2cli.verb import VerbExtension
+from ros2nodl._format import add_format_argument, node_printer, PRETTY
+from ros2nodl._profile import add_profile_argument, profile
 
 
 class _ValidateVerb(VerbExtension):
@@ -34,36 +38,210 @@ class _ValidateVerb(VerbExtension):
             nargs='*',
             default=[],
             metavar='file',
-            help=f'Specific {_FILE_EXTENSION} file(s) to validate.',
-        ).completer = FilesCompleter(allowednames=[_FILE_EXTENSION], directories=False)
+            help=f'Specific {FILE_EXTENSION} file(s) to validate.',
+        ).completer = FilesCompleter(allowednames=[FILE_EXTENSION], directories=False)
 
         parser.add_argument('-p', '--print', action='store_true', help='Print parsed output.')
+        parser.add_argument(
+            '-j',
+            '--jobs',
+            type=int,
+            default=1,
+            metavar='N',
+            help='Number of files to validate in parallel.',
+        )
+        parser.add_argument(
+            '-k',
+            '--keep-going',
+            action='store_true',
+            help='Validate every file instead of stopping at the first failure.',
+        )
+        parser.add_argument(
+            '-w',
+            '--watch',
+            action='store_true',
+            help='Keep running and revalidate files as they change, until interrupted.',
+        )
+        parser.add_argument(
+            '--poll',
+            action='store_true',
+            help='Watch by polling modification times instead of using inotify.',
+        )
+        add_format_argument(parser)
+        add_profile_argument(parser)
 
     def main(self, args: argparse.Namespace) -> int:
+        with profile(args.profile):
+            return self._main(args)
+
+    def _main(self, args: argparse.Namespace) -> int:
         if args.files:
             paths = [Path(filename) for filename in args.files]
         else:
-            paths = list(Path.cwd().glob('*' + _FILE_EXTENSION))
-        if not paths:
+            paths = sorted(Path.cwd().glob('*' + FILE_EXTENSION))
+        if not args.watch and not paths:
             print('No files to validate', file=sys.stderr)
             return 1
+        # Progress goes to stderr when stdout carries JSON.
+        out = sys.stderr if args.print and args.format != PRETTY else sys.stdout
+        with _printer(args) as print_node:
+            if args.watch:
+                return _watch(args, paths, print_node=print_node, out=out)
+            return _validate_once(args, paths, print_node=print_node, out=out)
+
+
+_NodePrinter = Optional[Callable[[nodl.types.Node], None]]
+
+
+def _printer(args: argparse.Namespace) -> ContextManager[_NodePrinter]:
+    """Return the node printer for --print and --format, or None without --print."""
+    return node_printer(args.format) if args.print else contextlib.nullcontext()
+
+
+def _validate_once(
+    args: argparse.Namespace, paths: List[Path], *, print_node: _NodePrinter, out: TextIO
+) -> int:
+    start = time.perf_counter()
+    succeeded = failed = 0
+    # Results are reported in argument order whatever order the workers finish in.
+    for path, result in zip(paths, _validate_all(paths, jobs=args.jobs)):
+        if _report(path, result, print_node=print_node, out=out):
+            succeeded += 1
+            continue
+
+        failed += 1
+        if not args.keep_going:
+            break
+    elapsed = time.perf_counter() - start
+
+    if not failed:
+        print('All files validated', file=out)
+    skipped = len(paths) - succeeded - failed
+    print(
+        f'{succeeded} succeeded, {failed} failed'
+        + (f', {skipped} skipped' if skipped else '')
+        + f' in {elapsed:.2f}s',
+        file=out,
+    )
+    return 1 if failed else 0
+
+
+def _report(
+    path: Path,
+    result: Union[List[nodl.types.Node], nodl.errors.NoDLError],
+    *,
+    print_node: _NodePrinter,
+    out: TextIO,
+) -> bool:
+    """Print the outcome of validating path to out, returning whether it succeeded."""
+    if not path.is_file():
+        print(f'{path.name} is not a file', file=out)
+        return False
+    print(f'Validating {path}...', file=out)
+    if isinstance(result, nodl.errors.NoDLError):
+        print(f'Failed to parse {path}', file=sys.stderr)
+        print(result, file=sys.stderr)
+        return False
+    print('  Success', file=out)
+    if print_node is not None:
+        for node in result:
+            print_node(node)
+    return True
+
+
+def _watch(
+    args: argparse.Namespace, paths: List[Path], *, print_node: _NodePrinter, out: TextIO
+) -> int:
+    """Validate paths, then revalidate the ones that change until interrupted.
+
+    Without explicit files, files with the NoDL extension appearing in the working directory
+    are picked up too. Results are kept per file so only changed files are parsed again, and
+    the schemas compiled for the first run stay loaded.
+
+    :return: 1 if any file was failing when interrupted, 0 otherwise
+    :rtype: int
+    """
+    # Imported here as every ros2 invocation loads the verbs.
+    from ros2nodl._watch import create_watcher
+
+    # Watchers report absolute paths, files are reported under the name they were given.
+    names = {Path(os.path.abspath(path)): path for path in paths}
+    if args.files:
+        directories = {path.parent for path in names}
+
+        def match(path: Path) -> bool:
+            return path in names
+    else:
+        directories = {Path(os.path.abspath(Path.cwd()))}
+
+        def match(path: Path) -> bool:
+            return path.name.endswith(FILE_EXTENSION)
+
+    passing: Dict[Path, bool] = {}
+
+    def validate(changed: List[Path]) -> None:
+        start = time.perf_counter()
+        for path, result in zip(changed, _validate_all(changed, jobs=args.jobs)):
+            passing[path] = _report(path, result, print_node=print_node, out=out)
+        elapsed = (time.perf_counter() - start) * 1000
+        failed = sum(not ok for ok in passing.values())
+        # Printed nodes are flushed with their summary, for consumers reading as they go.
+        sys.stdout.flush()
+        print(
+            f'{len(passing) - failed} succeeded, {failed} failed'
+            f' (revalidated {len(changed)} in {elapsed:.1f}ms)',
+            file=out,
+            flush=True,
+        )
+
+    with create_watcher(directories, match, poll=args.poll) as watcher:
+        validate(list(names.values()))
+        print('Watching for changes, press Ctrl+C to stop', file=out, flush=True)
+        try:
+            while True:
+                changed = []
+                for absolute in sorted(watcher.wait()):
+                    path = names.setdefault(absolute, absolute)
+                    if path.exists():
+                        changed.append(path)
+                    elif passing.pop(path, None) is not None:
+                        print(f'{path} was removed', file=out)
+                validate(changed)
+        except KeyboardInterrupt:
+            pass
+    return 0 if all(passing.values()) else 1
+
+
+def _validate_path(path: Path) -> Union[List[nodl.types.Node], nodl.errors.NoDLError]:
+    """Parse a single file, returning its nodes or the error it raised.
+
+    The XML is always parsed and validated, even if an up to date compiled file exists.
+    """
+    if not path.is_file():
+        return []
+    try:
+        return nodl.parse(path=path, strict=True)
+    except nodl.errors.NoDLError as e:
+        return e
+
+
+def _validate_all(
+    paths: List[Path], *, jobs: int
+) -> Iterator[Union[List[nodl.types.Node], nodl.errors.NoDLError]]:
+    """Yield validation results in the order of paths, computing them on jobs workers."""
+    if jobs <= 1:
+        yield from map(_validate_path, paths)
+        return
+
+    # Imported here as every ros2 invocation loads the verbs.
+    from concurrent.futures import ThreadPoolExecutor
 
-        for path in paths:
-            if not path.is_file():
-                print(f'{path.name} is not a file')
-                return 1
-
-            print(f'Validating {path}...')
-            try:
-                nodes = nodl.parse(path=path)
-            except nodl.errors.NoDLError as e:
-                print(f'Failed to parse {path}', file=sys.stderr)
-                print(e, file=sys.stderr)
-                return 1
-            print('  Success')
-            if args.print:
-                for node in nodes:
-                    pprint.pprint(node, width=shutil.get_terminal_size()[0])
-
-        print('All files validated')
-        return 0
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_validate_path, path) for path in paths]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # Stop queued work when the caller gives up after a failure.
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,200 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Report files changing in a set of directories, through inotify or by polling."""
+
+import abc
+import ctypes
+import ctypes.util
+import os
+from pathlib import Path
+import select
+import struct
+import time
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+
+# From <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_EVENT_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+# Editors save through several operations (backup, write, rename); events closer together
+# than this are reported as one change.
+_SETTLE_TIME = 0.02
+
+
+class Watcher(abc.ABC):
+    """Watch directories for changes to the files accepted by match."""
+
+    def __init__(self, directories: Iterable[Path], match: Callable[[Path], bool]) -> None:
+        self.directories = sorted({Path(os.path.abspath(d)) for d in directories})
+        self.match = match
+
+    @abc.abstractmethod
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Block until watched files change and return their absolute paths.
+
+        :param timeout: seconds to wait for a change, defaults to forever
+        :type timeout: Optional[float]
+        :return: paths of the files that were written, created, moved or removed
+        :rtype: Set[Path]
+        """
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> 'Watcher':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class InotifyWatcher(Watcher):
+    """Watcher woken up by the kernel, without touching the filesystem in between."""
+
+    def __init__(self, directories: Iterable[Path], match: Callable[[Path], bool]) -> None:
+        super().__init__(directories, match)
+        try:
+            # IN_NONBLOCK and IN_CLOEXEC have the values of the open flags, which only exist
+            # on the platforms providing inotify.
+            flags = os.O_NONBLOCK | os.O_CLOEXEC
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            self._add_watch = libc.inotify_add_watch
+            fd = libc.inotify_init1(flags)
+        except (AttributeError, TypeError):
+            raise OSError('inotify is not available')
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._fd = fd
+        self._directories: Dict[int, Path] = {}
+        try:
+            for directory in self.directories:
+                wd = self._add_watch(fd, os.fsencode(directory), _EVENT_MASK)
+                if wd < 0:
+                    errno = ctypes.get_errno()
+                    raise OSError(errno, os.strerror(errno), str(directory))
+                self._directories[wd] = directory
+        except OSError:
+            self.close()
+            raise
+
+    def _read(self, timeout: Optional[float]) -> Set[Path]:
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: Set[Path] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                # Events were dropped, so every watched file may have changed.
+                changed.update(
+                    path for d in self.directories for path in d.iterdir() if self.match(path)
+                )
+            elif wd in self._directories and name:
+                path = self._directories[wd] / os.fsdecode(name)
+                if self.match(path):
+                    changed.add(path)
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            changed = self._read(remaining)
+            if changed:
+                while True:
+                    more = self._read(_SETTLE_TIME)
+                    if not more:
+                        return changed
+                    changed |= more
+            if deadline is not None and time.monotonic() >= deadline:
+                return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher(Watcher):
+    """Watcher comparing file modification times every interval seconds."""
+
+    def __init__(
+        self,
+        directories: Iterable[Path],
+        match: Callable[[Path], bool],
+        *,
+        interval: float = 0.1,
+    ) -> None:
+        super().__init__(directories, match)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for directory in self.directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                path = directory / entry.name
+                if not self.match(path):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            time.sleep(self.interval)
+
+
+def create_watcher(
+    directories: Iterable[Path], match: Callable[[Path], bool], *, poll: bool = False
+) -> Watcher:
+    """Return an inotify watcher, or a polling one if inotify is unavailable or poll is set."""
+    directories = list(directories)
+    if not poll:
+        try:
+            return InotifyWatcher(directories, match)
+        except OSError:
+            pass
+    return PollingWatcher(directories, match)
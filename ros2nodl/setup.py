@@ -34,6 +34,8 @@ setup(
             'nodl = ros2nodl._command._nodl:_NoDLCommand',
         ],
         'ros2nodl.verb': [
+            'check = ros2nodl._verb._check:_CheckVerb',
+            'compile = ros2nodl._verb._compile:_CompileVerb',
             'show = ros2nodl._verb._show:_ShowVerb',
             'validate = ros2nodl._verb._validate:_ValidateVerb'
         ]
@@ -0,0 +1,72 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+from pathlib import Path
+
+import nodl
+import pytest
+
+from ros2nodl import _profile
+from ros2nodl._verb import _validate
+
+
+@pytest.fixture
+def parser():
+    parser = argparse.ArgumentParser()
+    _validate._ValidateVerb().add_arguments(parser)
+    return parser
+
+
+@pytest.fixture
+def test_nodl():
+    return Path(__file__).parent / 'test.nodl.xml'
+
+
+def test_profile_is_off_by_default(parser, test_nodl, capsys):
+    args = parser.parse_args([str(test_nodl)])
+    assert args.profile is None
+
+    assert not _validate._ValidateVerb().main(args=args)
+    assert 'wall clock' not in capsys.readouterr().err
+    assert not nodl._stats.is_enabled()
+
+
+def test_profile_prints_breakdown(parser, test_nodl, capsys):
+    args = parser.parse_args([str(test_nodl), '--profile'])
+
+    assert not _validate._ValidateVerb().main(args=args)
+    err = capsys.readouterr().err
+    parse_xml = next(line for line in err.splitlines() if line.startswith('parse.xml'))
+    assert parse_xml.split()[1] == '1'
+    assert parse_xml.split()[-1] == str(test_nodl.stat().st_size)
+    assert 'wall clock' in err
+    assert not nodl._stats.is_enabled()
+
+
+def test_profile_writes_chrome_trace(parser, test_nodl, tmp_path):
+    trace = tmp_path / 'trace.json'
+    args = parser.parse_args([str(test_nodl), '--profile', str(trace)])
+
+    assert not _validate._ValidateVerb().main(args=args)
+    names = [event['name'] for event in json.loads(trace.read_text())['traceEvents']]
+    assert 'parse.xml' in names and 'v1.build' in names
+
+
+def test_format_stats():
+    stats = {'index.glob': nodl.StageStats(calls=2, seconds=0.001, bytes_read=0)}
+    lines = _profile.format_stats(stats, 0.004).splitlines()
+    assert lines[1].split() == ['index.glob', '2', '1.00', '25.0%', '-']
+    assert lines[2].split() == ['wall', 'clock', '4.00']
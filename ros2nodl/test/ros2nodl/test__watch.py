@@ -0,0 +1,83 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import pytest
+
+from ros2nodl import _watch
+
+
+def match(path):
+    return path.name.endswith('.nodl.xml')
+
+
+def inotify_watcher(directory):
+    try:
+        return _watch.InotifyWatcher([directory], match)
+    except OSError:
+        pytest.skip('inotify is not available')
+
+
+def polling_watcher(directory):
+    return _watch.PollingWatcher([directory], match, interval=0.01)
+
+
+@pytest.fixture(params=[inotify_watcher, polling_watcher])
+def watcher(request, tmp_path):
+    (tmp_path / 'a.nodl.xml').write_text('a')
+    with request.param(tmp_path) as watcher:
+        yield watcher
+
+
+def test_reports_nothing_on_timeout(watcher, tmp_path):
+    (tmp_path / 'ignored.xml').write_text('x')
+    assert watcher.wait(timeout=0.05) == set()
+
+
+def test_reports_writes(watcher, tmp_path):
+    path = tmp_path / 'a.nodl.xml'
+    path.write_text('changed')
+    os.utime(path, ns=(0, 0))
+    assert watcher.wait(timeout=1) == {path}
+
+
+def test_reports_new_and_removed_files(watcher, tmp_path):
+    (tmp_path / 'b.nodl.xml').write_text('b')
+    (tmp_path / 'a.nodl.xml').unlink()
+    changed = watcher.wait(timeout=1)
+    # Polling may observe the two changes separately.
+    changed |= watcher.wait(timeout=0.05)
+    assert changed == {tmp_path / 'a.nodl.xml', tmp_path / 'b.nodl.xml'}
+
+
+def test_reports_replaced_files(watcher, tmp_path):
+    # As editors do when saving through a temporary file.
+    temporary = tmp_path / '.a.nodl.xml.swp'
+    temporary.write_text('replacement')
+    os.replace(temporary, tmp_path / 'a.nodl.xml')
+    assert watcher.wait(timeout=1) == {tmp_path / 'a.nodl.xml'}
+
+
+def test_create_watcher_falls_back_to_polling(mocker, tmp_path):
+    mocker.patch.object(_watch, 'InotifyWatcher', side_effect=OSError)
+    assert isinstance(_watch.create_watcher([tmp_path], match), _watch.PollingWatcher)
+    assert isinstance(_watch.create_watcher([tmp_path], match, poll=True), _watch.PollingWatcher)
+
+
+def test_inotify_is_unavailable_without_its_flags(monkeypatch, tmp_path):
+    monkeypatch.delattr(os, 'O_CLOEXEC', raising=False)
+    with pytest.raises(OSError):
+        _watch.InotifyWatcher([tmp_path], match)
+    assert isinstance(_watch.create_watcher([tmp_path], match), _watch.PollingWatcher)
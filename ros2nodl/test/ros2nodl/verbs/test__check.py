@@ -0,0 +1,127 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+
+import nodl
+from nodl.types import Node, PubSubRole, ServerClientRole, Service, Topic
+import pytest
+
+from ros2nodl._verb import _check
+
+
+@pytest.fixture
+def verb() -> _check._CheckVerb:
+    return _check._CheckVerb()
+
+
+@pytest.fixture
+def parser(verb):
+    parser = argparse.ArgumentParser()
+
+    verb.add_arguments(parser)
+    return parser
+
+
+def talker(message_type='std_msgs/msg/String'):
+    return Node(
+        name='talker',
+        executable='talker',
+        topics=[Topic(name='/chatter', message_type=message_type, role=PubSubRole.PUBLISHER)],
+    )
+
+
+def listener():
+    return Node(
+        name='listener',
+        executable='listener',
+        topics=[
+            Topic(
+                name='/chatter', message_type='std_msgs/msg/String', role=PubSubRole.SUBSCRIPTION
+            )
+        ],
+        services=[
+            Service(
+                name='/reset', service_type='std_srvs/srv/Empty', role=ServerClientRole.SERVER
+            )
+        ],
+    )
+
+
+@pytest.fixture
+def packages(mocker):
+    nodes = {
+        'talkers': [talker()],
+        'listeners': [listener()],
+        'other_talkers': [talker('std_msgs/msg/Bool'), listener()],
+        'no_nodl': nodl.errors.NoNoDLFilesError('no_nodl'),
+        'unreadable': OSError('Error reading file unreadable.nodl.xml'),
+    }
+
+    def get_nodes(*, package_name):
+        result = nodes[package_name]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    mocker.patch(
+        'nodl._resource_index.get_nodl_package_prefixes',
+        return_value=dict.fromkeys(nodes, '/opt'),
+    )
+    mocker.patch('nodl._index._get_nodes_from_package', side_effect=get_nodes)
+    return nodes
+
+
+def test_consistent_packages(packages, parser, verb, capsys):
+    args = parser.parse_args(['talkers', 'listeners'])
+
+    assert not verb.main(args=args)
+    assert capsys.readouterr().out.startswith(
+        '0 errors, 0 warnings in 2 nodes from 2 packages in'
+    )
+
+
+@pytest.mark.parametrize('jobs', ['1', '3'])
+def test_checks_every_package(packages, parser, verb, capsys, jobs):
+    args = parser.parse_args(['--jobs', jobs])
+
+    assert verb.main(args=args)
+    captured = capsys.readouterr()
+    assert captured.out.splitlines()[:2] == [
+        'error: topic /chatter is used with different types: std_msgs/msg/Bool by'
+        ' other_talkers/talker; std_msgs/msg/String by listeners/listener,'
+        ' other_talkers/listener, talkers/talker',
+        'error: service /reset has 2 servers: listeners/listener, other_talkers/listener',
+    ]
+    assert '2 errors, 0 warnings in 4 nodes from 3 packages in' in captured.out
+    # Packages without NoDL files are skipped unless asked for.
+    assert captured.err == 'Error reading file unreadable.nodl.xml\n'
+
+
+def test_reports_unloadable_packages(packages, parser, verb, capsys):
+    args = parser.parse_args(['talkers', 'no_nodl'])
+
+    assert verb.main(args=args)
+    captured = capsys.readouterr()
+    assert 'no_nodl has no NoDL files' in captured.err
+    assert captured.out.startswith('0 errors, 0 warnings in 1 nodes from 1 packages in')
+
+
+def test_reports_unreadable_packages(packages, parser, verb, capsys):
+    args = parser.parse_args(['talkers', 'unreadable'])
+
+    assert verb.main(args=args)
+    captured = capsys.readouterr()
+    assert 'Error reading file unreadable.nodl.xml' in captured.err
+    assert captured.out.startswith('0 errors, 0 warnings in 1 nodes from 1 packages in')
@@ -0,0 +1,89 @@
+# Copyright 2020 Canonical, Ltd.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import argparse
+import os
+import shutil
+
+import pytest
+
+from ros2nodl._verb import _compile
+
+
+@pytest.fixture
+def verb() -> _compile._CompileVerb:
+    return _compile._CompileVerb()
+
+
+@pytest.fixture
+def parser(verb):
+    parser = argparse.ArgumentParser()
+
+    verb.add_arguments(parser)
+    return parser
+
+
+@pytest.fixture
+def nodl_copy(tmp_path, test_nodl):
+    path = tmp_path / 'test.nodl.xml'
+    shutil.copy(test_nodl, path)
+    os.utime(path, ns=(0, 0))
+    return path
+
+
+def test_compiles_next_to_source(capsys, parser, nodl_copy, verb):
+    args = parser.parse_args([str(nodl_copy)])
+
+    assert not verb.main(args=args)
+    assert nodl_copy.with_name('test.nodl.bin').is_file()
+    assert '1 succeeded, 0 failed' in capsys.readouterr().out
+
+
+def test_finds_all(mocker, parser, tmp_path, nodl_copy, verb):
+    shutil.copy(nodl_copy, tmp_path / 'other.nodl.xml')
+    mocker.patch('ros2nodl._verb._compile.Path.cwd', return_value=tmp_path)
+
+    assert not verb.main(args=parser.parse_args([]))
+    assert sorted(path.name for path in tmp_path.glob('*.nodl.bin')) == [
+        'other.nodl.bin',
+        'test.nodl.bin',
+    ]
+
+
+def test_fails_no_file(mocker, parser, tmp_path, verb):
+    mocker.patch('ros2nodl._verb._compile.Path.cwd', return_value=tmp_path)
+
+    assert verb.main(args=parser.parse_args([]))
+
+
+def test_fails_invalid_nodl(capsys, parser, tmp_path, nodl_copy, verb):
+    invalid = tmp_path / 'invalid.nodl.xml'
+    invalid.write_text('<interface version="1"></interface>')
+
+    assert verb.main(args=parser.parse_args([str(invalid), str(nodl_copy)]))
+    assert not invalid.with_name('invalid.nodl.bin').exists()
+    assert nodl_copy.with_name('test.nodl.bin').is_file()
+    assert 'Failed to compile' in capsys.readouterr().err
+
+
+def test_check(capsys, parser, nodl_copy, verb):
+    args = parser.parse_args(['--check', str(nodl_copy)])
+    assert verb.main(args=args)
+    assert not nodl_copy.with_name('test.nodl.bin').exists()
+
+    verb.main(args=parser.parse_args([str(nodl_copy)]))
+    assert not verb.main(args=args)
+
+    nodl_copy.write_text(nodl_copy.read_text() + '\n')
+    assert verb.main(args=args)
+    assert '0 up to date, 1 out of date' in capsys.readouterr().out
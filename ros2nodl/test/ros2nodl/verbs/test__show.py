@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import argparse
+import json
 from pathlib import Path
 from typing import List
 
@@ -84,3 +85,19 @@ def test_show_parsed_fail_on_duplicate(mocker, mock_nodl, parser, verb):
     mock_nodl.side_effect = nodl.errors.DuplicateNodeError(mocker.MagicMock())
     args = parser.parse_args(['foo'])
     assert verb.main(args=args)
+
+
+def test_prints_jsonl(capsys, mock_nodl, parser, verb):
+    args = parser.parse_args(['foo', '--format', 'jsonl'])
+    assert not verb.main(args=args)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)['name'] for line in lines] == ['node_1', 'node_2']
+    assert json.loads(lines[1])['actions'][0]['role'] == 'both'
+
+
+def test_prints_json(capsys, mock_nodl, parser, verb):
+    args = parser.parse_args(['foo', '--format', 'json'])
+    assert not verb.main(args=args)
+
+    assert len(json.loads(capsys.readouterr().out)) == 2
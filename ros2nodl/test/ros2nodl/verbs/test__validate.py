@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import argparse
+import json
 
 import nodl
 import pytest
@@ -70,6 +71,17 @@ def test_validates_valid_file(mocker, parser, test_nodl, verb):
     assert not verb.main(args=args)
 
 
+def test_ignores_compiled_files(mocker, parser, tmp_path, test_nodl, verb):
+    path = tmp_path / 'test.nodl.xml'
+    path.write_bytes(test_nodl.read_bytes())
+    nodl.compile_file(path)
+    load_compiled = mocker.spy(nodl._parsing._parsing, 'load_compiled')
+
+    args = parser.parse_args([str(path)])
+    assert not verb.main(args=args)
+    load_compiled.assert_not_called()
+
+
 def test_fails_invalid_nodl(mocker, parser, test_nodl, verb):
     mocker.patch(
         'ros2nodl._verb._validate.nodl.parse',
@@ -81,9 +93,133 @@ def test_fails_invalid_nodl(mocker, parser, test_nodl, verb):
 
 
 def test_pprints_to_console(mocker, parser, test_nodl, verb):
-    print_mock = mocker.patch('ros2nodl._verb._validate.pprint.pprint', autospec=True)
+    print_mock = mocker.patch('ros2nodl._format.pprint.pprint', autospec=True)
 
     args = parser.parse_args([str(test_nodl), '-p'])
 
     verb.main(args=args)
     assert len(print_mock.mock_calls) == 2
+
+
+@pytest.mark.parametrize('format_', ['json', 'jsonl'])
+def test_prints_json_to_stdout(capsys, parser, test_nodl, verb, format_):
+    args = parser.parse_args([str(test_nodl), '-p', '--format', format_])
+
+    assert not verb.main(args=args)
+    captured = capsys.readouterr()
+    if format_ == 'json':
+        nodes = json.loads(captured.out)
+    else:
+        nodes = [json.loads(line) for line in captured.out.splitlines()]
+    assert [node['executable'] for node in nodes] == ['first', 'second']
+    assert 'All files validated' in captured.err
+
+
+@pytest.fixture
+def mixed_files(tmp_path, test_nodl):
+    paths = []
+    for name in ['a', 'b', 'c', 'd']:
+        path = tmp_path / f'{name}.nodl.xml'
+        path.write_text(test_nodl.read_text())
+        paths.append(path)
+    paths[1].write_text('<interface version="1"></interface>')
+    paths[3].write_text('<interface version="1"></interface>')
+    return paths
+
+
+def test_stops_at_first_failure(parser, mixed_files, verb, capsys):
+    args = parser.parse_args([str(path) for path in mixed_files])
+
+    assert verb.main(args=args)
+    out = capsys.readouterr().out
+    assert 'a.nodl.xml' in out and 'c.nodl.xml' not in out
+    assert '1 succeeded, 1 failed, 2 skipped' in out
+
+
+@pytest.mark.parametrize('jobs', ['1', '4'])
+def test_keep_going_reports_every_failure(parser, mixed_files, verb, capsys, jobs):
+    args = parser.parse_args([str(path) for path in mixed_files] + ['-k', '-j', jobs])
+
+    assert verb.main(args=args)
+    captured = capsys.readouterr()
+    assert captured.err.count('Failed to parse') == 2
+    assert '2 succeeded, 2 failed in' in captured.out
+
+    # Output follows argument order regardless of the number of workers.
+    validating = [line for line in captured.out.splitlines() if line.startswith('Validating')]
+    assert validating == [f'Validating {path}...' for path in mixed_files]
+
+
+def test_parallel_success(parser, test_nodl, verb, capsys):
+    args = parser.parse_args([str(test_nodl)] * 3 + ['--jobs', '2'])
+
+    assert not verb.main(args=args)
+    assert 'All files validated' in capsys.readouterr().out
+
+
+class FakeWatcher:
+    def __init__(self, changes):
+        self.changes = list(changes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def wait(self):
+        if not self.changes:
+            raise KeyboardInterrupt
+        return self.changes.pop(0)()
+
+
+def test_watch_revalidates_changed_files(mocker, parser, mixed_files, verb, capsys):
+    valid = mixed_files[0].read_text()
+
+    def fix_b():
+        mixed_files[1].write_text(valid)
+        return {mixed_files[1]}
+
+    def fix_d():
+        mixed_files[3].write_text(valid)
+        return {mixed_files[3]}
+
+    mocker.patch('ros2nodl._watch.create_watcher', return_value=FakeWatcher([fix_b, fix_d]))
+    parse = mocker.spy(nodl, 'parse')
+
+    args = parser.parse_args([str(path) for path in mixed_files] + ['--watch'])
+    assert not verb.main(args=args)
+    assert [call.kwargs['path'] for call in parse.call_args_list] == mixed_files + [
+        mixed_files[1],
+        mixed_files[3],
+    ]
+    out = capsys.readouterr().out
+    assert '2 succeeded, 2 failed (revalidated 4 in' in out
+    assert '3 succeeded, 1 failed (revalidated 1 in' in out
+    assert '4 succeeded, 0 failed (revalidated 1 in' in out
+
+
+def test_watch_picks_up_new_and_removed_files(mocker, parser, tmp_path, test_nodl, verb, capsys):
+    mocker.patch('ros2nodl._verb._validate.Path.cwd', return_value=tmp_path)
+    new = tmp_path / 'new.nodl.xml'
+
+    def create():
+        new.write_text('<interface version="1"></interface>')
+        return {new}
+
+    def remove():
+        new.unlink()
+        return {new}
+
+    create_watcher = mocker.patch(
+        'ros2nodl._watch.create_watcher', return_value=FakeWatcher([create, remove])
+    )
+
+    args = parser.parse_args(['--watch', '--poll'])
+    assert not verb.main(args=args)
+    assert create_watcher.call_args.kwargs['poll']
+    assert create_watcher.call_args.args[1](tmp_path / 'other.nodl.xml')
+    out = capsys.readouterr().out
+    assert '0 succeeded, 1 failed' in out
+    assert f'{new} was removed' in out
+    assert out.splitlines()[-1].startswith('0 succeeded, 0 failed (revalidated 0 in')